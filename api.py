@@ -1,38 +1,147 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from datetime import datetime
 from data_collector import ForexDataCollector
-from prophet_predictor import ProphetPredictor
+from artifacts import ModelRegistry
+from async_collector import AsyncCollector
 from signal_generator import SignalGenerator
+from signal_snapshots import SignalSnapshots
+from warmup import BackgroundWarmup
 import pandas as pd
 import numpy as np
 import os
-
-app = FastAPI(title="Forex Trading Signals API")
+import time
 
 # Initialize components
 data_collector = ForexDataCollector(currency_pair="EUR/USD=X", interval="45m")
-prophet_predictor = ProphetPredictor(prediction_horizon=1)
 signal_generator = SignalGenerator(confidence_threshold=0.7)
 
-# Model paths
+# Endpoints await the collector: HTTP on the event loop, processing, forecasts
+# and signals in a bounded pool of worker threads
+async_collector = AsyncCollector(data_collector, max_workers=8)
+
+# Model artifacts, prepared by the background worker at startup
 MODEL_DIR = "models"
-MODEL_PATH = os.path.join(MODEL_DIR, "prophet_model.joblib")
-
-# Load pre-trained model if it exists, otherwise train and save a new one
-if not os.path.exists(MODEL_PATH):
-    # Train and save model on first run
-    data = data_collector.fetch_forex_data(
-        start_date=(datetime.now() - pd.Timedelta(days=60)).strftime("%Y-%m-%d"),
-        end_date=datetime.now().strftime("%Y-%m-%d")
+PROPHET_MODEL = "prophet_eurusd"
+LEGACY_MODEL_PATH = os.path.join(MODEL_DIR, "prophet_model.joblib")
+model_registry = ModelRegistry(MODEL_DIR)
+
+def ensure_prophet_model():
+    """
+    Make sure the Prophet artifact exists
+
+    Only the first run does any work: the model is trained (or converted from
+    a joblib file of an earlier version) and saved as an artifact. Forecasts
+    are served from the registry, which loads the artifact with neither
+    Prophet nor Stan imported.
+    """
+    if PROPHET_MODEL in model_registry:
+        return
+
+    from prophet_predictor import ProphetPredictor
+    predictor = ProphetPredictor(prediction_horizon=1)
+    if os.path.exists(LEGACY_MODEL_PATH):
+        predictor.load_model(LEGACY_MODEL_PATH)
+    else:
+        # Train and save model on first run
+        data = data_collector.fetch_forex_data(
+            start_date=(datetime.now() - pd.Timedelta(days=60)).strftime("%Y-%m-%d"),
+            end_date=datetime.now().strftime("%Y-%m-%d")
+        )
+        predictor.train(data)
+    predictor.save_model(model_registry.path(PROPHET_MODEL))
+
+def prepare_models():
+    """
+    Train or load the models, in the background worker
+    """
+    ensure_prophet_model()
+    model_registry.get(PROPHET_MODEL)
+
+# Seconds clients are asked to wait before retrying while the models or the first signal are not ready
+RETRY_AFTER_SECONDS = 30
+model_warmup = BackgroundWarmup(prepare_models, retry_seconds=60)
+
+# Pair of the served signal, and how often the refresh loop checks for the models
+SIGNAL_PAIR = "EUR/USD"
+SIGNAL_WAIT_SECONDS = 0.5
+
+def compute_signal(data, sentiment_score):
+    """
+    CPU-bound part of a signal refresh, run in a worker thread: breakouts, forecast and signal
+    """
+    # Process data and add technical indicators
+    data = data_collector.detect_breakouts(data)
+    
+    # Generate Prophet forecast using pre-trained model (the signal only reads the horizon)
+    forecast = model_registry.get(PROPHET_MODEL).predict(data, history=0)
+    
+    # Generate trading signal
+    return signal_generator.generate_signal(data, forecast, sentiment_score)
+
+async def compute_snapshot(pair):
+    """
+    Signal fields of the pair, for the background refresh
+
+    The API serves a single pair, so pair only keys the snapshot.
+    """
+    end_date = datetime.now()
+    start_date = end_date - pd.Timedelta(days=30)
+    data = await async_collector.fetch_forex_data(
+        start_date=start_date.strftime("%Y-%m-%d"),
+        end_date=end_date.strftime("%Y-%m-%d")
     )
-    prophet_predictor.train(data)
-    prophet_predictor.save_model(MODEL_PATH)
-else:
-    prophet_predictor.load_model(MODEL_PATH)
+    if data.empty:
+        raise ValueError(f"No price data for {pair}")
+    sentiment_score = 0  # TODO: Implement sentiment analysis with DeepSeek (then fetch the news here)
+    
+    signal = await async_collector.run(compute_signal, data, sentiment_score)
+    return {
+        'current_price': signal['current_price'],
+        'predicted_price': signal['predicted_price'],
+        'signal': signal['signal_type'].name,
+        'confidence': signal['confidence_score'],
+        'take_profit': signal['take_profit'],
+        'stop_loss': signal['stop_loss'],
+        'reason': signal['reason'],
+    }
+
+# Signals recomputed when a daily bar closes, served from memory by /signal
+signal_snapshots = SignalSnapshots(compute_snapshot, [SIGNAL_PAIR], retry_seconds=RETRY_AFTER_SECONDS)
+
+async def refresh_signals():
+    """
+    Signal refresh loop, started once the models are ready
+    """
+    while not model_warmup.ready:
+        await asyncio.sleep(SIGNAL_WAIT_SECONDS)
+    await signal_snapshots.run()
+
+@asynccontextmanager
+async def lifespan(app):
+    await async_collector.start()
+    # Serve (and answer /health) right away; the models are prepared in the background
+    model_warmup.start()
+    signals_task = asyncio.create_task(refresh_signals())
+    yield
+    signals_task.cancel()
+    model_warmup.stop()
+    await asyncio.gather(signals_task, return_exceptions=True)
+    await async_collector.close()
+
+app = FastAPI(title="Forex Trading Signals API", lifespan=lifespan)
+
+def not_ready_headers():
+    return {"Retry-After": str(RETRY_AFTER_SECONDS)}
 
 class SignalResponse(BaseModel):
     timestamp: str
+    generated_at: str
+    age_seconds: float
+    stale: bool
     current_price: float
     predicted_price: float
     signal: str
@@ -47,50 +156,70 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    """
+    Liveness: the process is up and serving, whether or not the models are ready
+    """
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness: 200 once the models are loaded, 503 with Retry-After until then
+    """
+    if not model_warmup.ready:
+        return JSONResponse(status_code=503, content=model_warmup.state(), headers=not_ready_headers())
+    return model_warmup.state()
+
 @app.get("/signal", response_model=SignalResponse)
 async def get_trading_signal():
-    try:
-        # Fetch latest data
-        end_date = datetime.now()
-        start_date = end_date - pd.Timedelta(days=30)  # Get last 30 days of data
-        
-        data = data_collector.fetch_forex_data(
-            start_date=start_date.strftime("%Y-%m-%d"),
-            end_date=end_date.strftime("%Y-%m-%d")
-        )
-        
-        # Process data and add technical indicators
-        data = data_collector.detect_breakouts(data)
-        
-        # Get news sentiment
-        news_data = data_collector.fetch_news_data()
-        sentiment_score = 0  # TODO: Implement sentiment analysis with DeepSeek
-        
-        # Generate Prophet forecast using pre-trained model
-        forecast = prophet_predictor.predict(data)
-        
-        # Generate trading signal
-        signal = signal_generator.generate_signal(
-            data,
-            forecast,
-            sentiment_score
-        )
-        
-        return SignalResponse(
-            timestamp=datetime.now().isoformat(),
-            current_price=signal['current_price'],
-            predicted_price=signal['predicted_price'],
-            signal=signal['signal_type'].name,
-            confidence=signal['confidence_score'],
-            take_profit=signal['take_profit'],
-            stop_loss=signal['stop_loss'],
-            reason=signal['reason']
+    """
+    Latest precomputed signal; age_seconds and stale tell how old it is
+    """
+    snapshot = signal_snapshots.get(SIGNAL_PAIR)
+    if snapshot is None:
+        status = model_warmup.status if not model_warmup.ready else "computing the first signal"
+        raise HTTPException(
+            status_code=503,
+            detail=f"Signal not ready ({status}), retry later",
+            headers=not_ready_headers()
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    now = time.time()
+    return SignalResponse(
+        timestamp=datetime.fromtimestamp(now).isoformat(),
+        generated_at=datetime.fromtimestamp(snapshot['generated_at']).isoformat(),
+        age_seconds=signal_snapshots.age(snapshot, now),
+        stale=signal_snapshots.is_stale(snapshot, now),
+        current_price=snapshot['current_price'],
+        predicted_price=snapshot['predicted_price'],
+        signal=snapshot['signal'],
+        confidence=snapshot['confidence'],
+        take_profit=snapshot['take_profit'],
+        stop_loss=snapshot['stop_loss'],
+        reason=snapshot['reason']
+    )
+
+def historical_records(data):
+    """
+    JSON records of the bars, run in a worker thread
+    """
+    # Process data to ensure it has required columns
+    if 'Weekly_VWAP' not in data.columns:
+        data = data_collector._process_data(data)
+    
+    # Convert DataFrame to records and handle datetime
+    records = data.reset_index().to_dict(orient='records')
+    
+    # Convert datetime objects to ISO format strings
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, pd.Timestamp):
+                record[key] = value.isoformat()
+            elif isinstance(value, np.integer):
+                record[key] = int(value)
+            elif isinstance(value, (float, np.floating)):
+                # JSON has no NaN: indicators without enough history are null
+                record[key] = None if np.isnan(value) else float(value)
+    return records
 
 @app.get("/historical")
 async def get_historical_data(days: int = 30):
@@ -98,27 +227,11 @@ async def get_historical_data(days: int = 30):
         end_date = datetime.now()
         start_date = end_date - pd.Timedelta(days=days)
         
-        data = data_collector.fetch_forex_data(
+        data = await async_collector.fetch_forex_data(
             start_date=start_date.strftime("%Y-%m-%d"),
             end_date=end_date.strftime("%Y-%m-%d")
         )
-        
-        # Process data to ensure it has required columns
-        if 'Weekly_VWAP' not in data.columns:
-            data = data_collector._process_data(data)
-        
-        # Convert DataFrame to records and handle datetime
-        records = data.reset_index().to_dict(orient='records')
-        
-        # Convert datetime objects to ISO format strings
-        for record in records:
-            for key, value in record.items():
-                if isinstance(value, pd.Timestamp):
-                    record[key] = value.isoformat()
-                elif isinstance(value, np.integer):
-                    record[key] = int(value)
-                elif isinstance(value, np.floating):
-                    record[key] = float(value)
+        records = await async_collector.run(historical_records, data)
         
         return records
         
@@ -3,7 +3,8 @@ import streamlit.components.v1 as components
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from data_collector import ForexDataCollector
+from data_collector import ForexDataCollector, RESAMPLED_INTERVALS
+from resampler import MultiIntervalResampler
 import numpy as np
 
 import toml
@@ -64,13 +65,14 @@ selected_pair_for_url = selected_pair.replace("/", "")
 # Timeframe selection
 selected_timeframe = st.sidebar.selectbox(
     "Select Timeframe",
-    ["45min", "daily", "weekly", "monthly"],
-    help="45-minute data is sourced from HistData.com, other intervals from Alpha Vantage"
+    ["15min", "45min", "60min", "4h", "daily", "weekly", "monthly"],
+    index=1,
+    help="Intraday data is resampled from HistData.com 1-minute bars, other intervals come from Alpha Vantage"
 )
 
 # Date range selection - adjust based on timeframe
 end_date = datetime.now()
-if selected_timeframe == "45min":
+if selected_timeframe in RESAMPLED_INTERVALS:
     start_date = end_date - timedelta(days=30)  # Default to 30 days for intraday data
     min_date = end_date - timedelta(days=90)    # Allow up to 90 days historical intraday data
 else:
@@ -83,14 +85,14 @@ date_range = st.sidebar.date_input(
     value=(start_date, end_date),
     min_value=min_date,
     max_value=end_date,
-    help="For 45-minute data, maximum range is 90 days. For daily data, maximum range is 2 years."
+    help="For intraday data, maximum range is 90 days. For daily data, maximum range is 2 years."
 )
 
 # Add API usage info
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
 ### Data Source Info
-- 45-minute data: HistData.com (free, no API key needed)
+- Intraday data: HistData.com 1-minute bars (free, no API key needed), resampled locally
 - Daily/Weekly/Monthly: Alpha Vantage API
   - Free tier: 5 API calls per minute
   - 500 API calls per day
@@ -100,6 +102,18 @@ st.sidebar.markdown("""
 # fin Sidebar :--------------------------------------------------------------------
 
 
+# One resampler per pair, shared by every timeframe, so switching intraday
+# timeframes reads the bars already derived from the same 1-minute base
+@st.cache_resource(show_spinner=False)
+def get_resampler(pair):
+    return MultiIntervalResampler()
+
+# Fitted Prophet models, shared by every pair and timeframe
+@st.cache_resource(show_spinner=False)
+def get_model_cache():
+    from model_cache import ModelCache
+    return ModelCache("model_cache")
+
 # Initialize data collector and predictor
 @st.cache_resource(show_spinner=False)
 def get_collectors(pair, timeframe):
@@ -109,14 +123,14 @@ def get_collectors(pair, timeframe):
 
             interval=timeframe,
             alpha_vantage_key=ALPHA_VANTAGE_API_KEY,
-            
+            resampler=get_resampler(pair),
 
         )
         
         # Only initialize prophet if it was successfully imported
         if st.session_state.prophet_import_success:
             from prophet_predictor import ProphetPredictor
-            predictor = ProphetPredictor(prediction_horizon=7)  # Predict 7 days ahead
+            predictor = ProphetPredictor(prediction_horizon=7, model_cache=get_model_cache())  # Predict 7 days ahead
         else:
             predictor = None
             
@@ -363,6 +377,12 @@ try:
                 help="Choose which price data to use for forecasting"
             )
             
+            show_diagnostics = st.checkbox(
+                "Show data diagnostics",
+                value=False,
+                help="Display the data checks and stage timings of each forecast (slower)"
+            )
+            
             # Add note about the simplified model
             st.info("""
             📊 **Simplified Model**: The forecast uses only the selected price column (no additional features) to avoid NaN value issues.
@@ -375,20 +395,21 @@ try:
                         forecast_data = data.copy()
                         
                         # Detailed data diagnostics
-                        with st.expander("Data Diagnostics", expanded=False):
-                            st.write("Data Types:", forecast_data.dtypes)
-                            st.write("Data Shape:", forecast_data.shape)
-                            
-                            # Check for NaN values in selected column
-                            nan_count = forecast_data[price_column].isna().sum()
-                            st.write(f"NaN values in {price_column}: {nan_count} ({nan_count/len(forecast_data):.1%} of data)")
-                            
-                            # If NaN values exist, show sample rows
-                            if nan_count > 0:
-                                nan_rows = forecast_data[forecast_data[price_column].isna()].head(5)
-                                if not nan_rows.empty:
-                                    st.write("Sample rows with NaN values:")
-                                    st.write(nan_rows)
+                        if show_diagnostics:
+                            with st.expander("Data Diagnostics", expanded=False):
+                                st.write("Data Types:", forecast_data.dtypes)
+                                st.write("Data Shape:", forecast_data.shape)
+                                
+                                # Check for NaN values in selected column
+                                nan_count = forecast_data[price_column].isna().sum()
+                                st.write(f"NaN values in {price_column}: {nan_count} ({nan_count/len(forecast_data):.1%} of data)")
+                                
+                                # If NaN values exist, show sample rows
+                                if nan_count > 0:
+                                    nan_rows = forecast_data[forecast_data[price_column].isna()].head(5)
+                                    if not nan_rows.empty:
+                                        st.write("Sample rows with NaN values:")
+                                        st.write(nan_rows)
                         
                         # Ensure numeric data type for selected price column
                         if not pd.api.types.is_numeric_dtype(forecast_data[price_column]):
@@ -446,23 +467,22 @@ try:
                             # Use the fixed data
                             prophet_data = fixed_data
                             st.success(f"Data has been fixed. Using {len(prophet_data)} valid data points.")
-                        else:
+                        elif show_diagnostics:
                             st.success(f"No None values detected in the 'y' column. All {len(prophet_data)} data points are valid.")
                         
-                        # Validate datetime index
-                        st.write("Validating data before forecasting...")
-                        
-                        # Validate price column
-                        st.write(f"Validating {price_column} column:")
-                        st.write(f"Data type: {prophet_data['y'].dtype}")
-                        st.write(f"Range: {prophet_data['y'].min()} to {prophet_data['y'].max()}")
-                        st.write(f"NaN count: {prophet_data['y'].isna().sum()}")
-                        
-                        # Show the first and last few rows of the prepared data
-                        st.write("First few rows of prepared data:")
-                        st.write(prophet_data.head())
-                        st.write("Last few rows of prepared data:")
-                        st.write(prophet_data.tail())
+                        if show_diagnostics:
+                            with st.expander("Prepared Data", expanded=False):
+                                # Validate price column
+                                st.write(f"Validating {price_column} column:")
+                                st.write(f"Data type: {prophet_data['y'].dtype}")
+                                st.write(f"Range: {prophet_data['y'].min()} to {prophet_data['y'].max()}")
+                                st.write(f"NaN count: {prophet_data['y'].isna().sum()}")
+                                
+                                # Show the first and last few rows of the prepared data
+                                st.write("First few rows of prepared data:")
+                                st.write(prophet_data.head())
+                                st.write("Last few rows of prepared data:")
+                                st.write(prophet_data.tail())
 
                         # Final check for any remaining NaN values
                         if prophet_data['y'].isna().sum() > 0:
@@ -478,19 +498,29 @@ try:
                         
                         # Make a clean copy of the data for Prophet
                         final_prophet_data = prophet_data.copy()
-                        st.success(f"Data validation complete. Ready to forecast with {len(final_prophet_data)} data points.")
+                        if show_diagnostics:
+                            st.success(f"Data validation complete. Ready to forecast with {len(final_prophet_data)} data points.")
 
                         # Train Prophet model with only essential data
                         try:
                             st.info("Training Prophet model...")
-                            predictor.train(final_prophet_data)
-                            st.success("Prophet model trained successfully")
+                            from_cache = predictor.train(final_prophet_data, pair=selected_pair,
+                                                         timeframe=selected_timeframe, price_column=price_column)
+                            if from_cache:
+                                st.success("Reused the Prophet model already fitted on this data")
+                            else:
+                                st.success("Prophet model trained successfully")
                             
                             # Make prediction for next 7 days
                             st.info("Generating forecast...")
-                            forecast = predictor.predict(final_prophet_data, periods=7)
+                            # Only the 7 forecast days are shown, so the history is not predicted
+                            forecast = predictor.predict(final_prophet_data, periods=7, history=0)
                             st.success("Forecast generated successfully")
                             
+                            if show_diagnostics:
+                                with st.expander("Stage Timings", expanded=False):
+                                    st.write(pd.DataFrame(predictor.metrics.snapshot()).T)
+                            
                             # Extract forecast data
                             forecast_dates = forecast['ds'].iloc[-7:] 
                             forecast_values = forecast['yhat'].iloc[-7:]
@@ -902,7 +932,7 @@ with tab4:
             # Load environment variables
             import os
             from dotenv import load_dotenv
-            import requests
+            import http_client
             
             load_dotenv()
 
@@ -968,7 +998,7 @@ with tab4:
             print(f"Searching for news with query: {search_query}")
             
             # Make the API request
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params)
             data = response.json()
             
             # Check if we got valid data
@@ -0,0 +1,263 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+import numpy as np
+
+# Version of the artifact layout; bump it when the manifest or array names change
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Artifact kinds
+FOREX_KIND = "forex_lightgbm"
+PROPHET_KIND = "prophet"
+
+# An artifact path is a symlink to its current version, a hidden sibling
+# directory; versions are written under a temp prefix and renamed when complete
+VERSION_PREFIX = ".{name}.v-"
+TMP_PREFIX = ".{name}.tmp-"
+
+# Versions kept per artifact: the current one, and the previous one for
+# readers that resolved the path just before it was replaced
+KEEP_VERSIONS = 2
+
+# mkdtemp creates directories readable by the owner only; versions get the
+# mode os.makedirs would have given them under the process umask instead
+_umask = os.umask(0o022)
+os.umask(_umask)
+DIR_MODE = 0o777 & ~_umask
+
+# Serializes the swap and the cleanup of old versions within the process
+_swap_lock = threading.Lock()
+
+
+def write_artifact(path, kind, meta, arrays, files=None):
+    """
+    Write a model artifact directory
+
+    The directory holds a JSON manifest, one .npy file per array (so each can
+    be memory-mapped on load) and any text files such as a LightGBM model.
+    It is written as a new hidden version next to path, and path is a symlink
+    switched to it with a single rename, so path always exists and readers
+    never see a partial artifact.
+
+    Parameters:
+    -----------
+    path : str
+        Artifact path, replaced if it exists
+    kind : str
+        Model kind (FOREX_KIND or PROPHET_KIND)
+    meta : dict
+        JSON-serializable settings of the model
+    arrays : dict
+        {name: np.ndarray}
+    files : dict, optional
+        {name: (file name, text)} for non-array parts of the model
+    """
+    path = os.path.abspath(path)
+    parent, name = os.path.split(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=TMP_PREFIX.format(name=name))
+    os.chmod(tmp_path, DIR_MODE)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'kind': kind,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'numpy': np.__version__,
+        'meta': meta,
+        'arrays': {},
+        'files': {},
+    }
+    for array_name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        np.save(os.path.join(tmp_path, f"{array_name}.npy"), array, allow_pickle=False)
+        manifest['arrays'][array_name] = {'file': f"{array_name}.npy", 'dtype': array.dtype.str,
+                                          'shape': list(array.shape)}
+    for file_name, (filename, text) in (files or {}).items():
+        with open(os.path.join(tmp_path, filename), 'w') as f:
+            f.write(text)
+        manifest['files'][file_name] = filename
+    with open(os.path.join(tmp_path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    version = VERSION_PREFIX.format(name=name) + os.path.basename(tmp_path)[len(TMP_PREFIX.format(name=name)):]
+    link = os.path.join(parent, version + ".link")
+    # Versions only appear once they are swapped in, so the cleanup never
+    # removes one another writer is about to point path at
+    with _swap_lock:
+        os.replace(tmp_path, os.path.join(parent, version))
+        os.symlink(version, link)
+        if os.path.isdir(path) and not os.path.islink(path):
+            # Artifact of the old layout (a plain directory): moved aside once,
+            # the only swap during which path is briefly missing
+            legacy = tempfile.mkdtemp(dir=parent, prefix=VERSION_PREFIX.format(name=name))
+            os.replace(path, os.path.join(legacy, name))
+        os.replace(link, path)
+        _remove_old_versions(parent, name)
+
+
+def _remove_old_versions(parent, name):
+    """
+    Delete the versions of an artifact beyond the KEEP_VERSIONS newest, never the current one
+    """
+    prefix = VERSION_PREFIX.format(name=name)
+    current = os.readlink(os.path.join(parent, name))
+    versions = []
+    for entry in os.scandir(parent):
+        if entry.name.startswith(prefix) and entry.is_dir(follow_symlinks=False) and entry.name != current:
+            versions.append((entry.stat(follow_symlinks=False).st_mtime_ns, entry.name))
+    for _, stale in sorted(versions, reverse=True)[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(os.path.join(parent, stale), ignore_errors=True)
+
+
+def is_artifact(path):
+    """
+    Whether path is an artifact directory
+    """
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def read_manifest(path):
+    """
+    Read and check the manifest of an artifact directory
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version: {manifest.get('format_version')}")
+    return manifest
+
+
+def load_arrays(path, manifest, mmap=True):
+    """
+    Arrays of an artifact, memory-mapped read-only by default
+
+    Memory-mapped arrays are only paged in when read, and the pages are shared
+    by every process serving the same artifact.
+    """
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        array = np.load(os.path.join(path, spec['file']), mmap_mode='r' if mmap else None, allow_pickle=False)
+        if array.dtype.str != spec['dtype'] or list(array.shape) != spec['shape']:
+            raise ValueError(f"Array {name} does not match the manifest")
+        arrays[name] = array
+    return arrays
+
+
+def read_file(path, manifest, name):
+    """
+    Text of a named file of an artifact
+    """
+    with open(os.path.join(path, manifest['files'][name])) as f:
+        return f.read()
+
+
+def load_artifact(path):
+    """
+    Load an artifact directory for inference
+
+    Returns:
+    --------
+    ForexPredictor or CompiledProphetPredictor
+        Depending on the artifact kind. Prophet artifacts are served by
+        CompiledProphetPredictor, without importing Prophet
+    """
+    # Resolve the symlink once, so every file is read from the same version
+    path = os.path.realpath(path)
+    manifest = read_manifest(path)
+    if manifest['kind'] == FOREX_KIND:
+        from forex_predictor import ForexPredictor
+        meta = manifest['meta']
+        predictor = ForexPredictor(currency_pair=meta['currency_pair'],
+                                   prediction_horizon=meta['prediction_horizon'],
+                                   features=meta['features'])
+        predictor.load_model(path)
+        return predictor
+    if manifest['kind'] == PROPHET_KIND:
+        from compiled_prophet import CompiledProphetPredictor
+        return CompiledProphetPredictor(manifest['meta'], load_arrays(path, manifest))
+    raise ValueError(f"Unknown artifact kind: {manifest['kind']}")
+
+
+class ModelRegistry:
+    def __init__(self, root="models", max_loaded=8):
+        """
+        Named model artifacts under one directory, loaded on first use
+
+        Listing the registry and reading manifests touches no model data. A
+        model is materialized the first time get() asks for it, and only the
+        most recently used ones are kept, so one process can serve many pairs
+        without holding all of their models.
+
+        Parameters:
+        -----------
+        root : str
+            Directory with one artifact directory per model (default: "models")
+        max_loaded : int
+            Models kept materialized (default: 8)
+        """
+        self.root = root
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        """
+        Artifact directory of a model, for save_model
+        """
+        return os.path.join(self.root, name)
+
+    def __contains__(self, name):
+        return is_artifact(self.path(name))
+
+    def names(self):
+        """
+        Names of the saved models
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if not name.startswith('.') and name in self)
+
+    def manifest(self, name):
+        """
+        Manifest of a model, without loading it
+        """
+        return read_manifest(self.path(name))
+
+    def loaded(self):
+        """
+        Names of the materialized models, least recently used first
+        """
+        with self._lock:
+            return list(self._loaded)
+
+    def get(self, name):
+        """
+        The model saved under name, loaded on first use (KeyError if there is none)
+        """
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name]
+        if name not in self:
+            raise KeyError(f"No model artifact named {name!r} in {self.root}")
+
+        model = load_artifact(self.path(name))
+        with self._lock:
+            # Another thread may have loaded it meanwhile; keep the first
+            model = self._loaded.setdefault(name, model)
+            self._loaded.move_to_end(name)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return model
+
+    def evict(self, name):
+        """
+        Drop a materialized model, e.g. after its artifact was replaced
+        """
+        with self._lock:
+            self._loaded.pop(name, None)
@@ -0,0 +1,93 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+from data_collector import ALPHA_VANTAGE_URL
+
+
+class AsyncCollector:
+    def __init__(self, collector, max_workers=8, transport=None):
+        """
+        Awaitable front of a ForexDataCollector for an asyncio service
+
+        The collector's blocking work (price cache, indicators, signals) runs
+        in a bounded thread pool, while its Alpha Vantage calls are sent from
+        one httpx.AsyncClient on the event loop, as BatchForexCollector does
+        for batch downloads. The loop stays free to serve other requests, and
+        slow upstream calls of concurrent requests overlap.
+
+        Parameters:
+        -----------
+        collector : ForexDataCollector
+            Collector whose calls are made awaitable
+        max_workers : int
+            Threads for the blocking stages (default: 8)
+        transport : httpx.AsyncBaseTransport, optional
+            Custom transport for the HTTP client (e.g. httpx.MockTransport in tests)
+        """
+        self.collector = collector
+        self.max_workers = max_workers
+        self.transport = transport
+        self._loop = None
+        self._loop_thread = None
+        self._client = None
+        self._executor = None
+
+    async def start(self):
+        """
+        Open the HTTP client and worker pool, and route the collector's requests through them
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._client = http_client.async_client(transport=self.transport)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="collector")
+        self.collector._get_json = self._get_json_threadsafe
+
+    async def close(self):
+        """
+        Close the client and pool; the collector goes back to the blocking session
+        """
+        self.collector.__dict__.pop('_get_json', None)
+        if self._client is not None:
+            await self._client.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop = self._client = self._executor = None
+
+    async def request(self, params):
+        """
+        Send one Alpha Vantage query from the async client
+        """
+        response = await self._client.get(ALPHA_VANTAGE_URL, params=params)
+        return response.json()
+
+    def _get_json_threadsafe(self, params):
+        """
+        ForexDataCollector._get_json for worker threads: run request() on the loop and wait
+        """
+        loop = self._loop
+        if loop is None:
+            raise RuntimeError("AsyncCollector is not started")
+        if threading.get_ident() == self._loop_thread:
+            raise RuntimeError("Blocking collector calls cannot run on the event loop, use AsyncCollector.run")
+        return asyncio.run_coroutine_threadsafe(self.request(params), loop).result()
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a blocking function in the worker pool and await its result
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    async def fetch_forex_data(self, start_date=None, end_date=None):
+        """
+        Async version of ForexDataCollector.fetch_forex_data
+        """
+        return await self.run(self.collector.fetch_forex_data, start_date, end_date)
+
+    async def fetch_news_data(self, query=None, max_results=10):
+        """
+        Async version of ForexDataCollector.fetch_news_data
+        """
+        return await self.run(self.collector.fetch_news_data, query, max_results)
@@ -0,0 +1,212 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from model_cache import ModelCache
+from prophet_predictor import ProphetPredictor
+
+logger = logging.getLogger(__name__)
+
+METRIC_COLUMNS = ['rmse', 'mae', 'mape', 'directional_accuracy']
+FOLD_COLUMNS = ['fold', 'cutoff', 'train_start', 'train_size', 'test_size', *METRIC_COLUMNS,
+                'fit_seconds', 'predict_seconds', 'seconds', 'from_cache']
+
+# Consecutive folds chained by warm starts. Chains are the unit of work of the
+# worker processes and do not depend on their number, so neither do the metrics
+WARM_START_CHAIN = 4
+
+
+def forecast_errors(y_true, y_pred, y_origin):
+    """
+    Error metrics of one forecast
+
+    Parameters:
+    -----------
+    y_true : array-like
+        Actual prices over the horizon
+    y_pred : array-like
+        Forecast prices for the same dates
+    y_origin : float
+        Last price known at the forecast origin; directional accuracy is the
+        share of dates where the forecast and the actual price moved the same
+        way from it
+
+    Returns:
+    --------
+    dict
+        rmse, mae, mape (in percent) and directional_accuracy
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    errors = y_pred - y_true
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'mape': float(np.mean(np.abs(errors / y_true)) * 100),
+        'directional_accuracy': float(np.mean(np.sign(y_true - y_origin) == np.sign(y_pred - y_origin))),
+    }
+
+
+def _run_folds(data, folds, horizon, window, cache_dir, cache_entries, pair, timeframe, warm_start):
+    """
+    Fit and score one chain of consecutive folds (runs in a worker process)
+
+    Each fold starts the optimizer from the previous fold's fit, whose
+    training data mostly overlaps its own; the first one is fitted cold.
+    """
+    model_cache = ModelCache(cache_dir, max_entries=cache_entries, memory_entries=1) if cache_dir else None
+    predictor = ProphetPredictor(model_cache=model_cache)
+    rows, errors = [], {}
+    for fold, cutoff in folds:
+        start = time.perf_counter()
+        try:
+            train = data[data['ds'] <= cutoff]
+            if window is not None:
+                train = train[train['ds'] > cutoff - window]
+            train = train.reset_index(drop=True)
+            test = data[(data['ds'] > cutoff) & (data['ds'] <= cutoff + horizon)].reset_index(drop=True)
+
+            from_cache = predictor.train(train, pair=pair, timeframe=timeframe, warm_start=warm_start)
+            fit_seconds = time.perf_counter() - start
+            forecast = predictor.predict(test, periods=0, history=len(test), uncertainty=False)
+            predict_seconds = time.perf_counter() - start - fit_seconds
+
+            rows.append({
+                'fold': fold,
+                'cutoff': cutoff,
+                'train_start': train['ds'].iloc[0],
+                'train_size': len(train),
+                'test_size': len(test),
+                **forecast_errors(test['y'], forecast['yhat'], train['y'].iloc[-1]),
+                'fit_seconds': fit_seconds,
+                'predict_seconds': predict_seconds,
+                'seconds': time.perf_counter() - start,
+                'from_cache': from_cache,
+            })
+        except Exception as e:
+            errors[fold] = str(e)
+    return rows, errors
+
+
+class Backtester:
+    def __init__(self, initial=365, horizon=7, step=7, window=None, max_workers=None,
+                 cache_dir=None, warm_start=True):
+        """
+        Rolling-origin (walk-forward) backtest of ProphetPredictor
+
+        Cutoffs start ``initial`` days after the first date and move forward
+        by ``step`` days. Each fold trains on the data up to its cutoff and is
+        scored on the following ``horizon`` days. Folds are split into
+        chains of WARM_START_CHAIN consecutive folds, run in parallel worker
+        processes, and each fold warm-starts from the previous fit in its
+        chain. The chains are the same for any max_workers, so the results
+        are too.
+
+        Parameters:
+        -----------
+        initial : int
+            Days of data before the first cutoff (default: 365)
+        horizon : int
+            Days scored after each cutoff (default: 7)
+        step : int
+            Days between cutoffs (default: 7)
+        window : int, optional
+            Days of training data for a sliding window (default: None, an
+            expanding window from the first date)
+        max_workers : int, optional
+            Worker processes (default: the CPU count)
+        cache_dir : str, optional
+            ModelCache directory, so rerunning folds on the same training data
+            (e.g. with another horizon) reuses the fits (default: no cache)
+        warm_start : bool
+            Start each fit from the previous fold's parameters (default: True)
+        """
+        self.initial = pd.Timedelta(days=initial)
+        self.horizon = pd.Timedelta(days=horizon)
+        self.step = pd.Timedelta(days=step)
+        self.window = pd.Timedelta(days=window) if window is not None else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.warm_start = warm_start
+        self.errors = {}
+
+    def cutoffs(self, ds):
+        """
+        Forecast origins for the dates ``ds``; the last one leaves a full horizon of data
+        """
+        first, last = ds.min(), ds.max()
+        cutoffs = []
+        cutoff = first + self.initial
+        while cutoff + self.horizon <= last:
+            cutoffs.append(cutoff)
+            cutoff += self.step
+        return cutoffs
+
+    def run(self, data, pair=None, timeframe=None):
+        """
+        Backtest over every cutoff
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            Prices in any format accepted by ProphetPredictor.train
+        pair : str, optional
+            Currency pair, part of the model cache key
+        timeframe : str, optional
+            Bar interval, part of the model cache key
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per fold with its cutoff, train and test sizes, rmse, mae,
+            mape, directional_accuracy, timings in seconds and whether the fit
+            came from the cache. Failed folds are left out and listed in
+            self.errors
+        """
+        self.errors = {}
+        prophet_data = ProphetPredictor().prepare_data(data)
+        if prophet_data.empty:
+            return pd.DataFrame(columns=FOLD_COLUMNS)
+        prophet_data = prophet_data.sort_values('ds', ignore_index=True)
+
+        folds = list(enumerate(self.cutoffs(prophet_data['ds'])))
+        if not folds:
+            logger.warning("Not enough data for a single backtest fold")
+            return pd.DataFrame(columns=FOLD_COLUMNS)
+
+        # Room for every fold's fit, or a rerun would find them evicted
+        cache_entries = max(32, len(folds))
+        chunks = [np.arange(i, min(i + WARM_START_CHAIN, len(folds))) for i in range(0, len(folds), WARM_START_CHAIN)]
+        workers = min(self.max_workers, len(chunks))
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_run_folds, prophet_data, [folds[i] for i in chunk], self.horizon, self.window,
+                                self.cache_dir, cache_entries, pair, timeframe, self.warm_start)
+                for chunk in chunks
+            ]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    chunk_rows, chunk_errors = future.result()
+                    rows.extend(chunk_rows)
+                    self.errors.update(chunk_errors)
+                except Exception as e:
+                    logger.error("Error running backtest folds %s-%s: %s", chunk[0], chunk[-1], e)
+                    self.errors.update({int(i): str(e) for i in chunk})
+
+        if not rows:
+            return pd.DataFrame(columns=FOLD_COLUMNS)
+        return pd.DataFrame(rows, columns=FOLD_COLUMNS)
+
+    @staticmethod
+    def summary(results):
+        """
+        Mean metrics over the folds, with the total and mean fold time in seconds
+        """
+        summary = results[METRIC_COLUMNS].mean()
+        summary['folds'] = len(results)
+        summary['total_seconds'] = results['seconds'].sum()
+        summary['mean_fold_seconds'] = results['seconds'].mean()
+        return summary
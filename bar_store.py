@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import (MetaData, Table, Column, String, BigInteger, Float,
+                        PrimaryKeyConstraint, select, and_, func, inspect)
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class BarStore:
+    def __init__(self, engine, table_name='forex_bars'):
+        """
+        OHLC bar store keyed on (pair, interval, timestamp)
+
+        Timestamps are stored as integer epoch nanoseconds so the composite
+        primary key doubles as the range index and reads avoid per-row
+        datetime parsing.
+
+        Parameters:
+        -----------
+        engine : sqlalchemy.engine.Engine
+            Engine of the database holding the bars
+        table_name : str
+            Name of the bar table (default: "forex_bars")
+        """
+        self.engine = engine
+        self.metadata = MetaData()
+        self.table = Table(
+            table_name, self.metadata,
+            Column('pair', String(16), nullable=False),
+            Column('interval', String(16), nullable=False),
+            Column('timestamp', BigInteger, nullable=False),
+            *[Column(col.lower(), Float) for col in BAR_COLUMNS],
+            PrimaryKeyConstraint('pair', 'interval', 'timestamp', name=f'pk_{table_name}'),
+        )
+
+        existing = inspect(engine)
+        if existing.has_table(table_name):
+            columns = {col['name'] for col in existing.get_columns(table_name)}
+            if not {c.name for c in self.table.columns} <= columns:
+                raise ValueError(f"Table '{table_name}' exists but is not a bar store table")
+        self.metadata.create_all(engine)
+
+    def _insert(self, columns):
+        """
+        Dialect specific INSERT ... ON CONFLICT DO UPDATE statement for the given columns
+        """
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            return None
+
+        stmt = insert(self.table)
+        return stmt.on_conflict_do_update(
+            index_elements=['pair', 'interval', 'timestamp'],
+            set_={col.lower(): stmt.excluded[col.lower()] for col in columns}
+        )
+
+    def upsert(self, pair, interval, data):
+        """
+        Insert or replace bars, idempotent for repeated saves of the same data
+
+        Parameters:
+        -----------
+        pair : str
+            Currency pair (e.g., "EUR/USD")
+        interval : str
+            Bar interval (e.g., "Daily", "45min")
+        data : pd.DataFrame
+            Bars with a datetime index and any of the Open/High/Low/Close/Volume columns
+
+        Returns:
+        --------
+        int
+            Number of bars written
+        """
+        if data is None or data.empty:
+            return 0
+
+        # Only the columns present in data are written, so partial saves keep the rest
+        columns = [col for col in BAR_COLUMNS if col in data.columns]
+        records = {'timestamp': pd.DatetimeIndex(data.index).asi8.tolist()}
+        for col in columns:
+            values = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=float)
+            records[col.lower()] = [None if np.isnan(v) else v for v in values.tolist()]
+
+        rows = [
+            {'pair': pair, 'interval': interval, **dict(zip(records, values))}
+            for values in zip(*records.values())
+        ]
+
+        stmt = self._insert(columns)
+        with self.engine.begin() as conn:
+            if stmt is None:
+                # Generic fallback: replace the covered range inside one transaction
+                conn.execute(self.table.delete().where(and_(
+                    self.table.c.pair == pair,
+                    self.table.c.interval == interval,
+                    self.table.c.timestamp.in_(records['timestamp'])
+                )))
+                conn.execute(self.table.insert(), rows)
+            else:
+                conn.execute(stmt, rows)
+        return len(rows)
+
+    def load(self, pair, interval, start_date=None, end_date=None, columns=None):
+        """
+        Load bars for a pair and interval through the primary key index
+
+        Parameters:
+        -----------
+        pair : str
+            Currency pair (e.g., "EUR/USD")
+        interval : str
+            Bar interval (e.g., "Daily", "45min")
+        start_date, end_date : str or datetime, optional
+            Inclusive range bounds
+        columns : list of str, optional
+            Subset of Open/High/Low/Close/Volume to return (default: all)
+
+        Returns:
+        --------
+        pd.DataFrame
+            Bars sorted by time with a DatetimeIndex
+        """
+        columns = BAR_COLUMNS if columns is None else list(columns)
+        unknown = set(columns) - set(BAR_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown bar columns: {sorted(unknown)}")
+
+        conditions = [self.table.c.pair == pair, self.table.c.interval == interval]
+        if start_date is not None:
+            conditions.append(self.table.c.timestamp >= pd.Timestamp(start_date).value)
+        if end_date is not None:
+            conditions.append(self.table.c.timestamp <= pd.Timestamp(end_date).value)
+
+        stmt = (select(self.table.c.timestamp, *[self.table.c[col.lower()] for col in columns])
+                .where(and_(*conditions))
+                .order_by(self.table.c.timestamp))
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+
+        fields = list(zip(*rows)) if rows else [()] * (len(columns) + 1)
+        index = pd.DatetimeIndex(pd.to_datetime(np.array(fields[0], dtype='int64')))
+        return pd.DataFrame(
+            {col: np.array(values, dtype=float) for col, values in zip(columns, fields[1:])},
+            index=index, columns=columns
+        )
+
+    def last_timestamp(self, pair, interval):
+        """
+        Timestamp of the latest stored bar, or None when nothing is stored
+        """
+        stmt = select(func.max(self.table.c.timestamp)).where(and_(
+            self.table.c.pair == pair, self.table.c.interval == interval
+        ))
+        with self.engine.connect() as conn:
+            value = conn.execute(stmt).scalar()
+        return None if value is None else pd.Timestamp(value)
@@ -0,0 +1,193 @@
+import asyncio
+import time
+import pandas as pd
+import http_client
+from data_collector import ForexDataCollector, ALPHA_VANTAGE_URL
+
+# Alpha Vantage free tier quota
+DEFAULT_CALLS_PER_MINUTE = 5
+
+# Alpha Vantage reports throttling under "Note", or under "Information" with
+# one of these phrases; "Information" also carries invalid key and premium
+# endpoint errors, which retrying cannot fix
+THROTTLE_MESSAGES = ("rate limit", "call frequency")
+
+
+def is_throttled(data):
+    """
+    Whether an Alpha Vantage payload is a rate-limit response worth retrying
+    """
+    if "Note" in data:
+        return True
+    message = str(data.get("Information", "")).lower()
+    return any(phrase in message for phrase in THROTTLE_MESSAGES)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        Asyncio token bucket limiter
+
+        Parameters:
+        -----------
+        rate : float
+            Tokens added per second
+        capacity : int, optional
+            Maximum burst size (default: one minute worth of tokens, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate * 60))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _ScheduledCollector(ForexDataCollector):
+    """ForexDataCollector whose Alpha Vantage calls go through a BatchForexCollector"""
+
+    def __init__(self, scheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    def _get_json(self, params):
+        return self.scheduler.request_threadsafe(params)
+
+
+class BatchForexCollector:
+    def __init__(self, alpha_vantage_key=None, calls_per_minute=DEFAULT_CALLS_PER_MINUTE,
+                 max_retries=3, retry_backoff=20.0, max_workers=4, transport=None, **collector_kwargs):
+        """
+        Fetch many currency pairs and intervals within the Alpha Vantage quota
+
+        Each pair/interval keeps its own ForexDataCollector (cache, indicator
+        state). Their processing runs in worker threads while every HTTP call
+        is sent from one asyncio client, paced by a token bucket and retried
+        with exponential backoff on throttle responses.
+
+        Parameters:
+        -----------
+        alpha_vantage_key : str
+            Alpha Vantage API key (optional). If not provided, must be set in .streamlit/secrets.toml
+        calls_per_minute : int
+            Request quota per minute (default: 5, the free tier)
+        max_retries : int
+            Retries after a rate-limit response (default: 3)
+        retry_backoff : float
+            Seconds to wait before the first retry, doubled on each attempt (default: 20)
+        max_workers : int
+            Pairs processed concurrently (default: 4)
+        transport : httpx.AsyncBaseTransport, optional
+            Custom transport for the HTTP client (e.g. httpx.MockTransport in tests)
+        **collector_kwargs
+            Extra ForexDataCollector arguments (db_path, cache_dir, cache_ttl)
+        """
+        self.alpha_vantage_key = alpha_vantage_key
+        self.calls_per_minute = calls_per_minute
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_workers = max_workers
+        self.transport = transport
+        self.collector_kwargs = collector_kwargs
+        self.collectors = {}
+        self._loop = None
+        self._client = None
+        self._bucket = None
+
+    def get_collector(self, pair, interval="daily"):
+        """
+        Get (and create on first use) the collector for a pair and interval
+        """
+        key = (pair, interval)
+        if key not in self.collectors:
+            self.collectors[key] = _ScheduledCollector(
+                self, currency_pair=pair, interval=interval,
+                alpha_vantage_key=self.alpha_vantage_key, **self.collector_kwargs
+            )
+        return self.collectors[key]
+
+    async def request(self, params):
+        """
+        Send one Alpha Vantage query through the rate limiter, retrying throttled responses
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            response = await self._client.get(ALPHA_VANTAGE_URL, params=params)
+            data = response.json()
+            if not is_throttled(data) or attempt == self.max_retries:
+                return data
+            delay = self.retry_backoff * 2 ** attempt
+            print(f"Alpha Vantage throttled {params.get('from_symbol')}/{params.get('to_symbol')}, "
+                  f"retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    def request_threadsafe(self, params):
+        """
+        Run request() on the batch event loop from a worker thread and wait for the result
+        """
+        if self._loop is None:
+            raise RuntimeError("BatchForexCollector requests can only be made during fetch()")
+        return asyncio.run_coroutine_threadsafe(self.request(params), self._loop).result()
+
+    async def fetch_async(self, pairs, intervals=("daily",), start_date=None, end_date=None):
+        """
+        Async version of fetch()
+        """
+        self._loop = asyncio.get_running_loop()
+        self._bucket = TokenBucket(self.calls_per_minute / 60.0, capacity=self.calls_per_minute)
+        workers = asyncio.Semaphore(self.max_workers)
+
+        async def fetch_one(pair, interval):
+            collector = self.get_collector(pair, interval)
+            async with workers:
+                return await asyncio.to_thread(collector.fetch_forex_data, start_date, end_date)
+
+        keys = [(pair, interval) for pair in pairs for interval in intervals]
+        try:
+            async with http_client.async_client(transport=self.transport) as client:
+                self._client = client
+                frames = await asyncio.gather(*(fetch_one(*key) for key in keys), return_exceptions=True)
+        finally:
+            self._loop = None
+            self._client = None
+
+        results = {}
+        for key, frame in zip(keys, frames):
+            if isinstance(frame, Exception):
+                print(f"Error fetching {key[0]} {key[1]}: {str(frame)}")
+                frame = pd.DataFrame()
+            results[key] = frame
+        return results
+
+    def fetch(self, pairs, intervals=("daily",), start_date=None, end_date=None):
+        """
+        Fetch processed data for every pair and interval
+
+        Parameters:
+        -----------
+        pairs : list of str
+            Currency pairs in "BASE/QUOTE" format
+        intervals : list of str
+            Intervals to fetch for each pair (default: ("daily",))
+        start_date, end_date : str or datetime, optional
+            Date range, as in ForexDataCollector.fetch_forex_data
+
+        Returns:
+        --------
+        dict
+            {(pair, interval): pd.DataFrame}; failed pairs map to an empty DataFrame
+        """
+        return asyncio.run(self.fetch_async(pairs, intervals, start_date, end_date))
@@ -0,0 +1,82 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from prophet_predictor import ProphetPredictor
+
+logger = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ['pair', 'ds', 'yhat', 'yhat_lower', 'yhat_upper']
+
+
+def _forecast_pair(pair, data, prediction_horizon, periods, include_history):
+    """
+    Fit and forecast one pair (runs in a worker process)
+    """
+    predictor = ProphetPredictor(prediction_horizon=prediction_horizon)
+    predictor.train(data)
+    forecast = predictor.predict(data, periods=periods, history=None if include_history else 0)
+    forecast = forecast[FORECAST_COLUMNS[1:]].reset_index(drop=True)
+    forecast.insert(0, 'pair', pair)
+    return forecast
+
+
+class BatchForecaster:
+    def __init__(self, prediction_horizon=1, max_workers=None):
+        """
+        Fit and forecast many currency pairs in parallel
+
+        Stan fits use a single core, so each pair is fitted and forecast in
+        its own worker process. A pair that fails does not affect the others.
+
+        Parameters:
+        -----------
+        prediction_horizon : int
+            Number of periods to predict ahead (default: 1)
+        max_workers : int, optional
+            Worker processes (default: the CPU count)
+        """
+        self.prediction_horizon = prediction_horizon
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.errors = {}
+
+    def forecast(self, frames, periods=None, include_history=False):
+        """
+        Forecast every pair
+
+        Parameters:
+        -----------
+        frames : dict
+            {pair: pd.DataFrame} in any format accepted by ProphetPredictor.train
+        periods : int, optional
+            Number of periods to forecast (default: prediction_horizon)
+        include_history : bool
+            Also return the fitted values over the training data (default: False)
+
+        Returns:
+        --------
+        pd.DataFrame
+            Long-format forecasts with pair, ds, yhat, yhat_lower and yhat_upper
+            columns. Pairs that failed are left out and listed in self.errors
+        """
+        self.errors = {}
+        if not frames:
+            return pd.DataFrame(columns=FORECAST_COLUMNS)
+
+        results = []
+        workers = min(self.max_workers, len(frames))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                pair: executor.submit(_forecast_pair, pair, data, self.prediction_horizon, periods, include_history)
+                for pair, data in frames.items()
+            }
+            for pair, future in futures.items():
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error("Error forecasting %s: %s", pair, e)
+                    self.errors[pair] = str(e)
+
+        if not results:
+            return pd.DataFrame(columns=FORECAST_COLUMNS)
+        return pd.concat(results, ignore_index=True)
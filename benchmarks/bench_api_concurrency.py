@@ -0,0 +1,129 @@
+"""
+Load test the API endpoints with N parallel clients against a slow simulated Alpha Vantage.
+
+The app runs in-process behind httpx.ASGITransport, with its lifespan, and
+Alpha Vantage is an httpx.MockTransport that answers after --latency
+seconds. /historical fetches on every request: with blocking endpoints each
+request held the event loop for its upstream calls, so throughput stayed at
+one request per latency whatever the client count; now it grows with the
+clients up to the worker pool, and concurrent requests for the same range
+share one upstream call instead of making one each. /signal is served from
+the snapshot of the background refresh, so it makes no upstream call at all.
+
+Usage:
+    python -m benchmarks.bench_api_concurrency
+    python -m benchmarks.bench_api_concurrency --paths /signal --clients 1 8 32 --latency 0.3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import httpx
+import numpy as np
+import pandas as pd
+
+import data_collector
+from artifacts import ModelRegistry
+from async_collector import AsyncCollector
+from prophet_predictor import ProphetPredictor
+from signal_snapshots import SignalSnapshots
+from warmup import BackgroundWarmup
+
+# The collector reads its API key from Streamlit secrets; it is replaced below
+with mock.patch('data_collector.ForexDataCollector'):
+    import api
+
+
+def fx_daily_payload(index):
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, len(index)))
+    return {"Time Series FX (Daily)": {
+        ts.strftime("%Y-%m-%d"): {"1. open": f"{c:.5f}", "2. high": f"{c * 1.002:.5f}",
+                                  "3. low": f"{c * 0.998:.5f}", "4. close": f"{c:.5f}"}
+        for ts, c in zip(index, close)
+    }}
+
+
+def setup(model_dir, latency, calls):
+    payload = fx_daily_payload(pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=150))
+
+    async def handler(request):
+        calls.append(request.url.params['function'])
+        await asyncio.sleep(latency)
+        if request.url.params['function'] == "NEWS_SENTIMENT":
+            return httpx.Response(200, json={'feed': []})
+        return httpx.Response(200, json=payload)
+
+    collector = data_collector.ForexDataCollector(currency_pair="EUR/USD", alpha_vantage_key="bench",
+                                                  db_path="sqlite://", cache_dir=None)
+    api.data_collector = collector
+    api.async_collector = AsyncCollector(collector, transport=httpx.MockTransport(handler))
+    api.model_registry = ModelRegistry(model_dir)
+    api.model_warmup = BackgroundWarmup(api.prepare_models)
+    api.signal_snapshots = SignalSnapshots(api.compute_snapshot, [api.SIGNAL_PAIR])
+
+
+async def load(path, clients, requests_per_client, calls):
+    """Per-request latencies (s), wall time (s) and /health latency under load (s)"""
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            while api.signal_snapshots.get(api.SIGNAL_PAIR) is None:
+                await asyncio.sleep(0.01)
+            calls.clear()
+            latencies = []
+
+            async def run_client():
+                for _ in range(requests_per_client):
+                    start = time.perf_counter()
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            done = asyncio.gather(*(run_client() for _ in range(clients)))
+            await asyncio.sleep(0.05)
+            health_start = time.perf_counter()
+            await client.get("/health")
+            health = time.perf_counter() - health_start
+            await done
+            return latencies, time.perf_counter() - start, health
+
+
+def run(paths, client_counts, requests_per_client, latency):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as model_dir:
+        index = pd.date_range("2024-01-01", periods=200, freq="D")
+        close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, len(index)))
+        predictor = ProphetPredictor(prediction_horizon=1)
+        predictor.train(pd.DataFrame({'Close': close}, index=index))
+        predictor.save_model(os.path.join(model_dir, api.PROPHET_MODEL))
+
+        print(f"upstream latency {latency * 1000:.0f}ms, {requests_per_client} requests per client")
+        print(f"{'path':>12} {'clients':>8} {'req/s':>8} {'p50':>8} {'p99':>8} {'/health':>9} {'upstream':>9}")
+        for path in paths:
+            for clients in client_counts:
+                calls = []
+                setup(model_dir, latency, calls)
+                with redirect_stdout(StringIO()):  # the collector prints every fetch
+                    latencies, wall, health = asyncio.run(load(path, clients, requests_per_client, calls))
+                latencies_ms = sorted(1000 * x for x in latencies)
+                p99 = latencies_ms[min(len(latencies_ms) - 1, int(0.99 * len(latencies_ms)))]
+                print(f"{path:>12} {clients:>8} {len(latencies) / wall:>8.1f} {statistics.median(latencies_ms):>6.1f}ms "
+                      f"{p99:>6.1f}ms {health * 1000:>7.1f}ms {len(calls):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", nargs="+", default=["/historical", "/signal"])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=5, help="requests per client")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated Alpha Vantage latency (s)")
+    args = parser.parse_args()
+    run(args.paths, args.clients, args.requests, args.latency)
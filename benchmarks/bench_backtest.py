@@ -0,0 +1,54 @@
+"""
+Benchmark a rolling-origin backtest: cold vs warm-started folds, and a rerun served by the model cache.
+
+Usage:
+    python -m benchmarks.bench_backtest
+    python -m benchmarks.bench_backtest --years 5 --step 7 --workers 4
+"""
+import argparse
+import logging
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+
+
+def timed_run(backtester, data):
+    start = time.perf_counter()
+    results = backtester.run(data)
+    return results, time.perf_counter() - start
+
+
+def run(years, step, horizon, workers):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    logging.getLogger('prophet').setLevel(logging.ERROR)
+    n_days = int(years * 365.25)
+    index = pd.date_range("2015-01-01", periods=n_days, freq="D")
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, n_days))
+    data = pd.DataFrame({'Close': close}, index=index)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runs = [
+            ("cold", Backtester(horizon=horizon, step=step, max_workers=workers, warm_start=False)),
+            ("warm start", Backtester(horizon=horizon, step=step, max_workers=workers, cache_dir=cache_dir)),
+            ("cached rerun", Backtester(horizon=horizon, step=step, max_workers=workers, cache_dir=cache_dir)),
+        ]
+        print(f"{'':>13} {'folds':>6} {'wall':>9} {'mean fold':>10} {'max fold':>9} {'rmse':>8}")
+        for name, backtester in runs:
+            results, wall = timed_run(backtester, data)
+            summary = Backtester.summary(results)
+            print(f"{name:>13} {len(results):>6} {wall:>8.1f}s {summary['mean_fold_seconds']:>9.2f}s "
+                  f"{results['seconds'].max():>8.2f}s {summary['rmse']:>8.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--step", type=int, default=7)
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.years, args.step, args.horizon, args.workers)
@@ -0,0 +1,47 @@
+"""
+Benchmark BarStore upserts and indexed range reads.
+
+Usage:
+    python -m benchmarks.bench_bar_store
+    python -m benchmarks.bench_bar_store --rows 200000 --db sqlite:///bench_bars.db
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from bar_store import BarStore
+
+
+def run(n_rows, db_path):
+    store = BarStore(create_engine(db_path))
+    index = pd.date_range("2015-01-01", periods=n_rows, freq="T")
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.0002, n_rows))
+    bars = pd.DataFrame({'Open': close, 'High': close + 0.0001, 'Low': close - 0.0001,
+                         'Close': close, 'Volume': 0.0}, index=index)
+
+    start = time.perf_counter()
+    store.upsert("EUR/USD", "1min", bars)
+    print(f"upsert {n_rows} bars:          {time.perf_counter() - start:8.3f} s")
+
+    start = time.perf_counter()
+    store.upsert("EUR/USD", "1min", bars.iloc[-1000:])
+    print(f"re-upsert last 1000 bars:      {time.perf_counter() - start:8.3f} s")
+
+    for label, length in [("1 day", 1440), ("1 week", 7 * 1440)]:
+        range_start = index[n_rows // 2]
+        range_end = index[min(n_rows // 2 + length - 1, n_rows - 1)]
+        start = time.perf_counter()
+        loaded = store.load("EUR/USD", "1min", range_start, range_end, columns=['Close'])
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"range read {label:<7} ({len(loaded):>6} rows): {elapsed:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default="sqlite://")
+    args = parser.parse_args()
+    run(args.rows, args.db)
@@ -0,0 +1,49 @@
+"""
+Benchmark BatchForecaster throughput with 1, 2, 4 and 8 worker processes.
+
+Usage:
+    python -m benchmarks.bench_batch_forecast
+    python -m benchmarks.bench_batch_forecast --pairs 32 --days 1000 --workers 1 4 16
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_forecaster import BatchForecaster
+
+
+def make_frames(n_pairs, n_days):
+    index = pd.date_range("2020-01-01", periods=n_days, freq="D")
+    rng = np.random.default_rng(0)
+    return {f"PAIR{i:02d}": pd.DataFrame({'Close': 1.0 + np.cumsum(rng.normal(0, 0.003, n_days))}, index=index)
+            for i in range(n_pairs)}
+
+
+def run(n_pairs, n_days, worker_counts):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    frames = make_frames(n_pairs, n_days)
+    print(f"{n_pairs} pairs x {n_days} daily bars, {os.cpu_count()} CPUs")
+
+    baseline = None
+    for workers in worker_counts:
+        forecaster = BatchForecaster(prediction_horizon=7, max_workers=workers)
+        start = time.perf_counter()
+        forecasts = forecaster.forecast(frames)
+        elapsed = time.perf_counter() - start
+        throughput = n_pairs / elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>2} workers  {elapsed:7.2f} s   {throughput:6.2f} pairs/s   "
+              f"speedup {throughput / baseline:4.2f}x   {forecasts['pair'].nunique()} pairs ok")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", type=int, default=16)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    run(args.pairs, args.days, args.workers)
@@ -0,0 +1,73 @@
+"""
+Benchmark Prophet forecasts against the compiled NumPy artifact (cold start and latency).
+
+Usage:
+    python -m benchmarks.bench_compiled_prophet
+    python -m benchmarks.bench_compiled_prophet --days 1000 --repeats 20
+"""
+import argparse
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compiled_prophet import CompiledProphetPredictor
+from prophet_predictor import ProphetPredictor
+
+
+def cold_start(code):
+    """Seconds for a fresh interpreter to run ``code``"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def time_predict(predictor, data, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictor.predict(data, history=0)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def run(days, repeats):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    index = pd.date_range("2000-01-01", periods=days, freq="D")
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, days))
+    data = pd.DataFrame({'Close': close}, index=index)
+    predictor = ProphetPredictor(prediction_horizon=1)
+    predictor.train(data)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        joblib_path = os.path.join(tmp_dir, "prophet_model.joblib")
+        npz_path = os.path.join(tmp_dir, "prophet_model.npz")
+        joblib.dump(predictor.model, joblib_path)
+        predictor.export_compiled(npz_path)
+        compiled = CompiledProphetPredictor.load(npz_path)
+
+        prophet_start = cold_start(f"import joblib; joblib.load({joblib_path!r})")
+        compiled_start = cold_start(
+            f"from compiled_prophet import CompiledProphetPredictor; CompiledProphetPredictor.load({npz_path!r})"
+        )
+        print(f"artifact size: joblib {os.path.getsize(joblib_path) / 1024:.0f} KiB, "
+              f"npz {os.path.getsize(npz_path) / 1024:.0f} KiB")
+
+    print(f"{'':>10} {'cold start':>12} {'forecast':>10}")
+    print(f"{'prophet':>10} {prophet_start:>11.2f}s {time_predict(predictor, data, repeats):>8.1f}ms")
+    print(f"{'compiled':>10} {compiled_start:>11.2f}s {time_predict(compiled, data, repeats):>8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+    run(args.days, args.repeats)
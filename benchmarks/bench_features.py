@@ -0,0 +1,60 @@
+"""
+Benchmark feature generation: ta.add_all_ta_features vs the feature registry, full history and last row.
+
+Usage:
+    python -m benchmarks.bench_features
+    python -m benchmarks.bench_features --lengths 1000 5000 --repeats 10
+"""
+import argparse
+import statistics
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from ta import add_all_ta_features
+
+from features import DEFAULT_FEATURES, compute_features, compute_latest_features
+
+
+def ohlc_frame(n_rows):
+    rng = np.random.default_rng(0)
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 0.005, n_rows)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.001, n_rows)),
+        'High': close * 1.003,
+        'Low': close * 0.997,
+        'Close': close,
+        # add_all_ta_features needs a volume column even though FX has none
+        'Volume': np.ones(n_rows),
+    }, index=pd.date_range("2000-01-01", periods=n_rows, freq="D"))
+
+
+def time_call(func, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def run(lengths, repeats):
+    warnings.simplefilter("ignore")
+    print(f"{len(DEFAULT_FEATURES)} registry features")
+    print(f"{'rows':>7} {'ta (all)':>10} {'registry':>10} {'last row':>10} {'speedup':>8}")
+    for n_rows in lengths:
+        data = ohlc_frame(n_rows)
+        ta_ms = time_call(lambda: add_all_ta_features(data.copy(), open="Open", high="High", low="Low",
+                                                      close="Close", volume="Volume", fillna=True), repeats)
+        full_ms = time_call(lambda: compute_features(data), repeats)
+        last_ms = time_call(lambda: compute_latest_features(data), repeats)
+        print(f"{n_rows:>7} {ta_ms:>8.1f}ms {full_ms:>8.1f}ms {last_ms:>8.1f}ms {ta_ms / full_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.lengths, args.repeats)
@@ -0,0 +1,49 @@
+"""
+Benchmark full-history Prophet predictions against forecast-only predictions.
+
+Usage:
+    python -m benchmarks.bench_forecast_only
+    python -m benchmarks.bench_forecast_only --lengths 500 5000 --repeats 10
+"""
+import argparse
+import logging
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from prophet_predictor import ProphetPredictor
+
+
+def time_predict(predictor, data, repeats, **kwargs):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictor.predict(data, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def run(lengths, repeats):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    print(f"{'history':>8} {'full':>10} {'horizon':>10} {'horizon, no intervals':>22}")
+    for n_days in lengths:
+        index = pd.date_range("2000-01-01", periods=n_days, freq="D")
+        close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, n_days))
+        data = pd.DataFrame({'Close': close}, index=index)
+        predictor = ProphetPredictor(prediction_horizon=1)
+        predictor.train(data)
+
+        full = time_predict(predictor, data, repeats)
+        horizon = time_predict(predictor, data, repeats, history=0)
+        point = time_predict(predictor, data, repeats, history=0, uncertainty=False)
+        print(f"{n_days:>8} {full:>8.1f}ms {horizon:>8.1f}ms {point:>20.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[250, 1000, 2500, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.lengths, args.repeats)
@@ -0,0 +1,127 @@
+"""
+Benchmark the streaming HistData backfill against the previous sequential parse.
+
+A local HTTP server serves one synthetic 1-minute CSV per month (with an
+optional per-request latency standing in for the HistData round trip).
+Peak memory is the tracemalloc peak of the Python and NumPy allocations.
+
+Usage:
+    python -m benchmarks.bench_histdata
+    python -m benchmarks.bench_histdata --year 2023 --latency 0.5 --workers 8
+"""
+import argparse
+import threading
+import time
+import tracemalloc
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import data_collector
+import http_client
+from data_collector import ForexDataCollector
+
+
+def make_month_files(year):
+    """Synthetic 1-minute CSV bodies for every month of a year (weekdays only)"""
+    index = pd.date_range(f"{year}-01-01", f"{year}-12-31 23:59", freq="T")
+    index = index[index.dayofweek < 5]
+    close = 1.10 + np.cumsum(np.random.default_rng(year).normal(0, 1e-4, len(index)))
+    frame = pd.DataFrame({'DateTime': index.strftime("%Y-%m-%d %H:%M:%S"),
+                          'Open': close, 'High': close + 1e-4, 'Low': close - 1e-4,
+                          'Close': close, 'Volume': 0.0})
+    return {f"{month:02d}": group.to_csv(header=False, index=False, float_format="%.5f").encode()
+            for month, group in frame.groupby(index.month)}
+
+
+def make_handler(files, latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = files.get(self.path.rstrip('/').split('/')[-1])
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def legacy_fetch(pair, start_date, end_date):
+    """The previous implementation: sequential months, whole-text parse, concat, resample"""
+    months = []
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        months.append(current)
+        current = (current + pd.Timedelta(days=32)).replace(day=1)
+
+    all_data = []
+    for date in months:
+        url = data_collector.HISTDATA_URL.format(pair=pair, year=date.strftime("%Y"), month=date.strftime("%m"))
+        response = http_client.get(url)
+        if response.status_code == 200:
+            df = pd.read_csv(StringIO(response.text),
+                             names=['DateTime', 'Open', 'High', 'Low', 'Close', 'Volume'],
+                             parse_dates=['DateTime'])
+            all_data.append(df[(df['DateTime'] >= start_date) & (df['DateTime'] <= end_date)])
+
+    data = pd.concat(all_data).set_index('DateTime')
+    return data.resample('45T').agg(data_collector.OHLCV_AGG).dropna().reset_index()
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<22} {elapsed:7.2f} s   peak {peak / 2**20:8.1f} MiB   {len(result)} bars")
+    return result
+
+
+def run(year, latency, workers):
+    files = make_month_files(year)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(files, latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    data_collector.HISTDATA_URL = (f"http://127.0.0.1:{server.server_address[1]}"
+                                   "/{pair}_ASCII/1_MINUTE_QUOTES/{year}/{month}")
+
+    start_date, end_date = pd.Timestamp(f"{year}-01-01"), pd.Timestamp(f"{year}-12-31 23:59")
+    collector = ForexDataCollector(interval="45min", alpha_vantage_key="bench", db_path="sqlite://",
+                                   cache_dir=None)
+    print(f"{sum(len(body) for body in files.values()) / 2**20:.0f} MiB of 1-minute CSV, "
+          f"{latency * 1000:.0f} ms latency per month")
+
+    try:
+        legacy = measure("sequential, in memory", lambda: legacy_fetch("EURUSD", start_date, end_date))
+        streamed = measure(f"streaming, {workers} workers",
+                           lambda: collector._fetch_histdata_minute_data(start_date, end_date, max_workers=workers))
+    finally:
+        server.shutdown()
+
+    pd.testing.assert_frame_equal(legacy, streamed, check_freq=False)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--year", type=int, default=2023)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--workers", type=int, default=data_collector.HISTDATA_WORKERS)
+    args = parser.parse_args()
+    run(args.year, args.latency, args.workers)
@@ -0,0 +1,113 @@
+"""
+Benchmark connection pooling and gzip separately against one-off requests.get calls.
+
+A local keep-alive HTTP server stands in for Alpha Vantage. Each simulated
+/signal call makes the two upstream requests the endpoint makes (FX_DAILY
+and NEWS_SENTIMENT). Every combination of one-off/pooled connections and
+identity/gzip encoding is timed, so each saving is measured with the other
+setting held fixed. Over the internet the pooling saving is larger, since
+every new connection to Alpha Vantage also pays a TLS handshake and a round
+trip, and so is the gzip saving, since the payload crosses a real network.
+
+Usage:
+    python -m benchmarks.bench_http_pool
+    python -m benchmarks.bench_http_pool --calls 500 --payload-kb 64
+"""
+import argparse
+import gzip
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import http_client
+
+
+def make_handler(payload):
+    compressed = gzip.compress(payload)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            body = payload
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = compressed
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def signal_call(get, base_url):
+    """The two upstream requests made by one /signal call"""
+    get(f"{base_url}/query", params={"function": "FX_DAILY"}).json()
+    get(f"{base_url}/query", params={"function": "NEWS_SENTIMENT"}).json()
+
+
+def time_calls(get, base_url, n_calls):
+    latencies = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        signal_call(get, base_url)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(n_calls, payload_kb):
+    series = {f"2020-01-{i % 28 + 1:02d}-{i}": {"1. open": "1.10000", "4. close": "1.10010"}
+              for i in range(payload_kb * 1024 // 60)}
+    payload = json.dumps({"Time Series FX (Daily)": series}).encode()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(payload))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def one_off(encoding):
+        return lambda url, params: requests.get(url, params=params, headers={"Accept-Encoding": encoding})
+
+    def pooled(encoding):
+        return lambda url, params: http_client.get(url, params=params, headers={"Accept-Encoding": encoding})
+
+    configs = {
+        ("one-off", "identity"): one_off("identity"),
+        ("one-off", "gzip"): one_off("gzip"),
+        ("pooled", "identity"): pooled("identity"),
+        ("pooled", "gzip"): pooled("gzip"),
+    }
+    try:
+        signal_call(http_client.get, base_url)  # warm up the pool
+        results = {config: time_calls(get, base_url, n_calls) for config, get in configs.items()}
+    finally:
+        server.shutdown()
+
+    print(f"payload {len(payload) / 1024:.0f} KB, {n_calls} simulated /signal calls (2 requests each)")
+    for (connections, encoding), latencies in results.items():
+        label = f"{connections}, {encoding}"
+        print(f"{label:<20} mean {statistics.mean(latencies):7.2f} ms   "
+              f"p50 {statistics.median(latencies):7.2f} ms   p95 {sorted(latencies)[int(0.95 * len(latencies))]:7.2f} ms")
+
+    mean = {config: statistics.mean(latencies) for config, latencies in results.items()}
+    print("saved per /signal call:")
+    for encoding in ["identity", "gzip"]:
+        print(f"  pooling, {encoding:<9} {mean['one-off', encoding] - mean['pooled', encoding]:7.2f} ms")
+    for connections in ["one-off", "pooled"]:
+        print(f"  gzip, {connections:<12} {mean[connections, 'identity'] - mean[connections, 'gzip']:7.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--payload-kb", type=int, default=256)
+    args = parser.parse_args()
+    run(args.calls, args.payload_kb)
@@ -0,0 +1,107 @@
+"""
+Benchmark joblib model pickles against artifact directories (size, cold load, lazy registry).
+
+Usage:
+    python -m benchmarks.bench_model_artifacts
+    python -m benchmarks.bench_model_artifacts --days 2000 --pairs 100
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from artifacts import ModelRegistry
+from prophet_predictor import ProphetPredictor
+
+
+def cold_load(setup, code):
+    """Milliseconds a fresh interpreter takes to run ``code``, after ``setup`` (the imports)"""
+    script = f"{setup}\nimport time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    env = dict(os.environ, ALPHA_VANTAGE_API_KEY='benchmark')
+    result = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True, env=env)
+    return float(result.stdout.split()[-1]) * 1000
+
+
+def size_kib(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024
+
+
+def ohlc(days):
+    index = pd.date_range("2000-01-01", periods=days, freq="D")
+    close = 1.10 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.004, days)))
+    return pd.DataFrame({'Open': close, 'High': close * 1.003, 'Low': close * 0.997, 'Close': close}, index=index)
+
+
+def run(days, pairs, n_trials):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    data = ohlc(days)
+    prophet = ProphetPredictor(prediction_horizon=1)
+    prophet.train(data)
+
+    os.environ.setdefault('ALPHA_VANTAGE_API_KEY', 'benchmark')
+    from forex_predictor import ForexPredictor
+    forex = ForexPredictor()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        forex.train(data, n_trials=n_trials, storage=None)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rows = []
+        # Modules imported before the timed load: both formats need the model libraries
+        for name, module, predictor, legacy in [
+            ('prophet', 'prophet_predictor', prophet, prophet.model),
+            ('lightgbm', 'forex_predictor', forex,
+             {'model': forex.model, 'scaler': forex.scaler, 'features': forex.feature_names}),
+        ]:
+            joblib_path = os.path.join(tmp_dir, f"{name}.joblib")
+            artifact_path = os.path.join(tmp_dir, name)
+            joblib.dump(legacy, joblib_path)
+            predictor.save_model(artifact_path)
+            rows.append((name, size_kib(joblib_path), size_kib(artifact_path),
+                         cold_load(f"import joblib, {module}", f"joblib.load({joblib_path!r})"),
+                         cold_load(f"import {module}; from artifacts import load_artifact",
+                                   f"load_artifact({artifact_path!r})")))
+
+        print(f"{'':>10} {'joblib':>10} {'artifact':>10} {'joblib load':>12} {'artifact load':>14}")
+        for name, joblib_size, artifact_size, joblib_load, artifact_load in rows:
+            print(f"{name:>10} {joblib_size:>6.0f} KiB {artifact_size:>6.0f} KiB "
+                  f"{joblib_load:>10.1f}ms {artifact_load:>12.1f}ms")
+
+        # Many pairs in one registry: listing is free, models load on first use
+        root = os.path.join(tmp_dir, "registry")
+        for i in range(pairs):
+            shutil.copytree(os.path.join(tmp_dir, 'prophet'), os.path.join(root, f"pair{i:03d}"))
+        start = time.perf_counter()
+        registry = ModelRegistry(root)
+        names = registry.names()
+        list_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        registry.get(names[0])
+        first_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(1000):
+            registry.get(names[0])
+        hit_us = (time.perf_counter() - start) * 1000
+
+    print(f"\nregistry of {pairs} models: list {list_ms:.1f}ms, first get {first_ms:.2f}ms, "
+          f"cached get {hit_us:.1f}us, materialized {len(registry.loaded())}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--n-trials", type=int, default=5)
+    args = parser.parse_args()
+    run(args.days, args.pairs, args.n_trials)
@@ -0,0 +1,45 @@
+"""
+Benchmark ProphetPredictor.train with a cold fit against model cache hits.
+
+Usage:
+    python -m benchmarks.bench_model_cache
+    python -m benchmarks.bench_model_cache --days 1000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_cache import ModelCache
+from prophet_predictor import ProphetPredictor
+
+
+def timed_train(predictor, data):
+    start = time.perf_counter()
+    from_cache = predictor.train(data, pair="EUR/USD", timeframe="daily")
+    return (time.perf_counter() - start) * 1000, from_cache
+
+
+def run(n_days):
+    index = pd.date_range("2020-01-01", periods=n_days, freq="D")
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, n_days))
+    data = pd.DataFrame({'ds': index, 'y': close})
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        predictor = ProphetPredictor(model_cache=ModelCache(cache_dir))
+        for label, current in [
+            ("cold fit", predictor),
+            ("memory hit", predictor),
+            ("disk hit (new process)", ProphetPredictor(model_cache=ModelCache(cache_dir))),
+        ]:
+            elapsed, from_cache = timed_train(current, data)
+            print(f"{label:<24} {elapsed:9.1f} ms   cached={from_cache}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=730)
+    args = parser.parse_args()
+    run(args.days)
@@ -0,0 +1,70 @@
+"""
+Benchmark ForexPredictor single-bar online inference against predict() on a history window.
+
+Usage:
+    python -m benchmarks.bench_online_inference
+    python -m benchmarks.bench_online_inference --history 2000 --bars 5000
+"""
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from forex_predictor import ForexPredictor
+
+
+def ohlc_frame(n_rows):
+    rng = np.random.default_rng(0)
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 0.005, n_rows)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.001, n_rows)),
+        'High': close * (1 + np.abs(rng.normal(0, 0.002, n_rows))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.002, n_rows))),
+        'Close': close,
+    }, index=pd.date_range("2000-01-01", periods=n_rows, freq="D"))
+
+
+def percentiles(latencies):
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def run(n_history, n_bars, n_trials):
+    # No data is fetched, but the constructor requires a key
+    os.environ.setdefault('ALPHA_VANTAGE_API_KEY', 'benchmark')
+    data = ohlc_frame(n_history + n_bars)
+    history, stream = data.iloc[:n_history], data.iloc[n_history:]
+    predictor = ForexPredictor()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        predictor.train(history, n_trials=n_trials, storage=None)
+
+    window = []
+    for end in range(n_history + 1, n_history + min(n_bars, 200) + 1):
+        start = time.perf_counter()
+        predictor.predict(data.iloc[:end])
+        window.append(time.perf_counter() - start)
+
+    predictor.warm_up(history)
+    online = []
+    for bar in stream[['Open', 'High', 'Low', 'Close']].itertuples(index=False):
+        start = time.perf_counter()
+        predictor.predict_bar(*bar)
+        online.append(time.perf_counter() - start)
+
+    print(f"{'':>12} {'p50':>9} {'p99':>9}")
+    for name, latencies in [("predict()", window), ("predict_bar", online)]:
+        p50, p99 = percentiles(latencies)
+        print(f"{name:>12} {p50:>7.3f}ms {p99:>7.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", type=int, default=1500)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--trials", type=int, default=10)
+    args = parser.parse_args()
+    run(args.history, args.bars, args.trials)
@@ -0,0 +1,63 @@
+"""
+Benchmark cold against warm-started Prophet refits on rolling daily data.
+
+Each step appends one daily bar and refits twice: from scratch, and
+warm-started from the previous warm model. Drift is the largest gap between
+the two next-day forecasts, in pips.
+
+Usage:
+    python -m benchmarks.bench_prophet_warm_start
+    python -m benchmarks.bench_prophet_warm_start --days 1500 --refits 20
+"""
+import argparse
+import logging
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from prophet_predictor import ProphetPredictor
+
+PIP = 1e-4
+
+
+def timed_train(predictor, data, warm_start):
+    start = time.perf_counter()
+    predictor.train(data, warm_start=warm_start)
+    return time.perf_counter() - start
+
+
+def next_day_forecast(predictor, data):
+    future = pd.DataFrame({'ds': [data['ds'].iloc[-1] + pd.Timedelta(days=1)]})
+    return float(predictor.model.predict(future)['yhat'].iloc[0])
+
+
+def run(n_days, n_refits):
+    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+    index = pd.date_range("2018-01-01", periods=n_days + n_refits, freq="D")
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, len(index)))
+    series = pd.DataFrame({'ds': index, 'y': close})
+
+    cold, warm = ProphetPredictor(), ProphetPredictor()
+    timed_train(warm, series.iloc[:n_days], warm_start=False)
+
+    cold_times, warm_times, drift = [], [], []
+    for step in range(1, n_refits + 1):
+        data = series.iloc[:n_days + step]
+        cold_times.append(timed_train(cold, data, warm_start=False))
+        warm_times.append(timed_train(warm, data, warm_start=True))
+        drift.append(abs(next_day_forecast(cold, data) - next_day_forecast(warm, data)) / PIP)
+
+    print(f"{n_refits} rolling refits on {n_days}+ daily bars")
+    print(f"cold fit   mean {statistics.mean(cold_times) * 1000:8.1f} ms   median {statistics.median(cold_times) * 1000:8.1f} ms")
+    print(f"warm fit   mean {statistics.mean(warm_times) * 1000:8.1f} ms   median {statistics.median(warm_times) * 1000:8.1f} ms")
+    print(f"forecast drift  mean {statistics.mean(drift):.3f} pips   max {max(drift):.3f} pips")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--refits", type=int, default=10)
+    args = parser.parse_args()
+    run(args.days, args.refits)
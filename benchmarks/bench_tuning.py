@@ -0,0 +1,68 @@
+"""
+Benchmark ForexPredictor hyperparameter tuning with and without pruning and parallel trials.
+
+Usage:
+    python -m benchmarks.bench_tuning
+    python -m benchmarks.bench_tuning --days 3000 --trials 100 --jobs 1 4
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import optuna
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from forex_predictor import ForexPredictor
+
+
+def make_sets(n_days):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2010-01-01", periods=n_days, freq="D")
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 0.005, n_days)))
+    data = pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.001, n_days)),
+        'High': close * 1.003,
+        'Low': close * 0.997,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n_days).astype(float),
+    }, index=index)
+    # No data is fetched, but the constructor requires a key
+    os.environ.setdefault('ALPHA_VANTAGE_API_KEY', 'benchmark')
+    predictor = ForexPredictor()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        X, y = predictor.prepare_data(predictor.create_features(data))
+    X_temp, _, y_temp, _ = train_test_split(X, y, test_size=0.2, shuffle=False)
+    X_train, X_val, y_train, y_val = train_test_split(X_temp, y_temp, test_size=0.25, shuffle=False)
+    return predictor, (X_train, y_train, X_val, y_val)
+
+
+def run(n_days, n_trials, jobs):
+    predictor, sets = make_sets(n_days)
+    configs = [("none", 1)] + [(pruner, n_jobs) for pruner in ("median", "hyperband") for n_jobs in jobs]
+    print(f"{'pruner':>10} {'jobs':>5} {'seconds':>9} {'pruned':>7} {'best l2':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = f"sqlite:///{os.path.join(tmp_dir, 'optuna.db')}"
+        for i, (pruner, n_jobs) in enumerate(configs):
+            study_name = f"bench_{i}"
+            start = time.perf_counter()
+            predictor.optimize_hyperparameters(*sets, n_trials=n_trials, n_jobs=n_jobs,
+                                               pruner=None if pruner == "none" else pruner,
+                                               storage=storage, study_name=study_name)
+            seconds = time.perf_counter() - start
+            study = optuna.load_study(study_name=study_name, storage=storage)
+            pruned = sum(t.state == optuna.trial.TrialState.PRUNED for t in study.trials)
+            print(f"{pruner:>10} {n_jobs:>5} {seconds:>8.1f}s {pruned:>7} {study.best_value:>12.3e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=2000)
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+    run(args.days, args.trials, args.jobs)
@@ -0,0 +1,263 @@
+import json
+import numpy as np
+import pandas as pd
+
+ARTIFACT_VERSION = 1
+
+# Seconds per day, the unit of Prophet's Fourier series time axis
+DAY_SECONDS = 24 * 60 * 60
+
+
+def prophet_arrays(model, prediction_horizon=1):
+    """
+    Fitted parameters of a Prophet model as plain NumPy arrays
+
+    Only what inference needs is kept: scaling, trend changepoints and rates,
+    Fourier coefficients of each seasonality and the noise scale. Models with
+    holidays, extra regressors, conditional seasonalities or logistic growth
+    are not supported.
+
+    Parameters:
+    -----------
+    model : Prophet
+        A fitted Prophet model
+    prediction_horizon : int
+        Default number of periods for CompiledProphetPredictor.predict (default: 1)
+
+    Returns:
+    --------
+    tuple
+        (meta, arrays): JSON-serializable settings and {name: np.ndarray}
+    """
+    if model.history is None:
+        raise ValueError("The Prophet model has not been fitted")
+    if model.growth not in ('linear', 'flat'):
+        raise ValueError(f"Unsupported growth for export: {model.growth}")
+    if model.extra_regressors or model.holidays is not None or model.country_holidays is not None:
+        raise ValueError("Models with holidays or extra regressors cannot be exported")
+    if any(props['condition_name'] is not None for props in model.seasonalities.values()):
+        raise ValueError("Models with conditional seasonalities cannot be exported")
+
+    # Column layout of the seasonal features, in the order Prophet builds them
+    _, _, component_cols, _ = model.make_all_seasonality_features(model.history)
+    seasonalities = [
+        {'name': name, 'period': float(props['period']), 'fourier_order': int(props['fourier_order'])}
+        for name, props in model.seasonalities.items()
+    ]
+    n_features = sum(2 * s['fourier_order'] for s in seasonalities)
+    beta = np.asarray(model.params['beta'], dtype=float)
+    if beta.shape[1] != n_features:
+        raise ValueError(f"Expected {n_features} seasonal coefficients, got {beta.shape[1]}")
+
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'growth': model.growth,
+        'seasonalities': seasonalities,
+        'interval_width': float(model.interval_width),
+        'uncertainty_samples': int(model.uncertainty_samples or 0),
+        'prediction_horizon': int(prediction_horizon),
+    }
+    floor = float(model.y_min) if getattr(model, 'scaling', 'absmax') == 'minmax' else 0.0
+    arrays = {
+        'start_ns': np.int64(model.start.value),
+        't_scale_ns': np.int64(model.t_scale.value),
+        'y_scale': np.float64(model.y_scale),
+        'floor': np.float64(floor),
+        'changepoints_t': np.asarray(model.changepoints_t, dtype=float),
+        'k': np.asarray(model.params['k'], dtype=float).reshape(-1),
+        'm': np.asarray(model.params['m'], dtype=float).reshape(-1),
+        'delta': np.asarray(model.params['delta'], dtype=float),
+        'beta': beta,
+        'sigma_obs': np.asarray(model.params['sigma_obs'], dtype=float).reshape(-1),
+        'additive': component_cols['additive_terms'].to_numpy(dtype=float),
+        'multiplicative': component_cols['multiplicative_terms'].to_numpy(dtype=float),
+        'history_t_step': np.float64(np.diff(model.history['t']).mean()),
+    }
+    return meta, {name: np.asarray(value) for name, value in arrays.items()}
+
+
+def export_prophet(model, path, prediction_horizon=1):
+    """
+    Export the fitted parameters of a Prophet model to a single .npz file
+
+    See prophet_arrays for what is kept. ProphetPredictor.save_model writes
+    the same arrays as a memory-mappable directory through artifacts.write_artifact.
+    """
+    meta, arrays = prophet_arrays(model, prediction_horizon)
+    np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def piecewise_linear(t, deltas, k, m, changepoints_t):
+    """
+    Piecewise linear trend, as Prophet.piecewise_linear
+    """
+    deltas_t = (changepoints_t[None, :] <= t[..., None]) * deltas
+    k_t = deltas_t.sum(axis=1) + k
+    m_t = (deltas_t * -changepoints_t).sum(axis=1) + m
+    return k_t * t + m_t
+
+
+class CompiledProphetPredictor:
+    def __init__(self, meta, arrays):
+        """
+        Prophet inference in vectorized NumPy, from exported Prophet parameters
+
+        Use CompiledProphetPredictor.load(path) for an .npz export, or
+        artifacts.load_artifact for an artifact directory. Point forecasts
+        match Prophet.predict; the intervals are drawn from the same
+        generative model with their own random numbers.
+
+        Parameters:
+        -----------
+        meta : dict
+            Settings, as returned by prophet_arrays
+        arrays : mapping
+            Arrays, as returned by prophet_arrays (memory-mapped ones are fine)
+        """
+        self.meta = meta
+        if self.meta.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported compiled model version: {self.meta.get('version')}")
+        for name in ['start_ns', 't_scale_ns', 'y_scale', 'floor', 'changepoints_t', 'k', 'm', 'delta',
+                     'beta', 'sigma_obs', 'additive', 'multiplicative', 'history_t_step']:
+            setattr(self, name, arrays[name])
+        self.prediction_horizon = self.meta['prediction_horizon']
+        self.uncertainty_samples = self.meta['uncertainty_samples']
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an .npz file written by export_prophet
+        """
+        with np.load(path) as arrays:
+            return cls(json.loads(str(arrays['meta'])), {name: arrays[name] for name in arrays.files if name != 'meta'})
+
+    def _seasonal_features(self, ds):
+        t = (ds.astype('datetime64[ns]').astype(np.int64) / 1e9) / DAY_SECONDS
+        columns = []
+        for seasonality in self.meta['seasonalities']:
+            x = 2 * np.pi * t / seasonality['period']
+            for order in range(1, seasonality['fourier_order'] + 1):
+                columns.append(np.sin(order * x))
+                columns.append(np.cos(order * x))
+        if not columns:
+            return np.zeros((len(ds), 0))
+        return np.column_stack(columns)
+
+    def _trend(self, t, iteration=None):
+        if iteration is None:
+            k, m, deltas = np.nanmean(self.k), np.nanmean(self.m), np.nanmean(self.delta, axis=0)
+        else:
+            k, m, deltas = self.k[iteration], self.m[iteration], self.delta[iteration]
+        if self.meta['growth'] == 'flat':
+            return m * np.ones_like(t)
+        return piecewise_linear(t, deltas, k, m, self.changepoints_t)
+
+    def _trend_uncertainty(self, t, n_samples, iteration, rng):
+        """
+        Random future trend changes, as Prophet._sample_uncertainty for linear growth
+        """
+        future = t > 1
+        uncertainties = np.zeros((n_samples, len(t)))
+        if self.meta['growth'] == 'flat' or not future.any():
+            return uncertainties
+
+        n_future = int(future.sum())
+        step = np.diff(t[future]).mean() if n_future > 1 else float(self.history_t_step)
+        likelihood = len(self.changepoints_t) * step
+        mean_delta = np.mean(np.abs(self.delta[iteration])) + 1e-8
+
+        changes = rng.uniform(size=(n_samples, n_future)) < likelihood
+        shifts = rng.laplace(0, mean_delta, size=changes.shape) * changes
+        shifts = (np.hstack([np.zeros((n_samples, 1)), shifts])[:, :-1] + shifts) / 2
+        uncertainties[:, future] = shifts.cumsum(axis=1).cumsum(axis=1) * step
+        return uncertainties
+
+    def predict_dates(self, ds, uncertainty=True, seed=None):
+        """
+        Forecast the given dates
+
+        Parameters:
+        -----------
+        ds : array-like of datetimes
+            Dates to forecast
+        uncertainty : bool
+            Compute the yhat and trend intervals (default: True)
+        seed : int, optional
+            Seed of the interval sampling
+
+        Returns:
+        --------
+        pd.DataFrame
+            ds, trend, additive_terms, multiplicative_terms and yhat columns
+            (plus the *_lower/*_upper intervals), sorted by ds like Prophet
+        """
+        ds = np.sort(pd.DatetimeIndex(ds).to_numpy())
+        t = (ds.astype(np.int64) - self.start_ns) / float(self.t_scale_ns)
+        X = self._seasonal_features(ds)
+
+        beta = np.nanmean(self.beta, axis=0)
+        additive = X @ (beta * self.additive) * self.y_scale
+        multiplicative = X @ (beta * self.multiplicative)
+        trend = self._trend(t) * self.y_scale + self.floor
+
+        forecast = {'ds': ds, 'trend': trend}
+        if uncertainty and self.uncertainty_samples:
+            forecast.update(self._intervals(t, X, seed))
+        forecast['additive_terms'] = additive
+        forecast['multiplicative_terms'] = multiplicative
+        forecast['yhat'] = trend * (1 + multiplicative) + additive
+        return pd.DataFrame(forecast)
+
+    def _intervals(self, t, X, seed):
+        """
+        yhat and trend intervals from simulated trends and observation noise
+        """
+        rng = np.random.default_rng(seed)
+        n_iterations = len(self.k)
+        per_iteration = max(1, int(np.ceil(self.uncertainty_samples / n_iterations)))
+        yhat_samples, trend_samples = [], []
+        for i in range(n_iterations):
+            additive = X @ (self.beta[i] * self.additive) * self.y_scale
+            multiplicative = X @ (self.beta[i] * self.multiplicative)
+            trends = (self._trend(t, i) + self._trend_uncertainty(t, per_iteration, i, rng)) * self.y_scale + self.floor
+            noise = rng.normal(0, self.sigma_obs[i], trends.shape) * self.y_scale
+            yhat_samples.append(trends * (1 + multiplicative) + additive + noise)
+            trend_samples.append(trends)
+
+        lower = 100 * (1.0 - self.meta['interval_width']) / 2
+        upper = 100 * (1.0 + self.meta['interval_width']) / 2
+        intervals = {}
+        for name, samples in [('yhat', np.vstack(yhat_samples)), ('trend', np.vstack(trend_samples))]:
+            intervals[f'{name}_lower'] = np.percentile(samples, lower, axis=0)
+            intervals[f'{name}_upper'] = np.percentile(samples, upper, axis=0)
+        return intervals
+
+    def predict(self, data, periods=None, history=None, uncertainty=True):
+        """
+        Forecast after the last date of data, like ProphetPredictor.predict
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            DataFrame with a 'ds' column or a datetime index
+        periods : int
+            Number of daily periods to forecast ahead (default: prediction_horizon)
+        history : int, optional
+            Number of trailing historical dates to include (default: None, all)
+        uncertainty : bool
+            Compute yhat_lower/yhat_upper (default: True)
+        """
+        if periods is None:
+            periods = self.prediction_horizon
+        ds = pd.DatetimeIndex(pd.to_datetime(data['ds'] if 'ds' in data.columns else data.index))
+        if ds.tz is not None:
+            ds = ds.tz_localize(None)
+        ds = ds[~ds.isna()]
+        future = pd.date_range(start=ds.max() + pd.Timedelta(days=1), periods=periods, freq='D')
+        if history is None:
+            dates = ds.append(future)
+        elif history > 0:
+            dates = ds.sort_values()[-history:].append(future)
+        else:
+            dates = future
+        return self.predict_dates(dates, uncertainty=uncertainty)
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
+import http_client
 from datetime import datetime, timedelta
 import json
 
@@ -19,7 +19,7 @@ API_URL = "http://localhost:8000"
 def fetch_trading_signal():
     """Fetch latest trading signal from API"""
     try:
-        response = requests.get(f"{API_URL}/signal")
+        response = http_client.get(f"{API_URL}/signal")
         return response.json()
     except Exception as e:
         st.error(f"Error fetching trading signal: {str(e)}")
@@ -28,7 +28,7 @@ def fetch_trading_signal():
 def fetch_historical_data(days=30):
     """Fetch historical data from API"""
     try:
-        response = requests.get(f"{API_URL}/historical", params={"days": days})
+        response = http_client.get(f"{API_URL}/historical", params={"days": days})
         data = response.json()
         
         # Check if response is empty or invalid
@@ -1,16 +1,109 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from ta.trend import SMAIndicator, EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange, BollingerBands
 from sqlalchemy import create_engine
 import os
-import requests
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
 import streamlit as st
+import http_client
+from indicator_state import IncrementalIndicators, INDICATOR_COLUMNS
+from bar_store import BarStore
+from price_cache import PriceCache, dataset_lock, replace_atomically
+from resampler import MultiIntervalResampler, OHLCV_AGG, BASE_INTERVAL, resample_bars
+from single_flight import SingleFlight
+
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+# Interval key of the FX_DAILY bars in the price cache
+DAILY_INTERVAL = 'Daily'
+
+# FX_DAILY "compact" output holds the latest 100 bars (at least ~20 weeks of trading days)
+COMPACT_MAX_AGE = pd.Timedelta(days=140)
+COMPACT_SLACK = pd.Timedelta(days=4)
+
+HISTDATA_URL = ("https://www.histdata.com/download-free-forex-historical-data/"
+                "?/ascii/{pair}_ASCII/1_MINUTE_QUOTES/{year}/{month}")
+HISTDATA_COLUMNS = ['DateTime', 'Open', 'High', 'Low', 'Close', 'Volume']
+HISTDATA_DTYPES = {'Open': 'float64', 'High': 'float64', 'Low': 'float64', 'Close': 'float64', 'Volume': 'float64'}
+
+# Months downloaded concurrently and rows parsed per chunk of a month file
+HISTDATA_WORKERS = 4
+HISTDATA_CHUNK_ROWS = 50_000
+
+# Intervals built locally from the HistData 1-minute base by the resampler
+RESAMPLED_INTERVALS = {'5min', '15min', '30min', '45min', '60min', '4h'}
+
+# Intervals aggregated from the Alpha Vantage daily bars, labelled by the bin start
+CALENDAR_RULES = {'Weekly': 'W-SUN', 'Monthly': 'MS'}
+
+# Alpha Vantage queries in flight, shared by every collector of the process
+_queries = SingleFlight()
+
+# Indicator states kept per collector, one per window start
+INDICATOR_WINDOWS = 4
+
+# Indicator checkpoints live next to the cached bars, one per window start;
+# collectors of one pair share them, and the INDICATOR_WINDOWS most recently
+# written per interval are kept
+INDICATOR_CHECKPOINT = "_indicators"
+
+# Checkpoints are written by one background thread, off the request path
+_checkpoint_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indicator-checkpoint")
+_pending_checkpoints = {}
+_pending_lock = threading.Lock()
+
+
+def flush_indicator_checkpoints():
+    """
+    Wait until the indicator checkpoints queued so far are written
+    """
+    _checkpoint_writer.submit(lambda: None).result()
+
+
+def _write_indicator_checkpoint(path):
+    """
+    Write the checkpoint queued for path, then drop the least recently written ones
+    """
+    with _pending_lock:
+        state, values, settled = _pending_checkpoints.pop(path)
+    directory = os.path.dirname(path)
+    row_bytes = len(INDICATOR_COLUMNS) * 8
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with dataset_lock(directory):
+            append = False
+            if settled and os.path.exists(path + ".json") and os.path.exists(path + ".f8"):
+                saved = IncrementalIndicators.load_checkpoint(path + ".json")
+                append = (saved.n_bars == settled and saved.first_timestamp == state.first_timestamp
+                          and os.path.getsize(path + ".f8") >= settled * row_bytes)
+            start = settled if append else 0
+            with open(path + ".f8", 'r+b' if append else 'wb') as f:
+                f.truncate(start * row_bytes)
+                f.seek(start * row_bytes)
+                f.write(np.ascontiguousarray(values[start:state.n_bars], dtype=np.float64).tobytes())
+            # The state is written last, so it never covers rows missing from the values file
+            replace_atomically(path + ".json", state.save_checkpoint)
+
+            checkpoints = {}
+            for name in os.listdir(directory):
+                if name.startswith(INDICATOR_CHECKPOINT) and name.endswith(".json"):
+                    checkpoints[name[:-len(".json")]] = os.stat(os.path.join(directory, name)).st_mtime_ns
+            for stale in sorted(checkpoints, key=checkpoints.get, reverse=True)[INDICATOR_WINDOWS:]:
+                for extension in (".json", ".f8"):
+                    try:
+                        os.remove(os.path.join(directory, stale + extension))
+                    except FileNotFoundError:
+                        pass
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not save indicator checkpoint: {str(e)}")
+
 
 class ForexDataCollector:
-    def __init__(self, currency_pair="EUR/USD", interval="daily", db_path="sqlite:///forex_data.db", alpha_vantage_key=None):
+    def __init__(self, currency_pair="EUR/USD", interval="daily", db_path="sqlite:///forex_data.db", alpha_vantage_key=None,
+                 cache_dir="data_cache", cache_ttl=300, resampler=None):
         """
         Initialize the ForexDataCollector using Alpha Vantage API
         
@@ -26,10 +119,36 @@ class ForexDataCollector:
             SQLite database path
         alpha_vantage_key : str
             Alpha Vantage API key (optional). If not provided, must be set in .env file
+        cache_dir : str or None
+            Directory of the on-disk price cache (default: "data_cache"). None disables it
+        cache_ttl : int
+            Seconds before cached bars up to today are refreshed from the API (default: 300)
+        resampler : MultiIntervalResampler, optional
+            Engine holding the intraday bars derived from the 1-minute base.
+            Share one per pair so every interval is served from the same base
         """
         self.base_currency, self.quote_currency = currency_pair.split('/')
         self.interval = self._convert_interval(interval)
         self.engine = create_engine(db_path)
+        self._bar_stores = {}
+
+        # On-disk price cache (optional, needs pyarrow)
+        self.cache_ttl = cache_ttl
+        self.price_cache = None
+        if cache_dir:
+            try:
+                self.price_cache = PriceCache(cache_dir)
+            except ImportError as e:
+                print(f"Price cache disabled: {str(e)}")
+
+        # Intraday intervals derived from the 1-minute base
+        self.resampler = resampler if resampler is not None else MultiIntervalResampler()
+
+        # Incremental indicator states by window start, reused by _process_data
+        # across refreshes and checkpointed in the price cache so they survive restarts
+        self.indicator_state = None
+        self._indicator_cache = OrderedDict()
+        self._indicator_lock = threading.Lock()
 
         # Load Alpha Vantage API key from argument or .streamlit/secrets.toml
         if alpha_vantage_key:
@@ -52,7 +171,8 @@ class ForexDataCollector:
             '15min': '15min',
             '30min': '30min',
             '45min': '45min',  # New interval
-            '60min': '60min'
+            '60min': '60min',
+            '4h': '4h'
         }
         return interval_map.get(interval.lower(), 'Daily')
             
@@ -78,59 +198,22 @@ class ForexDataCollector:
             start_date_str = pd.to_datetime(start_date).strftime("%Y-%m-%d")
             end_date_str = pd.to_datetime(end_date).strftime("%Y-%m-%d")
             
-            # Use FX_DAILY for daily data
-            params = {
-                "function": "FX_DAILY",
-                "from_symbol": self.base_currency,
-                "to_symbol": self.quote_currency,
-                "apikey": self.alpha_vantage_key,
-                "outputsize": "full"
-            }
-            time_series_key = "Time Series FX (Daily)"
-            
-            # Make the API request
-            response = requests.get("https://www.alphavantage.co/query", params=params)
-            data = response.json()
-            
-            # Check for API errors
-            if "Error Message" in data:
-                raise ValueError(f"Alpha Vantage API error: {data['Error Message']}")
-            
-            if "Note" in data:
-                raise ValueError(f"Alpha Vantage API limit reached: {data['Note']}")
-            
-            if "Information" in data:
-                raise ValueError(f"Alpha Vantage API error: {data['Information']}")
-            
-            # Get the correct time series key
-            if time_series_key not in data:
-                raise ValueError(f"No {time_series_key} found in the API response")
-            
-            # Convert to DataFrame
-            df = pd.DataFrame.from_dict(data[time_series_key], orient='index')
-            
-            if df.empty:
-                raise ValueError("Empty dataset received from Alpha Vantage")
-            
-            # Rename columns
-            column_map = {
-                '1. open': 'Open',
-                '2. high': 'High',
-                '3. low': 'Low',
-                '4. close': 'Close'
-            }
-            df = df.rename(columns=column_map)
-            
-            # Convert to float and process
-            for col in ['Open', 'High', 'Low', 'Close']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            start_ts = pd.to_datetime(start_date_str)
+            end_ts = pd.to_datetime(end_date_str)
             
-            df.index = pd.to_datetime(df.index)
-            df = df.sort_index()
+            if self.interval in RESAMPLED_INTERVALS:
+                # Intraday bars derived locally from the 1-minute base, up to the end of end_date
+                end_ts = end_ts + pd.Timedelta(days=1) - pd.Timedelta(1)
+                df = self._load_resampled_bars(start_ts, end_ts)
+            elif self.interval in CALENDAR_RULES:
+                df = self._load_calendar_bars(start_ts, end_ts)
+            else:
+                # Daily bars from the local cache, refreshed from Alpha Vantage when stale
+                df = self._load_daily_bars(start_ts, end_ts)
             
             # Filter date range
-            df = df[df.index >= pd.to_datetime(start_date_str)]
-            df = df[df.index <= pd.to_datetime(end_date_str)]
+            df = df[df.index >= start_ts]
+            df = df[df.index <= end_ts]
             
             if df.empty:
                 raise ValueError("No data available for the selected date range")
@@ -156,6 +239,262 @@ class ForexDataCollector:
             print(f"Error fetching data: {str(e)}")
             return pd.DataFrame()
     
+    def _get_json(self, params):
+        """
+        Send an Alpha Vantage query and return the decoded JSON payload
+        """
+        response = http_client.get(ALPHA_VANTAGE_URL, params=params)
+        return response.json()
+
+    def _query(self, params):
+        """
+        Alpha Vantage query through _get_json, coalesced with identical queries in flight
+
+        Concurrent fetches of the same pair and output size (e.g. a burst of
+        API or dashboard requests missing the price cache together) make one
+        upstream call and share its payload, which callers only read.
+        """
+        data, _ = _queries.do(tuple(sorted(params.items())), self._get_json, params)
+        return data
+
+    def _download_daily_bars(self, outputsize="full"):
+        """
+        Download and parse FX_DAILY bars from Alpha Vantage
+        
+        Returns:
+        --------
+        pd.DataFrame
+            Open/High/Low/Close bars sorted by date
+        """
+        params = {
+            "function": "FX_DAILY",
+            "from_symbol": self.base_currency,
+            "to_symbol": self.quote_currency,
+            "apikey": self.alpha_vantage_key,
+            "outputsize": outputsize
+        }
+        time_series_key = "Time Series FX (Daily)"
+        
+        # Make the API request
+        data = self._query(params)
+        
+        # Check for API errors
+        if "Error Message" in data:
+            raise ValueError(f"Alpha Vantage API error: {data['Error Message']}")
+        
+        if "Note" in data:
+            raise ValueError(f"Alpha Vantage API limit reached: {data['Note']}")
+        
+        if "Information" in data:
+            raise ValueError(f"Alpha Vantage API error: {data['Information']}")
+        
+        # Get the correct time series key
+        if time_series_key not in data:
+            raise ValueError(f"No {time_series_key} found in the API response")
+        
+        # Convert to DataFrame
+        df = pd.DataFrame.from_dict(data[time_series_key], orient='index')
+        
+        if df.empty:
+            raise ValueError("Empty dataset received from Alpha Vantage")
+        
+        # Rename columns
+        column_map = {
+            '1. open': 'Open',
+            '2. high': 'High',
+            '3. low': 'Low',
+            '4. close': 'Close'
+        }
+        df = df.rename(columns=column_map)
+        
+        # Convert to float and process
+        for col in ['Open', 'High', 'Low', 'Close']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        df.index = pd.to_datetime(df.index)
+        return df.sort_index()
+
+    def _download_daily_bars_since(self, since, exact=False):
+        """
+        Download the daily bars from ``since`` on, with the smallest payload that covers them
+        
+        Alpha Vantage's "compact" output holds the latest 100 bars. It is tried
+        first when ``since`` is recent enough, and the "full" history is only
+        downloaded when compact does not reach back far enough.
+        
+        Parameters:
+        -----------
+        since : pd.Timestamp
+            Oldest bar needed
+        exact : bool
+            True when ``since`` is an existing bar (the cache high-water mark)
+            that compact must include; otherwise a few days of slack are allowed
+            for weekends and holidays
+        
+        Returns:
+        --------
+        tuple
+            (bars, complete) where complete is True for a full-history download
+        """
+        if since >= pd.Timestamp.now().normalize() - COMPACT_MAX_AGE:
+            bars = self._download_daily_bars(outputsize="compact")
+            slack = pd.Timedelta(0) if exact else COMPACT_SLACK
+            if bars.index[0] <= since + slack:
+                return bars, False
+            print("Compact output does not cover the requested range, downloading full history")
+        return self._download_daily_bars(outputsize="full"), True
+
+    def _load_daily_bars(self, start_date, end_date):
+        """
+        Get daily bars for a date range, serving from the price cache when it is fresh
+        
+        The cache is used as-is when it covers the range and either extends past
+        end_date or was written less than cache_ttl seconds ago. Otherwise only
+        the bars from the cached high-water mark on are downloaded (usually with
+        the compact output) and merged into the cache; the full history is only
+        requested for cold backfills.
+        """
+        pair = f"{self.base_currency}/{self.quote_currency}"
+        manifest = None if self.price_cache is None else self.price_cache.manifest(pair, DAILY_INTERVAL)
+        covers_start = False
+        if manifest is not None:
+            covers_start = manifest.get('complete', False) or manifest['first'] <= start_date
+            covers_end = manifest['last'] > end_date or time.time() - manifest['written_at'] < self.cache_ttl
+            if covers_start and covers_end:
+                return self.price_cache.read(pair, DAILY_INTERVAL, start_date, end_date)
+        
+        # Delta refresh from the high-water mark when the cache already covers the start
+        delta = manifest is not None and covers_start
+        since = manifest['last'] if delta else start_date
+        try:
+            bars, complete = self._download_daily_bars_since(since, exact=delta)
+        except ValueError as e:
+            if manifest is None:
+                raise
+            print(f"Refresh failed, serving cached bars: {str(e)}")
+            return self.price_cache.read(pair, DAILY_INTERVAL, start_date, end_date)
+        
+        if self.price_cache is None:
+            return bars
+        
+        if delta:
+            bars = bars[bars.index >= manifest['last']]
+        self.price_cache.write(pair, DAILY_INTERVAL, bars, complete=complete)
+        return self.price_cache.read(pair, DAILY_INTERVAL, start_date, end_date)
+    
+    def _load_calendar_bars(self, start_date, end_date):
+        """
+        Get weekly or monthly bars for a date range, aggregated from the daily bars
+
+        A bin that starts before start_date only holds its days from
+        start_date on; fetch_forex_data drops it with the other bars labelled
+        before the range.
+        """
+        return resample_bars(self._load_daily_bars(start_date, end_date), CALENDAR_RULES[self.interval])
+
+    def _stream_minute_bars(self, start_date, end_date, intervals, store=False, covered_from=None,
+                            max_workers=HISTDATA_WORKERS, chunksize=HISTDATA_CHUNK_ROWS):
+        """
+        Stream HistData 1-minute bars of a date range through per-month resamplers
+
+        Months are downloaded in parallel and every response is parsed in
+        chunks as it streams in. Each chunk is pushed through the resampler
+        of its month (and, with store, merged into the 1-minute base of the
+        price cache) on arrival and then dropped, so at most one chunk of
+        minute bars per worker is held in memory, and at most max_workers
+        months are in flight or waiting to be collected.
+
+        Parameters:
+        -----------
+        start_date, end_date : pd.Timestamp
+            Inclusive range of minutes to download
+        intervals : list of str
+            Intervals the month resamplers maintain
+        store : bool
+            Write the minutes to the price cache (default: False)
+        covered_from : pd.Timestamp, optional
+            Start of the requested range, recorded in the cache manifest
+        max_workers : int
+            Months downloaded concurrently (default: HISTDATA_WORKERS)
+        chunksize : int
+            Rows parsed per chunk (default: HISTDATA_CHUNK_ROWS)
+
+        Returns:
+        --------
+        list of MultiIntervalResampler
+            One per month with bars, in time order, to splice into a resampler
+        """
+        pair = f"{self.base_currency}/{self.quote_currency}"
+        symbol = f"{self.base_currency}{self.quote_currency}"
+        store = store and self.price_cache is not None
+        months = pd.date_range(pd.Timestamp(start_date).to_period('M').start_time, end_date, freq='MS')
+
+        def fetch_month(month):
+            url = HISTDATA_URL.format(pair=symbol, year=month.strftime("%Y"), month=month.strftime("%m"))
+            part = MultiIntervalResampler(intervals)
+            try:
+                for minutes in self._stream_histdata_month(url, start_date, end_date, chunksize):
+                    part.update(minutes)
+                    if store:
+                        self.price_cache.write(pair, BASE_INTERVAL, minutes, covered_from=covered_from)
+            except Exception as e:
+                print(f"Error downloading data for {month:%Y-%m}: {str(e)}")
+            return part
+
+        parts = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(months)))) as executor:
+            pending = deque()
+            for month in months:
+                pending.append(executor.submit(fetch_month, month))
+                if len(pending) >= max_workers:
+                    parts.append(pending.popleft().result())
+            parts.extend(future.result() for future in pending)
+        return [part for part in parts if part.last_timestamp is not None]
+    
+    def _load_resampled_bars(self, start_date, end_date):
+        """
+        Get intraday bars for a date range from the resampler
+        
+        The resampler is seeded once from the 1-minute base in the price
+        cache, one cached month at a time, and is as fresh as the cache.
+        Minutes before the range already requested are backfilled from
+        HistData into a separate set of resamplers spliced in front of the
+        current bars; minutes after it are downloaded at most every cache_ttl
+        seconds and spliced after them. Any interval can then be served
+        without another download, and the minute history itself is never
+        held in memory.
+        """
+        pair = f"{self.base_currency}/{self.quote_currency}"
+        resampler = self.resampler
+        
+        if resampler.last_timestamp is None and self.price_cache is not None:
+            manifest = self.price_cache.manifest(pair, BASE_INTERVAL)
+            if manifest is not None:
+                for minutes in self.price_cache.partitions(pair, BASE_INTERVAL):
+                    resampler.update(minutes)
+                resampler.covered_from = pd.Timestamp(manifest.get('covered_from', manifest['first']))
+                resampler.updated_at = manifest['written_at']
+        
+        first, last = resampler.first_timestamp, resampler.last_timestamp
+        covered_from = resampler.covered_from
+        if covered_from is None or start_date < covered_from:
+            # Backfill everything before the current base
+            parts = self._stream_minute_bars(start_date, end_date if first is None else first - pd.Timedelta(minutes=1),
+                                             resampler.intervals, store=True, covered_from=start_date)
+            if parts:
+                resampler.splice(parts)
+                # The range was requested even where it has no bars (weekends, holidays)
+                resampler.covered_from = min(start_date, resampler.first_timestamp)
+        elif end_date > last and time.time() - resampler.updated_at >= self.cache_ttl:
+            # Append the minutes after the high-water mark
+            parts = self._stream_minute_bars(last + pd.Timedelta(minutes=1), end_date, resampler.intervals, store=True)
+            if parts:
+                resampler.splice(parts)
+            else:
+                resampler.updated_at = time.time()
+        
+        return resampler.get(self.interval, start_date, end_date)
+    
     def _process_data(self, data):
         """
         Process the data by adding technical indicators
@@ -165,44 +504,163 @@ class ForexDataCollector:
             
         # Calculate technical indicators
         try:
-            # Trend Indicators
-            data['SMA_20'] = SMAIndicator(close=data['Close'], window=20).sma_indicator()
-            data['EMA_20'] = EMAIndicator(close=data['Close'], window=20).ema_indicator()
-
-            # Momentum Indicators
-            data['RSI'] = RSIIndicator(close=data['Close'], window=14).rsi()
-            macd = MACD(close=data['Close'], window_slow=26, window_fast=12, window_sign=9)
-            data['MACD'] = macd.macd()
-            data['MACD_Signal'] = macd.macd_signal()
-            data['MACD_Hist'] = macd.macd_diff()
-
-            # Volatility Indicators
-            atr = AverageTrueRange(high=data['High'], low=data['Low'], close=data['Close'], window=14)
-            data['ATR'] = atr.average_true_range()
-            bb = BollingerBands(close=data['Close'], window=20)
-            data['Bollinger_Upper'] = bb.bollinger_hband()
-            data['Bollinger_Middle'] = bb.bollinger_mavg()
-            data['Bollinger_Lower'] = bb.bollinger_lband()
-
-            # Add Weekly VWAP (Volume Weighted Average Price)
-            # For Forex, we don't have volume, so use a simple 5-day moving average
-            data['Weekly_VWAP'] = data['Close'].rolling(window=5).mean()
-
-            # Add Support and Resistance for Breakout detection
-            data['Resistance'] = data['High'].rolling(window=20).max()
-            data['Support'] = data['Low'].rolling(window=20).min()
-
+            index = data.index
+            if isinstance(index, pd.DatetimeIndex) and index.is_monotonic_increasing and index.is_unique:
+                indicators = self._compute_indicators(data)
+            else:
+                indicators = self._compute_indicators_stateless(data)
             # Volume handling (we don't have volume for forex from Alpha Vantage)
             if 'Volume' not in data.columns:
                 data['Volume'] = 0
-
-            # Add percentage changes
-            data['Returns'] = data['Close'].pct_change()
-            data['Log_Returns'] = np.log(data['Close']/data['Close'].shift(1))
+            for col in INDICATOR_COLUMNS:
+                data[col] = indicators[col].to_numpy()
 
         except Exception as e:
             print(f"Error calculating technical indicators: {str(e)}")
         return data
+
+    def _compute_indicators_stateless(self, data):
+        """
+        Compute indicator columns from scratch, for bars the incremental state cannot extend
+
+        Bars with a DatetimeIndex out of order or with repeated timestamps are
+        sorted and deduplicated (the last bar of a timestamp wins) and every
+        row gets the values of its timestamp. Any other index is taken to be
+        in time order already.
+        """
+        bars = data[['High', 'Low', 'Close']]
+        state = IncrementalIndicators(f"{self.base_currency}/{self.quote_currency}", self.interval)
+        if isinstance(bars.index, pd.DatetimeIndex):
+            unique = bars[~bars.index.duplicated(keep='last')].sort_index(kind='stable')
+            return state.update(unique)[INDICATOR_COLUMNS].reindex(bars.index)
+        indicators = state.update(bars.reset_index(drop=True))[INDICATOR_COLUMNS]
+        indicators.index = bars.index
+        return indicators
+
+    def _compute_indicators(self, data):
+        """
+        Compute indicator columns, reusing the incremental state of an earlier call
+
+        States are kept per window start (the first bar), for the last
+        INDICATOR_WINDOWS windows used, so callers alternating between ranges
+        (e.g. /historical?days=N and the 30-day snapshot) each resume their
+        own. A cached state covers the settled bars (all but the last) of an
+        earlier call and is reused when the last settled bar (timestamp and
+        prices) is unchanged, so a refresh only pushes the new bars through
+        it. The last bar is always recomputed since the current (still open)
+        bar changes between refreshes. When the settled bars advance, the
+        state is checkpointed in the background.
+        """
+        bars = data[['High', 'Low', 'Close']]
+        n_settled = len(bars) - 1
+        window = bars.index[0]
+        with self._indicator_lock:
+            cache = self._indicator_cache.get(window)
+            if cache is None:
+                cache = self._load_indicator_checkpoint(window)
+            settled = 0 if cache is None else self._settled_bars(cache['state'], bars)
+
+            if settled:
+                state = cache['state'].copy()
+                values = cache['values']
+            else:
+                state = IncrementalIndicators(f"{self.base_currency}/{self.quote_currency}", self.interval)
+                values = np.empty((0, len(INDICATOR_COLUMNS)))
+
+            if n_settled > settled:
+                new = state.update(bars.iloc[settled:-1])
+                # Settled rows are appended to a buffer grown geometrically, never copied per refresh
+                if len(values) < n_settled:
+                    grown = np.empty((max(n_settled, 2 * len(values)), len(INDICATOR_COLUMNS)))
+                    grown[:settled] = values[:settled]
+                    values = grown
+                values[settled:n_settled] = new[INDICATOR_COLUMNS].to_numpy()
+                # The cached state is never mutated and rows below its n_bars never
+                # rewritten, so the background writer can read both
+                cache = {'state': state.copy(), 'values': values}
+                self._save_indicator_checkpoint(cache['state'], values, settled)
+
+            if cache is not None:
+                self._indicator_cache[window] = cache
+                self._indicator_cache.move_to_end(window)
+                while len(self._indicator_cache) > INDICATOR_WINDOWS:
+                    self._indicator_cache.popitem(last=False)
+
+            last = state.update(bars.iloc[-1:])
+            self.indicator_state = state
+
+        result = np.empty((len(bars), len(INDICATOR_COLUMNS)))
+        result[:n_settled] = values[:n_settled]
+        result[n_settled:] = last[INDICATOR_COLUMNS].to_numpy()
+        return pd.DataFrame(result, index=bars.index, columns=INDICATOR_COLUMNS)
+
+    @staticmethod
+    def _settled_bars(state, bars):
+        """
+        Number of leading bars of ``bars`` the state already covers (0 when they differ)
+
+        Only the first timestamp and the last settled bar are compared.
+        """
+        n = state.n_bars
+        if not 0 < n < len(bars):
+            return 0
+        if bars.index[0] != state.first_timestamp or bars.index[n - 1] != state.last_timestamp:
+            return 0
+        cached = [state.tail[col][-1] for col in ('High', 'Low', 'Close')]
+        if not np.array_equal(bars.iloc[n - 1].to_numpy(dtype=float), cached, equal_nan=True):
+            return 0
+        return n
+
+    def _indicator_checkpoint_path(self, window):
+        """
+        Path of the indicator checkpoint of a window start, without extension (None without a price cache)
+        """
+        if self.price_cache is None:
+            return None
+        return os.path.join(self.price_cache.cache_dir, f"{self.base_currency}{self.quote_currency}",
+                            self.interval, f"{INDICATOR_CHECKPOINT}-{window:%Y%m%dT%H%M%S}")
+
+    def _load_indicator_checkpoint(self, window):
+        """
+        Indicator cache of a window saved by an earlier process, or None
+
+        The checkpoint is the settled IncrementalIndicators state (JSON) plus
+        the indicator values of the bars it covers (raw float64 rows).
+        """
+        path = self._indicator_checkpoint_path(window)
+        if path is None or not os.path.exists(path + ".json"):
+            return None
+        n_cols = len(INDICATOR_COLUMNS)
+        try:
+            with dataset_lock(os.path.dirname(path)):
+                state = IncrementalIndicators.load_checkpoint(path + ".json")
+                values = np.fromfile(path + ".f8", dtype=np.float64, count=state.n_bars * n_cols)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring indicator checkpoint: {str(e)}")
+            return None
+        if len(values) != state.n_bars * n_cols:
+            return None
+        return {'state': state, 'values': values.reshape(state.n_bars, n_cols)}
+
+    def _save_indicator_checkpoint(self, state, values, settled):
+        """
+        Queue a checkpoint of the settled state and its indicator values
+
+        The background writer appends the rows from ``settled`` on when the
+        checkpoint on disk is the one the state was resumed from. A window
+        queued again before it was written is written once, with the latest
+        state and the earliest ``settled``.
+        """
+        path = self._indicator_checkpoint_path(state.first_timestamp)
+        if path is None:
+            return
+        with _pending_lock:
+            queued = _pending_checkpoints.get(path)
+            if queued is not None:
+                settled = min(settled, queued[2])
+            _pending_checkpoints[path] = (state, values, settled)
+        if queued is None:
+            _checkpoint_writer.submit(_write_indicator_checkpoint, path)
     
     def fetch_news_data(self, query=None, max_results=10):
         """
@@ -234,7 +692,6 @@ class ForexDataCollector:
                 max_results = 10
                 
             # Try to use Alpha Vantage's news API if available
-            url = "https://www.alphavantage.co/query"
             params = {
                 "function": "NEWS_SENTIMENT",
                 "tickers": f"FOREX:{self.base_currency}{self.quote_currency}",
@@ -248,8 +705,7 @@ class ForexDataCollector:
             print(f"API request params: {params}")
             
             # Make the API request
-            response = requests.get(url, params=params)
-            data = response.json()
+            data = self._query(params)
             
             # Check if we got valid data
             if "feed" in data:
@@ -286,27 +742,46 @@ class ForexDataCollector:
             traceback.print_exc()
             return pd.DataFrame()
     
-    def save_to_database(self, data, table_name='forex_data'):
+    def _bar_store(self, table_name):
+        """
+        Get (and create on first use) the bar store for a table
         """
-        Save data to SQLite database
+        if table_name not in self._bar_stores:
+            self._bar_stores[table_name] = BarStore(self.engine, table_name)
+        return self._bar_stores[table_name]
+
+    def save_to_database(self, data, table_name='forex_bars'):
+        """
+        Upsert the OHLC bars of data into the bar store
+
+        Saving the same bars again replaces them instead of duplicating rows.
         """
         try:
-            data.to_sql(table_name, self.engine, if_exists='append')
-            print(f"Data saved to {table_name} successfully")
+            count = self._bar_store(table_name).upsert(
+                f"{self.base_currency}/{self.quote_currency}", self.interval, data
+            )
+            print(f"Saved {count} bars to {table_name} successfully")
         except Exception as e:
             print(f"Error saving to database: {str(e)}")
     
-    def load_from_database(self, table_name='forex_data', start_date=None, end_date=None):
+    def load_from_database(self, table_name='forex_bars', start_date=None, end_date=None, columns=None):
         """
-        Load data from SQLite database
+        Load OHLC bars from the bar store
+
+        Parameters:
+        -----------
+        table_name : str
+            Bar store table (default: "forex_bars")
+        start_date, end_date : str or datetime, optional
+            Inclusive date range; either bound may be omitted
+        columns : list of str, optional
+            Subset of Open/High/Low/Close/Volume to load (default: all)
         """
-        query = f"SELECT * FROM {table_name}"
-        if start_date and end_date:
-            query += f" WHERE index BETWEEN '{start_date}' AND '{end_date}'"
-            
         try:
-            data = pd.read_sql(query, self.engine, index_col='index', parse_dates=['index'])
-            return data
+            return self._bar_store(table_name).load(
+                f"{self.base_currency}/{self.quote_currency}", self.interval,
+                start_date=start_date, end_date=end_date, columns=columns
+            )
         except Exception as e:
             print(f"Error loading from database: {str(e)}")
             return None
@@ -377,81 +852,70 @@ class ForexDataCollector:
         data['Stop_Loss'] = 0.0
         
         try:
-            for i in range(20, len(data)):
-                # Get current window of data
-                window = data.iloc[i-20:i+1]
-                
-                # Calculate confidence based on multiple factors
-                signals = []
-                confidences = []
-                
-                # 1. RSI Signal (30% weight)
-                rsi = window['RSI'].iloc[-1]
-                if rsi < 30:
-                    signals.append(1)  # Oversold - Buy
-                    confidences.append(min((30 - rsi) / 10, 1.0) * 0.3)
-                elif rsi > 70:
-                    signals.append(-1)  # Overbought - Sell
-                    confidences.append(min((rsi - 70) / 10, 1.0) * 0.3)
-                
-                # 2. MACD Signal (30% weight)
-                macd = window['MACD'].iloc[-1]
-                macd_signal = window['MACD_Signal'].iloc[-1]
+            n = len(data)
+            close = data['Close'].to_numpy()
+            rsi = data['RSI'].to_numpy()
+            macd = data['MACD'].to_numpy()
+            macd_signal = data['MACD_Signal'].to_numpy()
+            bb_upper = data['Bollinger_Upper'].to_numpy()
+            bb_lower = data['Bollinger_Lower'].to_numpy()
+            atr = data['ATR'].to_numpy()
+
+            # Only rows with a full 20-bar lookback are scored
+            active = np.arange(n) >= 20
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # 1. RSI Signal (30% weight) - no vote inside the 30/70 band
+                rsi_buy = rsi < 30
+                rsi_sell = rsi > 70
+                rsi_conf = np.where(rsi_buy, np.minimum((30 - rsi) / 10, 1.0) * 0.3,
+                           np.where(rsi_sell, np.minimum((rsi - 70) / 10, 1.0) * 0.3, 0.0))
+                rsi_vote = np.where(rsi_buy, 1, np.where(rsi_sell, -1, 0))
+
+                # 2. MACD Signal (30% weight) - always votes
                 macd_hist = macd - macd_signal
-                if macd > macd_signal:
-                    signals.append(1)
-                    confidences.append(min(abs(macd_hist) / 0.0005, 1.0) * 0.3)
-                else:
-                    signals.append(-1)
-                    confidences.append(min(abs(macd_hist) / 0.0005, 1.0) * 0.3)
-                
+                macd_conf = np.minimum(np.abs(macd_hist) / 0.0005, 1.0) * 0.3
+                macd_vote = np.where(macd > macd_signal, 1, -1)
+
                 # 3. Bollinger Bands Signal (40% weight)
-                price = window['Close'].iloc[-1]
-                bb_upper = window['Bollinger_Upper'].iloc[-1]
-                bb_lower = window['Bollinger_Lower'].iloc[-1]
                 bb_width = bb_upper - bb_lower
-                
-                if price < bb_lower:
-                    signals.append(1)
-                    confidences.append(min((bb_lower - price) / bb_width, 1.0) * 0.4)
-                elif price > bb_upper:
-                    signals.append(-1)
-                    confidences.append(min((price - bb_upper) / bb_width, 1.0) * 0.4)
-                
-                # Calculate overall signal and confidence
-                if signals:
-                    # Weight the signals by their confidence
-                    weighted_signal = sum(s * c for s, c in zip(signals, confidences))
-                    total_confidence = sum(confidences)
-                    
-                    if total_confidence >= confidence_threshold:
-                        final_signal = 1 if weighted_signal > 0 else -1
-                        data.iloc[i, data.columns.get_loc('Signal')] = final_signal
-                        data.iloc[i, data.columns.get_loc('Confidence')] = total_confidence
-                        
-                        # Calculate entry, TP, and SL prices
-                        entry_price = price
-                        atr = window['ATR'].iloc[-1]
-                        
-                        if final_signal == 1:  # Buy signal
-                            take_profit = entry_price + (atr * 2)  # 2x ATR for TP
-                            stop_loss = entry_price - (atr * 1)   # 1x ATR for SL
-                        else:  # Sell signal
-                            take_profit = entry_price - (atr * 2)
-                            stop_loss = entry_price + (atr * 1)
-                        
-                        data.iloc[i, data.columns.get_loc('Entry_Price')] = entry_price
-                        data.iloc[i, data.columns.get_loc('Take_Profit')] = take_profit
-                        data.iloc[i, data.columns.get_loc('Stop_Loss')] = stop_loss
+                bb_buy = close < bb_lower
+                bb_sell = close > bb_upper
+                bb_conf = np.where(bb_buy, np.minimum((bb_lower - close) / bb_width, 1.0) * 0.4,
+                          np.where(bb_sell, np.minimum((close - bb_upper) / bb_width, 1.0) * 0.4, 0.0))
+                bb_vote = np.where(bb_buy, 1, np.where(bb_sell, -1, 0))
+
+            # Accumulate in the same order as the per-row sums (RSI, MACD, BB)
+            # so the floating point results match exactly
+            weighted_signal = rsi_vote * rsi_conf + macd_vote * macd_conf + bb_vote * bb_conf
+            total_confidence = rsi_conf + macd_conf + bb_conf
+
+            fired = active & (total_confidence >= confidence_threshold)
+            final_signal = np.where(weighted_signal > 0, 1, -1)
+
+            # Calculate entry, TP, and SL prices (2x ATR for TP, 1x ATR for SL)
+            take_profit = np.where(final_signal == 1, close + (atr * 2), close - (atr * 2))
+            stop_loss = np.where(final_signal == 1, close - (atr * 1), close + (atr * 1))
+
+            data['Signal'] = np.where(fired, final_signal, 0)
+            data['Confidence'] = np.where(fired, total_confidence, 0.0)
+            data['Entry_Price'] = np.where(fired, close, 0.0)
+            data['Take_Profit'] = np.where(fired, take_profit, 0.0)
+            data['Stop_Loss'] = np.where(fired, stop_loss, 0.0)
         
         except Exception as e:
             print(f"Error calculating trading signals: {str(e)}")
         
         return data 
 
-    def _fetch_histdata_minute_data(self, start_date=None, end_date=None):
+    def _fetch_histdata_minute_data(self, start_date=None, end_date=None, max_workers=HISTDATA_WORKERS,
+                                    chunksize=HISTDATA_CHUNK_ROWS):
         """
-        Fetch 1-minute data from HistData.com and aggregate to desired interval
+        Fetch 1-minute data from HistData.com and aggregate to the collector's interval
+        
+        Months are downloaded in parallel and every chunk of a response is
+        resampled on arrival (see _stream_minute_bars), so the minute bars of
+        the range are never held in memory together.
         
         Parameters:
         -----------
@@ -459,83 +923,56 @@ class ForexDataCollector:
             Start date for data fetch
         end_date : datetime, optional
             End date for data fetch
+        max_workers : int
+            Months downloaded concurrently (default: HISTDATA_WORKERS)
+        chunksize : int
+            Rows parsed per chunk (default: HISTDATA_CHUNK_ROWS)
             
         Returns:
         --------
         pd.DataFrame
-            DataFrame with OHLCV data at the specified interval
+            DataFrame with OHLCV data at the collector's (intraday) interval
         """
         try:
-            import requests
-            from io import StringIO
-            import zipfile
-            from datetime import datetime, timedelta
-            
-            # Format currency pair for HistData URL (e.g., EUR/USD -> EURUSD)
-            pair = f"{self.base_currency}{self.quote_currency}"
-            
             # If no dates provided, get last 30 days
             if start_date is None:
                 start_date = datetime.now() - timedelta(days=30)
             if end_date is None:
                 end_date = datetime.now()
-                
-            # Create list of months to download
-            months = []
-            current = start_date.replace(day=1)
-            while current <= end_date:
-                months.append(current)
-                current = (current + timedelta(days=32)).replace(day=1)
             
-            all_data = []
-            
-            for date in months:
-                # Format URL for HistData
-                year = date.strftime("%Y")
-                month = date.strftime("%m")
-                url = f"https://www.histdata.com/download-free-forex-historical-data/?/ascii/{pair}_ASCII/1_MINUTE_QUOTES/{year}/{month}"
-                
-                try:
-                    # Download and process data
-                    response = requests.get(url)
-                    if response.status_code == 200:
-                        # Process the CSV data
-                        df = pd.read_csv(StringIO(response.text), 
-                                       names=['DateTime', 'Open', 'High', 'Low', 'Close', 'Volume'],
-                                       parse_dates=['DateTime'])
-                        
-                        # Filter by date range
-                        df = df[(df['DateTime'] >= start_date) & (df['DateTime'] <= end_date)]
-                        
-                        all_data.append(df)
-                        
-                except Exception as e:
-                    print(f"Error downloading data for {year}-{month}: {str(e)}")
-                    continue
-            
-            if not all_data:
+            bars = MultiIntervalResampler([self.interval])
+            bars.splice(self._stream_minute_bars(pd.Timestamp(start_date), pd.Timestamp(end_date), bars.intervals,
+                                                 max_workers=max_workers, chunksize=chunksize))
+            if bars.last_timestamp is None:
                 raise Exception("No data could be downloaded from HistData")
-                
-            # Combine all data
-            data = pd.concat(all_data)
-            
-            # Resample to 45-minute intervals
-            if self.interval == '45min':
-                data.set_index('DateTime', inplace=True)
-                resampled = data.resample('45T').agg({
-                    'Open': 'first',
-                    'High': 'max',
-                    'Low': 'min',
-                    'Close': 'last',
-                    'Volume': 'sum'
-                }).dropna()
-                return resampled.reset_index()
-            
-            return data
+            return bars.get(self.interval).rename_axis('DateTime').reset_index()
             
         except Exception as e:
             print(f"Error fetching data from HistData: {str(e)}")
             return None
+
+    @staticmethod
+    def _stream_histdata_month(url, start_date, end_date, chunksize):
+        """
+        Download one HistData month and yield its 1-minute bars chunk by chunk
+
+        Yields:
+        -------
+        pd.DataFrame
+            Minute bars of the range indexed by time; nothing when the month
+            could not be downloaded
+        """
+        with http_client.get(url, stream=True) as response:
+            if response.status_code != 200:
+                return
+            response.raw.decode_content = True
+
+            reader = pd.read_csv(response.raw, names=HISTDATA_COLUMNS, dtype=HISTDATA_DTYPES,
+                                 parse_dates=['DateTime'], chunksize=chunksize)
+            for chunk in reader:
+                chunk = chunk[(chunk['DateTime'] >= start_date) & (chunk['DateTime'] <= end_date)]
+                if not chunk.empty:
+                    yield chunk.set_index('DateTime').rename_axis(None)
     
     def fetch_data(self, start_date=None, end_date=None):
         """
@@ -560,14 +997,23 @@ class ForexDataCollector:
             if isinstance(end_date, str):
                 end_date = pd.to_datetime(end_date)
             
-            # For intraday data (45min), use HistData
-            if self.interval == '45min':
-                data = self._fetch_histdata_minute_data(start_date, end_date)
-                if data is not None:
+            if end_date is None:
+                end_date = pd.Timestamp.now()
+            if start_date is None:
+                start_date = end_date - timedelta(days=30)
+            
+            # Intraday intervals are resampled locally from the HistData 1-minute base
+            if self.interval in RESAMPLED_INTERVALS:
+                data = self._load_resampled_bars(start_date, end_date)
+                if not data.empty:
                     return data
+                return None
                     
-            # Fallback to Alpha Vantage for other intervals
-            # ... existing Alpha Vantage code ...
+            if self.interval in CALENDAR_RULES:
+                return self._load_calendar_bars(start_date, end_date)
+
+            # Alpha Vantage for the other intervals
+            return self._load_daily_bars(start_date, end_date)
             
         except Exception as e:
             print(f"Error fetching data: {str(e)}")
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+
+# Registered features: name -> (function of an OHLC frame returning a Series, lookback in rows)
+FEATURES = {}
+
+# Rows after which an exponential average has forgotten its start: the weight
+# left on older rows is below 1e-6 for every span used here
+EWM_LOOKBACK = 200
+
+
+def register_feature(name, lookback):
+    """
+    Register a vectorized feature function under ``name``
+
+    Parameters:
+    -----------
+    name : str
+        Feature (and output column) name
+    lookback : int
+        Trailing rows needed to compute the feature of the last row
+    """
+    def decorator(func):
+        FEATURES[name] = (func, lookback)
+        return func
+    return decorator
+
+
+def _sma(series, window):
+    return series.rolling(window, min_periods=window).mean()
+
+
+def _ema(series, span):
+    return series.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+def _wilder(series, window):
+    return series.ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+
+
+def _true_range(data):
+    prev_close = data['Close'].shift(1)
+    return pd.concat([data['High'] - data['Low'],
+                      (data['High'] - prev_close).abs(),
+                      (data['Low'] - prev_close).abs()], axis=1).max(axis=1)
+
+
+# Returns and momentum
+for _periods in (1, 5, 10):
+    register_feature(f'return_{_periods}', _periods + 1)(
+        lambda data, periods=_periods: data['Close'].pct_change(periods))
+
+register_feature('log_return', 2)(lambda data: np.log(data['Close']).diff())
+
+for _window in (10, 20):
+    register_feature(f'volatility_{_window}', _window + 1)(
+        lambda data, window=_window: np.log(data['Close']).diff().rolling(window, min_periods=window).std())
+
+# Trend: distance of the close from its moving averages
+for _window in (10, 20, 50):
+    register_feature(f'sma_ratio_{_window}', _window)(
+        lambda data, window=_window: data['Close'] / _sma(data['Close'], window) - 1)
+
+for _span in (12, 26):
+    register_feature(f'ema_ratio_{_span}', EWM_LOOKBACK)(
+        lambda data, span=_span: data['Close'] / _ema(data['Close'], span) - 1)
+
+
+@register_feature('macd', EWM_LOOKBACK)
+def macd(data):
+    return _ema(data['Close'], 12) - _ema(data['Close'], 26)
+
+
+@register_feature('macd_signal', EWM_LOOKBACK)
+def macd_signal(data):
+    return _ema(macd(data), 9)
+
+
+@register_feature('macd_diff', EWM_LOOKBACK)
+def macd_diff(data):
+    line = macd(data)
+    return line - _ema(line, 9)
+
+
+# Oscillators
+@register_feature('rsi_14', EWM_LOOKBACK)
+def rsi_14(data):
+    change = data['Close'].diff()
+    up = _wilder(change.clip(lower=0), 14)
+    down = _wilder(-change.clip(upper=0), 14)
+    return 100 - 100 / (1 + up / down)
+
+
+@register_feature('stoch_k_14', 14)
+def stoch_k_14(data):
+    low = data['Low'].rolling(14, min_periods=14).min()
+    high = data['High'].rolling(14, min_periods=14).max()
+    return 100 * (data['Close'] - low) / (high - low)
+
+
+@register_feature('stoch_d_14', 16)
+def stoch_d_14(data):
+    return _sma(stoch_k_14(data), 3)
+
+
+@register_feature('williams_r_14', 14)
+def williams_r_14(data):
+    return stoch_k_14(data) - 100
+
+
+# Volatility bands and ranges
+@register_feature('bollinger_pband_20', 20)
+def bollinger_pband_20(data):
+    middle = _sma(data['Close'], 20)
+    std = data['Close'].rolling(20, min_periods=20).std(ddof=0)
+    return (data['Close'] - (middle - 2 * std)) / (4 * std)
+
+
+@register_feature('bollinger_width_20', 20)
+def bollinger_width_20(data):
+    std = data['Close'].rolling(20, min_periods=20).std(ddof=0)
+    return 4 * std / _sma(data['Close'], 20)
+
+
+@register_feature('atr_ratio_14', EWM_LOOKBACK)
+def atr_ratio_14(data):
+    return _wilder(_true_range(data), 14) / data['Close']
+
+
+@register_feature('range_ratio', 1)
+def range_ratio(data):
+    return (data['High'] - data['Low']) / data['Close']
+
+
+@register_feature('close_location', 1)
+def close_location(data):
+    return (data['Close'] - data['Low']) / (data['High'] - data['Low'])
+
+
+# Every registered feature, in registration order
+DEFAULT_FEATURES = list(FEATURES)
+
+
+def required_lookback(names):
+    """
+    Trailing rows needed to compute the last row of the given features
+    """
+    return max(FEATURES[name][1] for name in names)
+
+
+def compute_features(data, names=None):
+    """
+    Compute only the requested features
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        OHLC data with 'Open', 'High', 'Low' and 'Close' columns
+    names : list, optional
+        Registered feature names (default: DEFAULT_FEATURES)
+
+    Returns:
+    --------
+    pd.DataFrame
+        One column per feature, on the index of data. Rows without enough
+        history for a feature are NaN
+    """
+    names = DEFAULT_FEATURES if names is None else names
+    unknown = [name for name in names if name not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown features: {unknown}")
+    return pd.DataFrame({name: FEATURES[name][0](data) for name in names}, index=data.index)
+
+
+def compute_latest_features(data, names=None):
+    """
+    Features of the last row, computed from its trailing lookback window only
+
+    Returns:
+    --------
+    pd.DataFrame
+        A single row with one column per feature
+    """
+    names = DEFAULT_FEATURES if names is None else names
+    return compute_features(data.iloc[-required_lookback(names):], names).iloc[[-1]]
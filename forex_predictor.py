@@ -1,18 +1,65 @@
 import pandas as pd
 import numpy as np
-from ta import add_all_ta_features
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+import lightgbm as lgb
 from lightgbm import LGBMRegressor
 import optuna
+from optuna.integration import LightGBMPruningCallback
 from datetime import datetime, timedelta
 import joblib
-import requests
+import hashlib
+import threading
+import http_client
 import os
 from dotenv import load_dotenv
+from features import DEFAULT_FEATURES, compute_features, compute_latest_features, required_lookback
+from online_features import OnlineFeatures
+from artifacts import FOREX_KIND, is_artifact, load_arrays, read_file, read_manifest, write_artifact
+
+# Optuna logs every trial at INFO level
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+# Local Optuna storage, so an interrupted tuning run resumes where it stopped
+OPTUNA_STORAGE = "sqlite:///optuna_studies.db"
+
+# Boosting rounds without validation improvement before a fit stops
+EARLY_STOPPING_ROUNDS = 50
+
+# Boosting rounds between two pruning checks; each check is a storage write
+PRUNING_REPORT_INTERVAL = 10
+
+class LockedPruner(optuna.pruners.BasePruner):
+    def __init__(self, pruner):
+        """
+        Serialize the prune() calls of a pruner shared by parallel trials
+        
+        HyperbandPruner sets up its brackets lazily in prune() without a lock,
+        so concurrent trials can corrupt them.
+        """
+        self.pruner = pruner
+        self._lock = threading.Lock()
+    
+    def prune(self, study, trial):
+        with self._lock:
+            return self.pruner.prune(study, trial)
+
+def make_pruner(pruner):
+    """
+    Optuna pruner by name: "median", "hyperband" or None (no pruning)
+    """
+    if pruner is None:
+        return optuna.pruners.NopPruner()
+    if pruner == "median":
+        # Compare trials from the 10th boosting round on, once 5 trials have finished
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=PRUNING_REPORT_INTERVAL)
+    if pruner == "hyperband":
+        return LockedPruner(optuna.pruners.HyperbandPruner(min_resource=PRUNING_REPORT_INTERVAL, max_resource='auto',
+                                                            reduction_factor=3))
+    raise ValueError(f"Unknown pruner: {pruner}")
 
 class ForexPredictor:
-    def __init__(self, currency_pair="EUR/USD", prediction_horizon=1):
+    def __init__(self, currency_pair="EUR/USD", prediction_horizon=1, features=None):
         """
         Initialize the ForexPredictor class
         
@@ -23,11 +70,17 @@ class ForexPredictor:
             Format should be "BASE/QUOTE" (e.g., "EUR/USD", "GBP/JPY")
         prediction_horizon : int
             Number of days to predict ahead (default: 1)
+        features : list, optional
+            Names of the features.FEATURES indicators to use (default: all of
+            DEFAULT_FEATURES). Saved with the model
         """
         self.base_currency, self.quote_currency = currency_pair.split('/')
         self.prediction_horizon = prediction_horizon
         self.model = None
         self.scaler = StandardScaler()
+        self.feature_names = list(DEFAULT_FEATURES if features is None else features)
+        # Streaming feature state of each pair for predict_bar()
+        self.online_features = {}
         
         # Load Alpha Vantage API key
         load_dotenv()
@@ -48,7 +101,7 @@ class ForexPredictor:
         }
         
         try:
-            response = requests.get("https://www.alphavantage.co/query", params=params)
+            response = http_client.get("https://www.alphavantage.co/query", params=params)
             data = response.json()
             
             # Get the time series data
@@ -92,27 +145,21 @@ class ForexPredictor:
     
     def create_features(self, data):
         """
-        Create technical indicators as features
+        Add the selected technical indicators as features, plus the target
+        
+        Only the indicators in self.feature_names are computed. FX data has
+        no volume, so none of them uses it.
         """
         if data.empty:
             return data
-            
-        # Add all technical analysis features
-        data = add_all_ta_features(
-            data, 
-            open="Open", 
-            high="High", 
-            low="Low", 
-            close="Close",
-            volume="Volume" if "Volume" in data.columns else None,
-            fillna=True
-        )
+        
+        data = pd.concat([data, compute_features(data, self.feature_names)], axis=1)
         
         # Create target variable (future returns)
         data['target'] = data['Close'].pct_change(self.prediction_horizon).shift(-self.prediction_horizon)
         
-        # Drop rows with NaN values
-        data = data.dropna()
+        # Drop the indicator warm-up rows and the last rows, which have no target yet
+        data = data.dropna(subset=self.feature_names + ['target'])
         
         return data
     
@@ -120,47 +167,91 @@ class ForexPredictor:
         """
         Prepare data for training
         """
-        # Drop the target column and any non-feature columns
-        feature_data = data.drop(['target', 'Open', 'High', 'Low', 'Close'] + 
-                               (['Volume'] if 'Volume' in data.columns else []), axis=1)
-        
         # Scale the features
-        X = self.scaler.fit_transform(feature_data)
+        X = self.scaler.fit_transform(data[self.feature_names])
         y = data['target'].values
         
         return X, y
     
-    def optimize_hyperparameters(self, X_train, y_train, X_val, y_val, n_trials=100):
+    def optimize_hyperparameters(self, X_train, y_train, X_val, y_val, n_trials=100, n_jobs=-1,
+                                 pruner="hyperband", storage=OPTUNA_STORAGE, study_name=None, timeout=None):
         """
         Optimize LightGBM hyperparameters using Optuna
+        
+        Each trial stops boosting once the validation loss stalls, and the
+        pruner stops trials whose loss curve trails the earlier ones. Trials
+        run in parallel threads (LightGBM releases the GIL). The study is kept
+        in ``storage`` under a name derived from the data, so calling again
+        with the same data resumes it and only runs the missing trials.
+        
+        Parameters:
+        -----------
+        X_train, y_train, X_val, y_val : np.ndarray
+            Training and validation sets
+        n_trials : int
+            Total number of trials of the study (default: 100)
+        n_jobs : int
+            Trials run in parallel, -1 for the CPU count (default: -1)
+        pruner : str or None
+            "hyperband", "median" or None to run every trial to the end (default: "hyperband").
+            The median pruner compares best-so-far losses, so it rarely prunes
+            when the validation loss is lowest in the first rounds, as is
+            common for noisy return targets
+        storage : str or None
+            Optuna storage URL, None for an in-memory study (default: OPTUNA_STORAGE)
+        study_name : str, optional
+            Study to create or resume (default: derived from the pair, horizon and data)
+        timeout : float, optional
+            Stop starting new trials after this many seconds
         """
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        # One LightGBM thread per trial when trials already run in parallel
+        num_threads = 1 if n_jobs > 1 else 0
+        
         def objective(trial):
             params = {
                 'n_estimators': trial.suggest_int('n_estimators', 100, 1000),
-                'learning_rate': trial.suggest_loguniform('learning_rate', 0.01, 0.1),
+                'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.1, log=True),
                 'max_depth': trial.suggest_int('max_depth', 3, 10),
                 'num_leaves': trial.suggest_int('num_leaves', 8, 128),
                 'min_child_samples': trial.suggest_int('min_child_samples', 5, 30),
-                'subsample': trial.suggest_uniform('subsample', 0.6, 1.0),
-                'colsample_bytree': trial.suggest_uniform('colsample_bytree', 0.6, 1.0)
+                'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+                'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0)
             }
             
-            model = LGBMRegressor(**params, random_state=42)
+            callbacks = [lgb.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)]
+            if pruner is not None:
+                callbacks.append(LightGBMPruningCallback(trial, 'l2', report_interval=PRUNING_REPORT_INTERVAL))
+            
+            model = LGBMRegressor(**params, random_state=42, n_jobs=num_threads, verbose=-1)
             model.fit(X_train, y_train,
-                     eval_set=[(X_val, y_val)],
-                     early_stopping_rounds=50,
-                     verbose=False)
+                      eval_set=[(X_val, y_val)],
+                      eval_metric='l2',
+                      callbacks=callbacks)
             
             return model.best_score_['valid_0']['l2']
-            
-        study = optuna.create_study(direction='minimize')
-        study.optimize(objective, n_trials=n_trials)
+        
+        if study_name is None:
+            digest = hashlib.sha256()
+            for array in (X_train, y_train, X_val, y_val):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            study_name = f"{self.base_currency}{self.quote_currency}_h{self.prediction_horizon}_{digest.hexdigest()[:16]}"
+        
+        study = optuna.create_study(direction='minimize', storage=storage, study_name=study_name,
+                                    pruner=make_pruner(pruner), load_if_exists=True)
+        done = [t for t in study.trials if t.state in (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)]
+        if len(done) < n_trials:
+            study.optimize(objective, n_trials=n_trials - len(done), n_jobs=n_jobs, timeout=timeout)
         
         return study.best_params
     
-    def train(self, data=None, start_date=None, end_date=None, test_size=0.2, val_size=0.2):
+    def train(self, data=None, start_date=None, end_date=None, test_size=0.2, val_size=0.2,
+              n_trials=100, n_jobs=-1, storage=OPTUNA_STORAGE):
         """
         Train the model
+        
+        n_trials, n_jobs and storage are passed to optimize_hyperparameters.
         """
         # Fetch data if not provided
         if data is None:
@@ -181,14 +272,14 @@ class ForexPredictor:
         X_train, X_val, y_train, y_val = train_test_split(X_temp, y_temp, test_size=val_size_adj, shuffle=False)
         
         # Optimize hyperparameters
-        best_params = self.optimize_hyperparameters(X_train, y_train, X_val, y_val)
+        best_params = self.optimize_hyperparameters(X_train, y_train, X_val, y_val,
+                                                    n_trials=n_trials, n_jobs=n_jobs, storage=storage)
         
         # Train final model
         self.model = LGBMRegressor(**best_params, random_state=42)
         self.model.fit(X_train, y_train,
                       eval_set=[(X_val, y_val)],
-                      early_stopping_rounds=50,
-                      verbose=True)
+                      callbacks=[lgb.early_stopping(EARLY_STOPPING_ROUNDS)])
         
         # Return test set performance
         test_score = self.model.score(X_test, y_test)
@@ -196,49 +287,140 @@ class ForexPredictor:
     
     def predict(self, data=None):
         """
-        Make predictions
+        Predict the return over the prediction horizon after the last bar
+        
+        Only the trailing rows the features need are used, so a long history
+        costs no more than a short one.
         """
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        # Fetch latest data if not provided
+        lookback = required_lookback(self.feature_names)
+        
+        # Fetch latest data if not provided (FX trades 5 days a week, plus a margin for holidays)
         if data is None:
             end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)  # Get last 30 days for features
+            start_date = end_date - timedelta(days=lookback * 7 // 5 + 14)
             data = self.fetch_data(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
         
-        # Create features
-        data = self.create_features(data)
+        if len(data) < lookback:
+            raise ValueError(f"At least {lookback} rows are needed for prediction, got {len(data)}")
         
-        if data.empty:
+        features = compute_latest_features(data, self.feature_names)
+        if features.isna().any(axis=None):
             raise ValueError("No data available for prediction")
-        
-        # Prepare data
-        feature_data = data.drop(['target', 'Open', 'High', 'Low', 'Close'] + 
-                               (['Volume'] if 'Volume' in data.columns else []), axis=1)
-        X = self.scaler.transform(feature_data)
+        X = self.scaler.transform(features)
         
         # Make prediction
-        predictions = self.model.predict(X)
+        return self.model.predict(X)[0]
+    
+    def warm_up(self, data, pair=None):
+        """
+        Start online inference for a pair from its bar history
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            OHLC bars in time order; at least the feature lookback for exact
+            exponential averages, the whole history is fine too
+        pair : str, optional
+            Key of the feature buffer (default: this predictor's pair)
+        """
+        pair = pair or f"{self.base_currency}/{self.quote_currency}"
+        online = OnlineFeatures(self.feature_names)
+        online.update_many(data)
+        self.online_features[pair] = online
+    
+    def predict_bar(self, open_, high, low, close, pair=None):
+        """
+        Add a new bar to a pair's feature buffer and predict from it
+        
+        Only the feature vector of the new bar is computed, and the single
+        row is scored by the LightGBM booster directly.
+        
+        Returns:
+        --------
+        float
+            Predicted return over the prediction horizon after this bar
+        """
+        if self.model is None:
+            raise ValueError("Model not trained yet")
+        pair = pair or f"{self.base_currency}/{self.quote_currency}"
+        if pair not in self.online_features:
+            raise ValueError(f"No bar history for {pair}, call warm_up first")
         
-        return predictions[-1]  # Return the most recent prediction
+        features = self.online_features[pair].update(open_, high, low, close)
+        if np.isnan(features).any():
+            raise ValueError(f"Not enough bars for prediction yet ({self.online_features[pair].n_bars})")
+        X = ((features - self.scaler.mean_) / self.scaler.scale_).reshape(1, -1)
+        return self._booster().predict(X)[0]
+    
+    def _booster(self):
+        """
+        The LightGBM booster: of the LGBMRegressor after train(), or the
+        lgb.Booster itself after loading an artifact
+        """
+        return getattr(self.model, 'booster_', self.model)
     
     def save_model(self, filepath):
         """
-        Save the trained model
+        Save the trained model as an artifact directory
+        
+        The booster is stored as a LightGBM text model, the scaler as .npy
+        arrays and the pair, horizon and feature list in the manifest (see
+        artifacts.write_artifact).
         """
         if self.model is None:
             raise ValueError("No model to save")
-            
-        joblib.dump({
-            'model': self.model,
-            'scaler': self.scaler
-        }, filepath)
+        
+        meta = {
+            'currency_pair': f"{self.base_currency}/{self.quote_currency}",
+            'prediction_horizon': self.prediction_horizon,
+            'features': self.feature_names,
+            'n_samples_seen': int(self.scaler.n_samples_seen_),
+            'lightgbm': lgb.__version__,
+        }
+        arrays = {
+            'scaler_mean': self.scaler.mean_,
+            'scaler_var': self.scaler.var_,
+            'scaler_scale': self.scaler.scale_,
+        }
+        write_artifact(filepath, FOREX_KIND, meta, arrays,
+                       files={'model': ('model.txt', self._booster().model_to_string())})
         
     def load_model(self, filepath):
         """
-        Load a trained model
+        Load a trained model from an artifact directory, or from a joblib
+        file written by earlier versions
         """
-        saved_model = joblib.load(filepath)
-        self.model = saved_model['model']
-        self.scaler = saved_model['scaler'] 
\ No newline at end of file
+        if not is_artifact(filepath):
+            saved_model = joblib.load(filepath)
+            if 'features' not in saved_model:
+                raise ValueError("Model was saved without its feature list, retrain it")
+            self.model = saved_model['model']
+            self.scaler = saved_model['scaler']
+            self.feature_names = saved_model['features']
+            self.online_features = {}
+            return
+        
+        # Read every file from the version the artifact symlink points to now
+        filepath = os.path.realpath(filepath)
+        manifest = read_manifest(filepath)
+        if manifest['kind'] != FOREX_KIND:
+            raise ValueError(f"Not a ForexPredictor artifact: {manifest['kind']}")
+        meta = manifest['meta']
+        arrays = load_arrays(filepath, manifest)
+        
+        scaler = StandardScaler()
+        scaler.mean_ = arrays['scaler_mean']
+        scaler.var_ = arrays['scaler_var']
+        scaler.scale_ = arrays['scaler_scale']
+        scaler.n_samples_seen_ = meta['n_samples_seen']
+        scaler.n_features_in_ = len(meta['features'])
+        scaler.feature_names_in_ = np.array(meta['features'], dtype=object)
+        
+        self.model = lgb.Booster(model_str=read_file(filepath, manifest, 'model'))
+        self.scaler = scaler
+        self.feature_names = meta['features']
+        self.prediction_horizon = meta['prediction_horizon']
+        self.online_features = {}
@@ -0,0 +1,80 @@
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeout in seconds applied when the caller does not pass one
+DEFAULT_TIMEOUT = (5, 30)
+
+# Pooled keep-alive connections per host, and number of hosts kept in the pool
+CONNECTIONS_PER_HOST = 8
+MAX_HOSTS = 16
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# One pooled session per process, so connections (and their TCP/TLS handshakes)
+# are reused across calls to Alpha Vantage, News API, HistData and the local API
+_session = None
+_session_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a default timeout and a bounded per-host pool"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, connections_per_host=CONNECTIONS_PER_HOST, max_hosts=MAX_HOSTS):
+        super().__init__()
+        self.timeout = timeout
+        self.headers.update(DEFAULT_HEADERS)
+        # pool_block keeps at most connections_per_host open sockets per host
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=connections_per_host, pool_block=True)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session():
+    """
+    Get the process-wide pooled session (created on first use)
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession()
+    return _session
+
+
+def get(url, params=None, **kwargs):
+    """
+    GET through the shared session, drop-in for requests.get
+    """
+    return get_session().get(url, params=params, **kwargs)
+
+
+def async_client(transport=None, timeout=30.0, max_connections=CONNECTIONS_PER_HOST):
+    """
+    Create an httpx.AsyncClient with the same pooling, gzip and timeout defaults
+
+    Parameters:
+    -----------
+    transport : httpx.AsyncBaseTransport, optional
+        Custom transport (e.g. httpx.MockTransport in tests)
+    timeout : float
+        Timeout in seconds for every request phase (default: 30)
+    max_connections : int
+        Maximum open connections across all hosts (default: CONNECTIONS_PER_HOST).
+        httpx has no per-host limit; the async collectors talk to Alpha Vantage
+        only, so this is their per-host limit too
+    """
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=timeout,
+        headers=DEFAULT_HEADERS,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
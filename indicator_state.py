@@ -0,0 +1,274 @@
+import json
+import numpy as np
+import pandas as pd
+
+CHECKPOINT_VERSION = 1
+
+# Output columns, in the order ForexDataCollector._process_data adds them
+INDICATOR_COLUMNS = [
+    'SMA_20', 'EMA_20', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'ATR',
+    'Bollinger_Upper', 'Bollinger_Middle', 'Bollinger_Lower', 'Weekly_VWAP',
+    'Resistance', 'Support', 'Returns', 'Log_Returns'
+]
+
+# Exponential averages as (pandas ewm kwargs, min_periods), matching the ta library
+EWM_SPECS = {
+    'ema_20': ({'span': 20}, 20),
+    'ema_12': ({'span': 12}, 12),
+    'ema_26': ({'span': 26}, 26),
+    'macd_signal': ({'span': 9}, 9),
+    'rsi_up': ({'alpha': 1 / 14}, 14),
+    'rsi_down': ({'alpha': 1 / 14}, 14),
+}
+
+ROLLING_WINDOW = 20
+ATR_WINDOW = 14
+
+
+class IncrementalIndicators:
+    def __init__(self, currency_pair="EUR/USD", interval="daily"):
+        """
+        Streaming version of the indicators computed by ForexDataCollector._process_data
+
+        The rolling windows keep a ring buffer of the last bars, the exponential
+        averages (EMA, MACD, RSI) keep their last weighted value and the ATR keeps
+        its Wilder average, so appending N bars costs O(N) instead of O(history).
+
+        Parameters:
+        -----------
+        currency_pair : str
+            The forex pair this state belongs to (e.g., "EUR/USD")
+        interval : str
+            The bar interval this state belongs to (e.g., "daily", "45min")
+        """
+        self.currency_pair = currency_pair
+        self.interval = interval
+        self.n_bars = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+        # Ring buffers with the last ROLLING_WINDOW - 1 raw bars
+        self.tail = {'High': [], 'Low': [], 'Close': []}
+
+        # Last close (raw and last non-NaN) for diffs and returns
+        self.prev_close = np.nan
+        self.prev_valid_close = np.nan
+
+        # EWM state: last weighted value, NaN inputs since that value, observations seen
+        self.ewm = {name: {'weighted': np.nan, 'pending': 0, 'nobs': 0} for name in EWM_SPECS}
+
+        # Wilder ATR state: true ranges until the first average is available (None after)
+        self.atr = np.nan
+        self.atr_warmup = []
+
+    def _ewm_update(self, name, values):
+        """
+        Continue an adjust=False exponential average over new values
+
+        The previous weighted value (followed by the NaNs seen since) is
+        prepended so pandas resumes the exact same recursion.
+        """
+        kwargs, min_periods = EWM_SPECS[name]
+        state = self.ewm[name]
+
+        if np.isnan(state['weighted']):
+            prefix = []
+        else:
+            prefix = [state['weighted']] + [np.nan] * state['pending']
+
+        series = pd.Series(np.concatenate([prefix, values]).astype(float))
+        weighted = series.ewm(adjust=False, min_periods=0, **kwargs).mean().to_numpy()[len(prefix):]
+
+        observed = ~np.isnan(values)
+        nobs = state['nobs'] + np.cumsum(observed)
+        result = np.where(nobs >= min_periods, weighted, np.nan)
+
+        if len(values):
+            state['nobs'] = int(nobs[-1])
+            if observed.any():
+                state['weighted'] = float(weighted[-1])
+                state['pending'] = int(len(values) - 1 - np.flatnonzero(observed)[-1])
+            elif not np.isnan(state['weighted']):
+                state['pending'] += len(values)
+        return result
+
+    def _atr_update(self, true_range):
+        """
+        Continue the Wilder ATR (zero until the first full window, like ta)
+        """
+        atr = np.zeros(len(true_range))
+        for i, tr in enumerate(true_range):
+            if self.atr_warmup is not None:
+                self.atr_warmup.append(float(tr))
+                if len(self.atr_warmup) == ATR_WINDOW:
+                    self.atr = float(pd.Series(self.atr_warmup).mean())
+                    self.atr_warmup = None
+                    atr[i] = self.atr
+            else:
+                self.atr = (self.atr * (ATR_WINDOW - 1) + tr) / float(ATR_WINDOW)
+                atr[i] = self.atr
+        return atr
+
+    def update(self, bars):
+        """
+        Append new bars and return their indicator values
+
+        Parameters:
+        -----------
+        bars : pd.DataFrame
+            New bars with datetime index and 'High', 'Low', 'Close' columns,
+            strictly after the last bar already seen
+
+        Returns:
+        --------
+        pd.DataFrame
+            Indicator columns for the new bars only
+        """
+        if bars is None or bars.empty:
+            return pd.DataFrame(columns=INDICATOR_COLUMNS, dtype=float)
+
+        if self.last_timestamp is not None and bars.index[0] <= self.last_timestamp:
+            raise ValueError(f"Bars must start after {self.last_timestamp}, got {bars.index[0]}")
+
+        n_new = len(bars)
+        n_tail = len(self.tail['Close'])
+        high = np.concatenate([self.tail['High'], bars['High'].to_numpy(dtype=float)])
+        low = np.concatenate([self.tail['Low'], bars['Low'].to_numpy(dtype=float)])
+        close = np.concatenate([self.tail['Close'], bars['Close'].to_numpy(dtype=float)])
+        new_close = close[n_tail:]
+
+        # Rolling windows over the ring buffer plus the new bars
+        close_s = pd.Series(close)
+        sma = close_s.rolling(window=ROLLING_WINDOW, min_periods=ROLLING_WINDOW).mean().to_numpy()[n_tail:]
+        std = close_s.rolling(window=ROLLING_WINDOW, min_periods=ROLLING_WINDOW).std(ddof=0).to_numpy()[n_tail:]
+        vwap = close_s.rolling(window=5).mean().to_numpy()[n_tail:]
+        resistance = pd.Series(high).rolling(window=ROLLING_WINDOW).max().to_numpy()[n_tail:]
+        support = pd.Series(low).rolling(window=ROLLING_WINDOW).min().to_numpy()[n_tail:]
+
+        # Previous close for every new bar
+        prev_close = np.concatenate([[self.prev_close], new_close[:-1]])
+
+        # Exponential averages
+        ema_20 = self._ewm_update('ema_20', new_close)
+        macd = self._ewm_update('ema_12', new_close) - self._ewm_update('ema_26', new_close)
+        macd_signal = self._ewm_update('macd_signal', macd)
+
+        # RSI (Wilder smoothing of gains and losses)
+        diff = new_close - prev_close
+        with np.errstate(invalid='ignore'):
+            up = np.where(diff > 0, diff, 0.0)
+            down = -np.where(diff < 0, diff, 0.0)
+        ema_up = self._ewm_update('rsi_up', up)
+        ema_down = self._ewm_update('rsi_down', down)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(ema_down == 0, 100, 100 - (100 / (1 + ema_up / ema_down)))
+
+        # ATR
+        true_range = pd.DataFrame({
+            'tr1': high[n_tail:] - low[n_tail:],
+            'tr2': np.abs(high[n_tail:] - prev_close),
+            'tr3': np.abs(low[n_tail:] - prev_close),
+        }).max(axis=1).to_numpy()
+        atr = self._atr_update(true_range)
+
+        # Returns (pct_change forward-fills missing closes first)
+        filled_close = pd.Series(np.concatenate([[self.prev_valid_close], new_close])).ffill().to_numpy()
+        returns = filled_close[1:] / filled_close[:-1] - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.log(new_close / prev_close)
+
+        result = pd.DataFrame({
+            'SMA_20': sma,
+            'EMA_20': ema_20,
+            'RSI': rsi,
+            'MACD': macd,
+            'MACD_Signal': macd_signal,
+            'MACD_Hist': macd - macd_signal,
+            'ATR': atr,
+            'Bollinger_Upper': sma + 2 * std,
+            'Bollinger_Middle': sma,
+            'Bollinger_Lower': sma - 2 * std,
+            'Weekly_VWAP': vwap,
+            'Resistance': resistance,
+            'Support': support,
+            'Returns': returns,
+            'Log_Returns': log_returns,
+        }, index=bars.index)
+
+        # Roll the state forward
+        keep = ROLLING_WINDOW - 1
+        self.tail = {
+            'High': high[-keep:].tolist(),
+            'Low': low[-keep:].tolist(),
+            'Close': close[-keep:].tolist(),
+        }
+        self.prev_close = float(new_close[-1])
+        self.prev_valid_close = float(filled_close[-1])
+        if self.first_timestamp is None:
+            self.first_timestamp = bars.index[0]
+        self.last_timestamp = bars.index[-1]
+        self.n_bars += n_new
+
+        return result
+
+    def to_dict(self):
+        """
+        Serialize the state to plain Python types
+        """
+        return {
+            'version': CHECKPOINT_VERSION,
+            'currency_pair': self.currency_pair,
+            'interval': self.interval,
+            'n_bars': self.n_bars,
+            'first_timestamp': None if self.first_timestamp is None else self.first_timestamp.isoformat(),
+            'last_timestamp': None if self.last_timestamp is None else self.last_timestamp.isoformat(),
+            'tail': {key: list(values) for key, values in self.tail.items()},
+            'prev_close': self.prev_close,
+            'prev_valid_close': self.prev_valid_close,
+            'ewm': {name: dict(values) for name, values in self.ewm.items()},
+            'atr': self.atr,
+            'atr_warmup': None if self.atr_warmup is None else list(self.atr_warmup),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild an IncrementalIndicators from to_dict output
+        """
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported indicator checkpoint version: {state.get('version')}")
+
+        indicators = cls(state['currency_pair'], state['interval'])
+        indicators.n_bars = state['n_bars']
+        if state['first_timestamp'] is not None:
+            indicators.first_timestamp = pd.Timestamp(state['first_timestamp'])
+        if state['last_timestamp'] is not None:
+            indicators.last_timestamp = pd.Timestamp(state['last_timestamp'])
+        indicators.tail = {key: list(values) for key, values in state['tail'].items()}
+        indicators.prev_close = state['prev_close']
+        indicators.prev_valid_close = state['prev_valid_close']
+        indicators.ewm = {name: dict(values) for name, values in state['ewm'].items()}
+        indicators.atr = state['atr']
+        indicators.atr_warmup = None if state['atr_warmup'] is None else list(state['atr_warmup'])
+        return indicators
+
+    def copy(self):
+        """
+        Return an independent copy of the state
+        """
+        return IncrementalIndicators.from_dict(self.to_dict())
+
+    def save_checkpoint(self, path):
+        """
+        Save the state as a JSON checkpoint (floats round-trip exactly)
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """
+        Load a state saved with save_checkpoint
+        """
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,59 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageMetrics:
+    def __init__(self):
+        """
+        Per-stage wall-clock timing counters
+
+        Each stage keeps a call count, the total and the last duration in
+        seconds. Recording is a couple of perf_counter calls, cheap enough to
+        stay on in production.
+        """
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    @contextmanager
+    def time(self, stage):
+        """
+        Time the enclosed block as one call of ``stage``
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        """
+        Add one call of ``stage`` that took ``seconds``
+        """
+        with self._lock:
+            counter = self._stages.setdefault(stage, {'count': 0, 'total': 0.0, 'last': 0.0})
+            counter['count'] += 1
+            counter['total'] += seconds
+            counter['last'] = seconds
+
+    def snapshot(self):
+        """
+        Copy of the counters, with the mean duration of each stage
+
+        Returns:
+        --------
+        dict
+            {stage: {'count', 'total', 'last', 'mean'}} with durations in seconds
+        """
+        with self._lock:
+            return {
+                stage: {**counter, 'mean': counter['total'] / counter['count']}
+                for stage, counter in self._stages.items()
+            }
+
+    def reset(self):
+        """
+        Clear every counter
+        """
+        with self._lock:
+            self._stages.clear()
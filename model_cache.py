@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import prophet
+from prophet.serialize import model_to_json, model_from_json
+from price_cache import replace_atomically
+
+logger = logging.getLogger(__name__)
+
+
+def frame_hash(data):
+    """
+    Content hash of a training frame (values and column names, not memory layout)
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in data.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def model_key(pair, timeframe, price_column, data, params, init=None):
+    """
+    Cache key of a fitted model
+
+    A warm-started fit can end at a slightly different optimum than a cold
+    one, so the starting parameters are part of the key.
+
+    Parameters:
+    -----------
+    pair : str
+        Currency pair (e.g., "EUR/USD")
+    timeframe : str
+        Bar interval (e.g., "daily", "45min")
+    price_column : str
+        Price column the model was fitted on (e.g., "Close")
+    data : pd.DataFrame
+        Prepared training frame ('ds' and 'y' columns)
+    params : dict
+        Prophet constructor arguments
+    init : dict, optional
+        Starting parameters of a warm-started fit (default: None, a cold fit)
+    """
+    parts = {
+        'pair': pair,
+        'timeframe': timeframe,
+        'price_column': price_column,
+        'data': frame_hash(data),
+        'params': params,
+        'init': None if init is None else {name: np.asarray(value).tolist() for name, value in init.items()},
+        'prophet': prophet.__version__,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ModelCache:
+    def __init__(self, cache_dir="model_cache", max_entries=32, memory_entries=4):
+        """
+        LRU cache of fitted Prophet models
+
+        Models are kept as Prophet JSON files on disk, evicted least recently
+        used first, with the most recently used ones also held in memory so a
+        hit skips both the fit and the deserialization.
+
+        Parameters:
+        -----------
+        cache_dir : str
+            Directory of the serialized models (default: "model_cache")
+        max_entries : int
+            Models kept on disk (default: 32)
+        memory_entries : int
+            Models kept in memory (default: 4)
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_touch = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _touch(self, path):
+        """
+        Mark a file as most recently used; mtime is the LRU clock, kept strictly increasing
+        """
+        self._last_touch = max(time.time_ns(), self._last_touch + 1)
+        os.utime(path, ns=(self._last_touch, self._last_touch))
+
+    def _remember(self, key, model):
+        self._memory[key] = model
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Fitted model for a key, or None on a miss
+        """
+        with self._lock:
+            path = self._path(key)
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if os.path.exists(path):
+                    self._touch(path)
+                return self._memory[key]
+
+            try:
+                with open(path) as f:
+                    model = model_from_json(f.read())
+                self._touch(path)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.warning("Discarding unreadable cached model %s: %s", key, e)
+                os.remove(path)
+                return None
+            self._remember(key, model)
+            return model
+
+    def put(self, key, model):
+        """
+        Store a fitted model and evict the least recently used ones beyond max_entries
+        """
+        with self._lock:
+            path = self._path(key)
+            text = model_to_json(model)
+
+            def write(tmp_path):
+                with open(tmp_path, 'w') as f:
+                    f.write(text)
+            # Caches of other threads or processes may write the same key at once
+            replace_atomically(path, write)
+            self._touch(path)
+            self._remember(key, model)
+
+            # Other processes may share the directory and evict the same files
+            files = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    try:
+                        files.append((os.stat(os.path.join(self.cache_dir, name)).st_mtime_ns, name))
+                    except FileNotFoundError:
+                        continue
+            files.sort()
+            for _, stale in files[:max(0, len(files) - self.max_entries)]:
+                try:
+                    os.remove(os.path.join(self.cache_dir, stale))
+                except FileNotFoundError:
+                    pass
+                self._memory.pop(stale[:-len(".json")], None)
+
+    def clear(self):
+        """
+        Remove every cached model
+        """
+        with self._lock:
+            self._memory.clear()
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
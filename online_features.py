@@ -0,0 +1,165 @@
+import math
+from collections import deque
+import numpy as np
+from features import DEFAULT_FEATURES
+
+# Longest plain rolling window of the registry (sma_ratio_50)
+MAX_WINDOW = 50
+
+
+def _divide(numerator, denominator):
+    """
+    Float division with NumPy's semantics for a zero denominator (inf or NaN)
+    """
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return math.nan
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class _EWM:
+    """
+    pandas ewm(adjust=False, min_periods=...).mean() over a stream, skipping leading NaNs
+    """
+    __slots__ = ('alpha', 'min_periods', 'value', 'nobs')
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = math.nan
+        self.nobs = 0
+
+    def update(self, x):
+        if not math.isnan(x):
+            self.value = x if self.nobs == 0 else self.value + self.alpha * (x - self.value)
+            self.nobs += 1
+        return self.value if self.nobs >= self.min_periods else math.nan
+
+
+def _mean(values, window):
+    if len(values) < window:
+        return math.nan
+    return sum(values[i] for i in range(len(values) - window, len(values))) / window
+
+
+def _std(values, window, ddof):
+    if len(values) < window:
+        return math.nan
+    tail = [values[i] for i in range(len(values) - window, len(values))]
+    mean = sum(tail) / window
+    return math.sqrt(sum((x - mean) ** 2 for x in tail) / (window - ddof))
+
+
+class OnlineFeatures:
+    def __init__(self, names=None):
+        """
+        Streaming version of features.compute_features for one pair
+
+        Each new bar updates the rolling buffers and exponential averages and
+        returns the feature vector of that bar only, so the cost per bar does
+        not depend on the history length. After the same bars, the vector
+        matches the last row of compute_features.
+
+        Parameters:
+        -----------
+        names : list, optional
+            Registered feature names, in output order (default: DEFAULT_FEATURES)
+        """
+        self.names = list(DEFAULT_FEATURES if names is None else names)
+        unknown = [name for name in self.names if name not in DEFAULT_FEATURES]
+        if unknown:
+            raise ValueError(f"No online version of features: {unknown}")
+        self.n_bars = 0
+
+        # Last raw bars and derived series
+        self.close = deque(maxlen=MAX_WINDOW + 1)
+        self.high = deque(maxlen=14)
+        self.low = deque(maxlen=14)
+        self.log_returns = deque(maxlen=20)
+        self.stoch_k = deque(maxlen=3)
+
+        # Exponential averages, as in features.py
+        self.ema = {span: _EWM(2 / (span + 1), span) for span in (12, 26)}
+        self.macd_signal = _EWM(2 / 10, 9)
+        self.rsi_up = _EWM(1 / 14, 14)
+        self.rsi_down = _EWM(1 / 14, 14)
+        self.atr = _EWM(1 / 14, 14)
+
+    def update(self, open_, high, low, close):
+        """
+        Add one bar and return its feature vector
+
+        Returns:
+        --------
+        np.ndarray
+            Values of self.names; NaN while a feature lacks history
+        """
+        prev_close = self.close[-1] if self.close else math.nan
+        self.close.append(close)
+        self.high.append(high)
+        self.low.append(low)
+        self.n_bars += 1
+        closes = self.close
+        values = {}
+
+        for periods in (1, 5, 10):
+            values[f'return_{periods}'] = (close / closes[-periods - 1] - 1) if len(closes) > periods else math.nan
+
+        log_return = math.log(close) - math.log(prev_close) if self.n_bars > 1 else math.nan
+        values['log_return'] = log_return
+        if not math.isnan(log_return):
+            self.log_returns.append(log_return)
+        for window in (10, 20):
+            values[f'volatility_{window}'] = _std(self.log_returns, window, ddof=1)
+
+        for window in (10, 20, 50):
+            values[f'sma_ratio_{window}'] = close / _mean(closes, window) - 1
+
+        ema = {span: average.update(close) for span, average in self.ema.items()}
+        for span in (12, 26):
+            values[f'ema_ratio_{span}'] = close / ema[span] - 1
+        macd = ema[12] - ema[26]
+        signal = self.macd_signal.update(macd)
+        values['macd'] = macd
+        values['macd_signal'] = signal
+        values['macd_diff'] = macd - signal
+
+        change = close - prev_close
+        up = self.rsi_up.update(max(change, 0.0) if not math.isnan(change) else math.nan)
+        down = self.rsi_down.update(max(-change, 0.0) if not math.isnan(change) else math.nan)
+        values['rsi_14'] = 100 - _divide(100, 1 + _divide(up, down))
+
+        if len(self.low) == 14:
+            lowest, highest = min(self.low), max(self.high)
+            stoch_k = 100 * _divide(close - lowest, highest - lowest)
+            self.stoch_k.append(stoch_k)
+        else:
+            stoch_k = math.nan
+        values['stoch_k_14'] = stoch_k
+        values['stoch_d_14'] = _mean(self.stoch_k, 3)
+        values['williams_r_14'] = stoch_k - 100
+
+        middle = _mean(closes, 20)
+        std = _std(closes, 20, ddof=0)
+        values['bollinger_pband_20'] = _divide(close - (middle - 2 * std), 4 * std)
+        values['bollinger_width_20'] = 4 * std / middle
+
+        true_range = high - low
+        if not math.isnan(prev_close):
+            true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+        values['atr_ratio_14'] = self.atr.update(true_range) / close
+        values['range_ratio'] = (high - low) / close
+        values['close_location'] = _divide(close - low, high - low)
+
+        return np.array([values[name] for name in self.names])
+
+    def update_many(self, data):
+        """
+        Add the bars of an OHLC frame in order and return the feature vector of the last one
+        """
+        features = None
+        for open_, high, low, close in zip(data['Open'].to_numpy(dtype=float), data['High'].to_numpy(dtype=float),
+                                           data['Low'].to_numpy(dtype=float), data['Close'].to_numpy(dtype=float)):
+            features = self.update(open_, high, low, close)
+        return features
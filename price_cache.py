@@ -0,0 +1,247 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # Optional dependency, the collector falls back to no cache
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers still serialize within the process
+    fcntl = None
+
+INTRADAY_INTERVALS = {'1min', '5min', '15min', '30min', '45min', '60min'}
+MANIFEST_NAME = "_manifest.json"
+LOCK_NAME = "_lock"
+
+# mkstemp creates files readable by the owner only; replaced files get the
+# mode open() would have given them under the process umask instead
+_umask = os.umask(0o022)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+# One lock per dataset directory, shared by every PriceCache of the process, so
+# concurrent writers merge into the partitions and manifest one at a time
+_dataset_locks = {}
+_dataset_locks_lock = threading.Lock()
+
+
+@contextmanager
+def dataset_lock(dataset_dir):
+    """
+    Hold the writer lock of a dataset directory
+
+    Threads of this process serialize on an in-process lock, and processes
+    sharing the cache on an flock of the directory's lock file.
+    """
+    with _dataset_locks_lock:
+        lock = _dataset_locks.setdefault(os.path.abspath(dataset_dir), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(dataset_dir, LOCK_NAME), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def replace_atomically(path, write):
+    """
+    Call write(tmp_path) on a uniquely named file next to path, then rename it over path
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        os.chmod(tmp_path, FILE_MODE)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class PriceCache:
+    def __init__(self, cache_dir="data_cache"):
+        """
+        On-disk columnar cache of raw OHLC bars
+
+        Each pair and interval is one dataset directory of Arrow IPC files,
+        partitioned by year (by month for intraday intervals). Partitions are
+        read through memory maps, and a small manifest records the first and
+        last cached bar (the high-water mark) and the last write time.
+
+        Parameters:
+        -----------
+        cache_dir : str
+            Root directory of the cache (default: "data_cache")
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for the price cache. Install it with 'pip install pyarrow'.")
+        self.cache_dir = cache_dir
+
+    def _dataset_dir(self, pair, interval):
+        return os.path.join(self.cache_dir, pair.replace('/', ''), interval)
+
+    @staticmethod
+    def _partition_name(timestamp, interval):
+        if interval in INTRADAY_INTERVALS:
+            return timestamp.strftime("%Y-%m") + ".arrow"
+        return timestamp.strftime("%Y") + ".arrow"
+
+    def manifest(self, pair, interval):
+        """
+        Manifest of a dataset, or None when nothing is cached
+        """
+        path = os.path.join(self._dataset_dir(pair, interval), MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            manifest = json.load(f)
+        manifest['first'] = pd.Timestamp(manifest['first'])
+        manifest['last'] = pd.Timestamp(manifest['last'])
+        return manifest
+
+    def high_water_mark(self, pair, interval):
+        """
+        Timestamp of the latest cached bar, or None when nothing is cached
+        """
+        manifest = self.manifest(pair, interval)
+        return None if manifest is None else manifest['last']
+
+    def age(self, pair, interval):
+        """
+        Seconds since the dataset was last written, or None when nothing is cached
+        """
+        manifest = self.manifest(pair, interval)
+        return None if manifest is None else time.time() - manifest['written_at']
+
+    @staticmethod
+    def _read_partition(path):
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas().set_index('timestamp')
+
+    @staticmethod
+    def _write_partition(path, data):
+        table = pa.Table.from_pandas(data.rename_axis('timestamp').reset_index(), preserve_index=False)
+
+        def write(tmp_path):
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        replace_atomically(path, write)
+
+    def write(self, pair, interval, bars, complete=False, covered_from=None):
+        """
+        Merge bars into the cache; bars already cached at the same timestamp are replaced
+
+        Parameters:
+        -----------
+        pair : str
+            Currency pair (e.g., "EUR/USD")
+        interval : str
+            Bar interval (e.g., "Daily", "45min")
+        bars : pd.DataFrame
+            OHLC bars with a DatetimeIndex
+        complete : bool
+            True when the bars come from a download of the whole available history
+        covered_from : pd.Timestamp, optional
+            Start of the range the bars were downloaded for, when it precedes
+            the first bar (e.g. a weekend); recorded in the manifest
+        """
+        if bars is None or bars.empty:
+            return
+
+        dataset_dir = self._dataset_dir(pair, interval)
+        os.makedirs(dataset_dir, exist_ok=True)
+        bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+        with dataset_lock(dataset_dir):
+            self._merge(pair, interval, dataset_dir, bars, complete, covered_from)
+
+    def _merge(self, pair, interval, dataset_dir, bars, complete, covered_from):
+        """
+        Merge sorted, unique bars into the partitions, then update the manifest
+        """
+        partitions = pd.Index([self._partition_name(ts, interval) for ts in bars.index])
+        for name in partitions.unique():
+            path = os.path.join(dataset_dir, name)
+            new = bars[partitions == name]
+            if os.path.exists(path):
+                merged = pd.concat([self._read_partition(path), new])
+                new = merged[~merged.index.duplicated(keep='last')].sort_index()
+            self._write_partition(path, new)
+
+        manifest = self.manifest(pair, interval)
+        first, last = bars.index[0], bars.index[-1]
+        covered = [first] if covered_from is None else [first, pd.Timestamp(covered_from)]
+        if manifest is not None:
+            first, last = min(first, manifest['first']), max(last, manifest['last'])
+            complete = complete or manifest.get('complete', False)
+            covered.append(pd.Timestamp(manifest.get('covered_from', manifest['first'])))
+        manifest = {'first': first.isoformat(), 'last': last.isoformat(), 'covered_from': min(covered).isoformat(),
+                    'written_at': time.time(), 'complete': complete}
+
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+        replace_atomically(os.path.join(dataset_dir, MANIFEST_NAME), write)
+
+    def partitions(self, pair, interval, start_date=None, end_date=None):
+        """
+        Iterate over the cached bars of an inclusive date range, one partition at a time
+
+        Only partitions overlapping the range are opened, in time order, so a
+        long range (e.g. years of 1-minute bars) can be consumed without
+        holding all of it.
+
+        Yields:
+        -------
+        pd.DataFrame
+            Cached bars of one partition within the range, sorted by time
+        """
+        manifest = self.manifest(pair, interval)
+        if manifest is None:
+            return
+
+        start = manifest['first'] if start_date is None else max(pd.Timestamp(start_date), manifest['first'])
+        end = manifest['last'] if end_date is None else min(pd.Timestamp(end_date), manifest['last'])
+        if start > end:
+            return
+
+        step = 'MS' if interval in INTRADAY_INTERVALS else 'YS'
+        periods = pd.date_range(start.to_period('M' if step == 'MS' else 'Y').start_time, end, freq=step)
+        dataset_dir = self._dataset_dir(pair, interval)
+        for name in dict.fromkeys(self._partition_name(ts, interval) for ts in periods):
+            path = os.path.join(dataset_dir, name)
+            if os.path.exists(path):
+                data = self._read_partition(path)
+                data.index.name = None
+                data = data.loc[start:end]
+                if not data.empty:
+                    yield data
+
+    def read(self, pair, interval, start_date=None, end_date=None):
+        """
+        Read cached bars in an inclusive date range
+
+        Only partitions overlapping the range are opened.
+
+        Returns:
+        --------
+        pd.DataFrame
+            Cached bars sorted by time (empty when nothing is cached)
+        """
+        frames = list(self.partitions(pair, interval, start_date, end_date))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
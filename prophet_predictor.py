@@ -1,16 +1,62 @@
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
 import pandas as pd
 import numpy as np
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
+import copy
 import logging
+import os
+import weakref
+from model_cache import model_key
+from metrics import StageMetrics
+from compiled_prophet import export_prophet, prophet_arrays
+from artifacts import PROPHET_KIND, is_artifact, read_file, read_manifest, write_artifact
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Cacheable Prophet fits in flight, keyed by model cache key
+_fits = SingleFlight()
 
 # Disable Prophet logging to clean up console output
 logging.getLogger('prophet').setLevel(logging.WARNING)
 logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
 
+# Prophet settings, with holidays disabled to avoid incompatibility issues
+PROPHET_PARAMS = {
+    'daily_seasonality': True,
+    'weekly_seasonality': True,
+    'yearly_seasonality': True,
+    'changepoint_prior_scale': 0.05,
+    'holidays': None,
+}
+
+# Simpler settings used when the full ones cannot be initialized
+FALLBACK_PROPHET_PARAMS = {
+    'daily_seasonality': False,
+    'weekly_seasonality': False,
+    'yearly_seasonality': True,
+}
+
+def warm_start_params(model):
+    """
+    Fitted parameters of a Prophet model in the form expected by ``fit(init=...)``
+    
+    Parameters:
+    -----------
+    model : Prophet
+        A fitted model (MAP estimate, or the posterior mean for MCMC fits)
+    """
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = float(np.mean(model.params[name]))
+    for name in ['delta', 'beta']:
+        params[name] = np.mean(model.params[name], axis=0)
+    return params
+
 class ProphetPredictor:
-    def __init__(self, prediction_horizon=1):
+    def __init__(self, prediction_horizon=1, model_cache=None):
         """
         Initialize Prophet predictor
         
@@ -18,128 +64,122 @@ class ProphetPredictor:
         -----------
         prediction_horizon : int
             Number of periods to predict ahead
+        model_cache : ModelCache, optional
+            Cache of fitted models; train() reuses a cached fit for the same
+            pair, timeframe, price column, data and settings
+        """
+        # Timings of the prepare, fit, make_future and predict stages
+        self.metrics = StageMetrics()
+        self.model = self._new_model()
+        # (weakref to the input, fingerprint, prepared frame) of the last prepare_data call
+        self._prepared = None
+        self.prediction_horizon = prediction_horizon
+        self.model_cache = model_cache
+    
+    def _new_model(self):
+        """
+        Build an unfitted Prophet model, falling back to simpler settings on failure
         """
         try:
-            # Initialize with holidays disabled to avoid incompatibility issues
-            self.model = Prophet(
-                daily_seasonality=True,
-                weekly_seasonality=True,
-                yearly_seasonality=True,
-                changepoint_prior_scale=0.05,
-                holidays=None  # Disable holidays to avoid compatibility issues
-            )
+            model = Prophet(**PROPHET_PARAMS)
+            self.params = PROPHET_PARAMS
         except Exception as e:
-            # Fallback to simpler model if initialization fails
-            print(f"Error initializing Prophet with full settings: {str(e)}")
-            self.model = Prophet(
-                daily_seasonality=False,
-                weekly_seasonality=False,
-                yearly_seasonality=True
-            )
-            
-        self.prediction_horizon = prediction_horizon
+            logger.warning("Error initializing Prophet with full settings: %s", e)
+            model = Prophet(**FALLBACK_PROPHET_PARAMS)
+            self.params = FALLBACK_PROPHET_PARAMS
+        return model
         
     def prepare_data(self, data):
         """
         Prepare data for Prophet - simplified version that only uses the price column
         without any additional regressors to avoid NaN issues
         
+        The result for the last input frame is memoized, so train() followed
+        by predict() on the same frame prepares it once. Frames are matched
+        by identity, shape and columns: modify a copy, not the frame already
+        passed in.
+        
         Parameters:
         -----------
         data : pd.DataFrame
             DataFrame that either already has 'ds' and 'y' columns
             or has a datetime index and 'Close' column
         """
-        print("\n==== PROPHET DATA PREPARATION ====")
-        print(f"Input data shape: {data.shape}")
-        print(f"Input data columns: {data.columns.tolist()}")
-        print(f"Input data types: {data.dtypes}")
-        
-        # Create a clean DataFrame with only the required columns for Prophet
-        prophet_data = pd.DataFrame()
-        
-        # Set the datetime column
-        if 'ds' in data.columns:
-            prophet_data['ds'] = data['ds']
-            print("Using 'ds' column from input data")
-        else:
-            prophet_data['ds'] = data.index
-            print(f"Using index as 'ds' column, index type: {type(data.index)}")
+        fingerprint = (data.shape, tuple(data.columns))
+        if self._prepared is not None:
+            ref, prepared_fingerprint, prophet_data = self._prepared
+            if ref() is data and prepared_fingerprint == fingerprint:
+                return prophet_data
+        
+        with self.metrics.time('prepare'):
+            prophet_data = self._prepare_data(data)
+        self._prepared = (weakref.ref(data), fingerprint, prophet_data)
+        return prophet_data
+    
+    def _prepare_data(self, data):
+        """
+        Build the 'ds'/'y' frame in one pass over NumPy arrays
+        """
+        logger.debug("Preparing Prophet data: shape %s, columns %s", data.shape, list(data.columns))
         
-        # Ensure ds is datetime type
-        if not pd.api.types.is_datetime64_any_dtype(prophet_data['ds']):
-            print(f"WARNING: 'ds' column is not datetime type: {prophet_data['ds'].dtype}")
+        # Datetime column, from 'ds' or the index
+        ds = data['ds'] if 'ds' in data.columns else data.index
+        if not pd.api.types.is_datetime64_any_dtype(ds):
+            logger.warning("'ds' column is not datetime type: %s", ds.dtype)
             try:
-                prophet_data['ds'] = pd.to_datetime(prophet_data['ds'])
-                print("Successfully converted 'ds' to datetime")
+                ds = pd.to_datetime(ds)
             except Exception as e:
-                print(f"ERROR converting 'ds' to datetime: {str(e)}")
-                print(f"First few values of 'ds': {prophet_data['ds'].head()}")
-        
-        # Handle potential NaT (Not a Time) values in ds column
-        nat_count = pd.isna(prophet_data['ds']).sum()
-        if nat_count > 0:
-            print(f"WARNING: Found {nat_count} NaT values in 'ds' column")
-            # Drop rows with NaT in ds since Prophet requires valid datetime
-            prophet_data = prophet_data[~pd.isna(prophet_data['ds'])]
-            print(f"Dropped rows with NaT values, new shape: {prophet_data.shape}")
-        
-        # Set the target value column - with special handling for None values
+                logger.error("Error converting 'ds' to datetime: %s", e)
+                return pd.DataFrame()
+        ds = pd.DatetimeIndex(ds)
+        if ds.tz is not None:
+            # Prophet does not accept timezones
+            ds = ds.tz_localize(None)
+        ds = ds.to_numpy()
+        
+        # Target column, from 'y' or 'Close'; None and non-numeric values become NaN
         if 'y' in data.columns:
-            # Get values directly as array and convert to numeric
-            y_values = pd.to_numeric(data['y'].values, errors='coerce')
-            prophet_data['y'] = y_values
-            print("Using 'y' column from input data (converted to numeric)")
+            target = data['y']
+        elif 'Close' in data.columns:
+            target = data['Close']
         else:
-            # Extract the target column values directly and convert to numeric
-            if 'Close' in data.columns:
-                y_values = pd.to_numeric(data['Close'].values, errors='coerce')
-                prophet_data['y'] = y_values
-                print("Using 'Close' column converted to numeric array")
-            else:
-                print("ERROR: No 'y' or 'Close' column found in input data")
-                return pd.DataFrame()  # Return empty DataFrame if no valid target column
-        
-        # Check for explicit None values separately from NaN
-        none_count = (prophet_data['y'] == None).sum()
-        if none_count > 0:
-            print(f"WARNING: Found {none_count} explicit None values in 'y' column")
-            # Replace None with NaN so they can be handled in the next step
-            prophet_data['y'] = prophet_data['y'].replace(None, np.nan)
-        
-        # Check for NaN values in the y column
-        nan_count_before = prophet_data['y'].isna().sum()
-        if nan_count_before > 0:
-            print(f"WARNING: Found {nan_count_before} NaN values in 'y' column")
-            
-            # Calculate the mean of valid values for filling
-            y_mean = prophet_data['y'].mean()
-            if pd.isna(y_mean) or y_mean == 0:  # If mean is also NaN or zero, use a default value
-                print("WARNING: Cannot calculate mean for filling. Using default value 1.0")
+            logger.error("No 'y' or 'Close' column found in input data")
+            return pd.DataFrame()  # Return empty DataFrame if no valid target column
+        if pd.api.types.is_numeric_dtype(target) and not pd.api.types.is_bool_dtype(target):
+            y = target.to_numpy(dtype=float, copy=True)
+        else:
+            y = pd.to_numeric(target, errors='coerce').to_numpy(dtype=float, copy=True)
+        
+        # Drop rows with NaT in ds since Prophet requires valid datetime
+        valid = ~np.isnat(ds)
+        if not valid.all():
+            logger.warning("Dropping %d rows with NaT values in 'ds' column", len(valid) - valid.sum())
+            ds, y = ds[valid], y[valid]
+        
+        # Fill missing prices with the mean of the valid ones
+        missing = np.isnan(y)
+        if missing.any():
+            logger.warning("Found %d NaN values in 'y' column", missing.sum())
+            y_mean = y[~missing].mean() if not missing.all() else np.nan
+            if np.isnan(y_mean) or y_mean == 0:  # If mean is also NaN or zero, use a default value
+                logger.warning("Cannot calculate mean for filling, using default value 1.0")
                 y_mean = 1.0
-            
-            # Fill NaN values with the mean
-            prophet_data['y'] = prophet_data['y'].fillna(y_mean)
-            print(f"Filled NaN values with mean: {y_mean}")
-            
-            # Verify all NaN values have been fixed
-            nan_count_after = prophet_data['y'].isna().sum()
-            print(f"NaN values after filling: {nan_count_after}")
+            y[missing] = y_mean
+            logger.info("Filled NaN values with mean: %s", y_mean)
         
         # Ensure we have at least 2 valid data points
-        if len(prophet_data) < 2:
-            print("ERROR: Less than 2 valid data points after preparation")
+        if len(y) < 2:
+            logger.error("Less than 2 valid data points after preparation")
             # Return empty DataFrame to signal error
             return pd.DataFrame()
         
-        print(f"Final prophet_data shape: {prophet_data.shape}")
-        print(f"prophet_data head: \n{prophet_data.head()}")
-        print(f"prophet_data tail: \n{prophet_data.tail()}")
-        print("==== END OF PROPHET DATA PREPARATION ====\n")
-        
+        prophet_data = pd.DataFrame({'ds': ds, 'y': y})
+        logger.debug("Prepared Prophet data: shape %s", prophet_data.shape)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Prepared Prophet data head:\n%s\ntail:\n%s", prophet_data.head(), prophet_data.tail())
         return prophet_data
     
-    def train(self, data):
+    def train(self, data, pair=None, timeframe=None, price_column='Close', warm_start=False):
         """
         Train the Prophet model
         
@@ -147,6 +187,21 @@ class ProphetPredictor:
         -----------
         data : pd.DataFrame
             DataFrame with datetime index and price data
+        pair : str, optional
+            Currency pair of the data, part of the model cache key
+        timeframe : str, optional
+            Bar interval of the data, part of the model cache key
+        price_column : str
+            Price column the data was taken from, part of the model cache key (default: "Close")
+        warm_start : bool
+            Start the optimizer from the parameters of the current fitted model
+            (default: False). Meant for refits after a few new bars; falls back
+            to a cold fit when there is no fitted model or the shapes differ
+            
+        Returns:
+        --------
+        bool
+            True when the fitted model came from the model cache
         """
         # Prepare data for Prophet - ensuring only essential columns are used
         prophet_data = self.prepare_data(data)
@@ -155,29 +210,71 @@ class ProphetPredictor:
         if len(prophet_data) < 2:
             raise ValueError("Dataframe has less than 2 non-NaN rows")
         
+        init = None
+        if warm_start and self.model.history is not None:
+            init = warm_start_params(self.model)
+        
+        # Reuse a model already fitted on the same data and settings
+        key = None
+        if self.model_cache is not None:
+            key = model_key(pair, timeframe, price_column, prophet_data, PROPHET_PARAMS, init=init)
+            cached = self.model_cache.get(key)
+            if cached is not None:
+                self.model = cached
+                logger.info("Using cached Prophet model")
+                return True
+        
+        if key is None:
+            self._fit(prophet_data, init)
+            return False
+        
+        # Concurrent trains of the same model share one fit (and the fitted model,
+        # like cache hits do; predict never mutates it)
+        (self.model, self.params), shared = _fits.do(key, self._fit, prophet_data, init, key)
+        if shared:
+            logger.info("Using Prophet model fitted by a concurrent train")
+        return False
+    
+    def _fit(self, prophet_data, init=None, key=None):
+        """
+        Fit a new model on prepared data, caching it under key when one is given
+        
+        Parameters:
+        -----------
+        prophet_data : pd.DataFrame
+            Prepared 'ds'/'y' training frame
+        init : dict, optional
+            Starting parameters from warm_start_params (default: a cold fit)
+        key : str, optional
+            Model cache key to store the fit under
+        
+        Returns:
+        --------
+        tuple
+            (model, params) of the fitted model
+        """
         # Reset the model to a clean state
-        try:
-            self.model = Prophet(
-                daily_seasonality=True,
-                weekly_seasonality=True,
-                yearly_seasonality=True,
-                changepoint_prior_scale=0.05,
-                holidays=None  # Disable holidays to avoid compatibility issues
-            )
-        except Exception as e:
-            print(f"Error resetting Prophet model: {str(e)}")
-            self.model = Prophet(
-                daily_seasonality=False,
-                weekly_seasonality=False,
-                yearly_seasonality=True
-            )
+        self.model = self._new_model()
         
         # Fit the model with only the essential data (no regressors)
-        print(f"Fitting Prophet model with {len(prophet_data)} data points")
-        self.model.fit(prophet_data)
-        print("Prophet model fitting completed")
+        logger.info("Fitting Prophet model with %d data points%s", len(prophet_data),
+                    " (warm start)" if init is not None else "")
+        with self.metrics.time('fit'):
+            if init is not None:
+                try:
+                    self.model.fit(prophet_data, init=init)
+                except Exception as e:
+                    logger.warning("Warm start failed, fitting from scratch: %s", e)
+                    init = None
+                    self.model = self._new_model()
+            if init is None:
+                self.model.fit(prophet_data)
         
-    def predict(self, data, periods=None):
+        if key is not None and self.params is PROPHET_PARAMS:
+            self.model_cache.put(key, self.model)
+        return self.model, self.params
+        
+    def predict(self, data, periods=None, history=None, uncertainty=True):
         """
         Make predictions using the trained model
         
@@ -187,6 +284,13 @@ class ProphetPredictor:
             DataFrame with datetime index and price data
         periods : int
             Number of periods to forecast ahead
+        history : int, optional
+            Number of trailing historical dates to predict along with the
+            future ones (default: None, the whole history). Use 0 when only
+            the forecast horizon is read, e.g. for signals
+        uncertainty : bool
+            Compute yhat_lower/yhat_upper (default: True). Turning it off
+            skips Prophet's uncertainty sampling
         """
         if periods is None:
             periods = self.prediction_horizon
@@ -194,13 +298,57 @@ class ProphetPredictor:
         # Prepare data for Prophet - ensuring only essential columns are used
         prophet_data = self.prepare_data(data)
         
+        with self.metrics.time('make_future'):
+            if history is None:
+                future = self._make_future(prophet_data, periods)
+            else:
+                future = self._make_future_window(prophet_data, periods, history)
+        
+        # The model may be shared (model cache, concurrent trains), so intervals are
+        # turned off on a shallow copy rather than on the model itself
+        model = self.model
+        if not uncertainty:
+            model = copy.copy(model)
+            model.uncertainty_samples = 0
+        
+        # Make predictions with better error handling
+        with self.metrics.time('predict'):
+            try:
+                logger.debug("Generating forecast for next %d periods", periods)
+                forecast = model.predict(future)
+            except Exception as e:
+                logger.warning("Error during forecast generation, retrying with 'ds' only: %s", e)
+                # If we hit an error, try one more approach - use only the 'ds' and none of the regressors
+                minimal_future = pd.DataFrame({'ds': future['ds']})
+                forecast = model.predict(minimal_future)
+        
+        return forecast
+    
+    @staticmethod
+    def _make_future_window(prophet_data, periods, history):
+        """
+        The last ``history`` dates of the data plus ``periods`` daily dates after the last one
+        
+        Only the maximum date is needed for a pure forecast, so the history is
+        neither sorted nor copied in that case.
+        """
+        ds = prophet_data['ds']
+        future_dates = pd.date_range(start=ds.max() + pd.Timedelta(days=1), periods=periods, freq='D')
+        if history <= 0:
+            return pd.DataFrame({'ds': future_dates})
+        
+        if not ds.is_monotonic_increasing:
+            ds = ds.sort_values()
+        return pd.DataFrame({'ds': np.concatenate([ds.to_numpy()[-history:], future_dates.to_numpy()])})
+    
+    def _make_future(self, prophet_data, periods):
+        """
+        History plus ``periods`` daily dates after the last one
+        """
         try:
-            # Create future dataframe more carefully
-            print(f"Creating future dataframe for {periods} periods ahead")
-            
             # Get the last date from our data
             last_date = prophet_data['ds'].max()
-            print(f"Last date in data: {last_date}")
+            logger.debug("Creating future dataframe for %d periods after %s", periods, last_date)
             
             # Create a clean date range for future predictions
             try:
@@ -210,7 +358,6 @@ class ProphetPredictor:
                     periods=periods,
                     freq='D'
                 )
-                print(f"Created future dates: {future_dates}")
                 
                 # Create a dataframe with all historical and future dates
                 historical_dates = prophet_data['ds'].sort_values().reset_index(drop=True)
@@ -220,10 +367,9 @@ class ProphetPredictor:
                 ]).reset_index(drop=True)
                 
                 future = pd.DataFrame({'ds': all_dates})
-                print(f"Created future dataframe with shape: {future.shape}")
                 
             except Exception as e:
-                print(f"Error creating custom date range: {str(e)}, falling back to Prophet's method")
+                logger.warning("Error creating custom date range, falling back to Prophet's method: %s", e)
                 # Fall back to Prophet's built-in method if our approach fails
                 future = self.model.make_future_dataframe(
                     periods=periods,
@@ -231,32 +377,21 @@ class ProphetPredictor:
                     include_history=True
                 )
         except Exception as e:
-            print(f"Error preparing future dataframe: {str(e)}, using Prophet's default method")
+            logger.warning("Error preparing future dataframe, using Prophet's default method: %s", e)
             # Use Prophet's built-in method as a last resort
             future = self.model.make_future_dataframe(
                 periods=periods,
                 freq='D',
                 include_history=True
             )
-        
-        # Make predictions with better error handling
-        try:
-            print(f"Generating forecast for next {periods} periods")
-            forecast = self.model.predict(future)
-            print("Forecast generation completed successfully")
-        except Exception as e:
-            print(f"Error during forecast generation: {str(e)}")
-            # If we hit an error, try one more approach - use only the 'ds' and none of the regressors
-            print("Attempting fallback prediction method...")
-            minimal_future = pd.DataFrame({'ds': future['ds']})
-            forecast = self.model.predict(minimal_future)
-            print("Fallback forecast generation completed")
-        
-        return forecast
+        return future
     
     def evaluate(self, data):
         """
         Evaluate model performance
+        
+        This is an in-sample fit check; backtester.Backtester gives
+        out-of-sample walk-forward errors.
         """
         # Make predictions for the entire dataset
         forecast = self.predict(data)
@@ -299,14 +434,36 @@ class ProphetPredictor:
         
         return min(max(confidence_score, 0), 1)  # Ensure score is between 0 and 1
     
+    def export_compiled(self, path):
+        """
+        Export the trained model for CompiledProphetPredictor, which serves
+        forecasts with NumPy only (no Prophet or Stan import)
+        """
+        export_prophet(self.model, path, prediction_horizon=self.prediction_horizon)
+    
     def save_model(self, path):
         """
-        Save the trained model
+        Save the trained model as an artifact directory
+        
+        The arrays of the compiled model are what artifacts.load_artifact
+        serves forecasts from. The full Prophet model is kept alongside as
+        Prophet JSON for load_model, which is needed to refit or evaluate.
         """
-        joblib.dump(self.model, path)
+        meta, arrays = prophet_arrays(self.model, prediction_horizon=self.prediction_horizon)
+        write_artifact(path, PROPHET_KIND, meta, arrays,
+                       files={'prophet': ('prophet.json', model_to_json(self.model))})
     
     def load_model(self, path):
         """
-        Load a trained model
+        Load a trained model from an artifact directory, or from a joblib
+        file written by earlier versions
         """
-        self.model = joblib.load(path) 
\ No newline at end of file
+        if not is_artifact(path):
+            self.model = joblib.load(path)
+            return
+        path = os.path.realpath(path)
+        manifest = read_manifest(path)
+        if manifest['kind'] != PROPHET_KIND:
+            raise ValueError(f"Not a Prophet artifact: {manifest['kind']}")
+        self.model = model_from_json(read_file(path, manifest, 'prophet'))
+        self.prediction_horizon = manifest['meta']['prediction_horizon']
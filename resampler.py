@@ -0,0 +1,197 @@
+import threading
+import time
+import pandas as pd
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+BASE_INTERVAL = '1min'
+
+# Derived interval -> (parent interval, pandas rule). Every bin of an interval is
+# a union of whole parent bins, so each level is built from the one before it
+# instead of from the raw minutes. Parents are listed before their children.
+RESAMPLE_RULES = {
+    '5min': ('1min', '5T'),
+    '15min': ('5min', '15T'),
+    '30min': ('15min', '30T'),
+    '45min': ('15min', '45T'),
+    '60min': ('30min', '60T'),
+    '4h': ('60min', '4H'),
+}
+
+# Bins are labelled by their start; fixed frequencies are aligned on midnight
+RESAMPLE_KWARGS = {'closed': 'left', 'label': 'left', 'origin': 'epoch'}
+
+
+def resample_bars(bars, rule):
+    """
+    Aggregate OHLC(V) bars to a coarser rule, dropping empty bins
+
+    Parameters:
+    -----------
+    bars : pd.DataFrame
+        Bars with a sorted DatetimeIndex and any of the Open/High/Low/Close/Volume columns
+    rule : str
+        pandas offset alias (e.g., "45T", "4H", "D")
+    """
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in bars.columns}
+    return bars.resample(rule, **RESAMPLE_KWARGS).agg(agg).dropna(subset=['Open'])
+
+
+def bin_start(timestamp, rule):
+    """
+    Start of the bin of ``rule`` containing ``timestamp``
+    """
+    return pd.Series([0], index=[timestamp]).resample(rule, **RESAMPLE_KWARGS).sum().index[0]
+
+
+class MultiIntervalResampler:
+    def __init__(self, intervals=None):
+        """
+        Derived bars for several intervals, built from one 1-minute base series
+
+        New minute bars are pushed with update(). Each interval recomputes only
+        its bins from the first bin touched by the new bars on, using the
+        bars of its parent interval, and keeps the result in memory so
+        reading any interval is a lookup.
+
+        Parameters:
+        -----------
+        intervals : list of str, optional
+            Intervals to maintain (default: all of RESAMPLE_RULES). The
+            intermediate intervals they are derived from are added as needed
+        """
+        wanted = set(RESAMPLE_RULES if intervals is None else intervals)
+        unknown = wanted - set(RESAMPLE_RULES)
+        if unknown:
+            raise ValueError(f"Unsupported intervals: {sorted(unknown)}")
+
+        # Add ancestors, then keep the parent-before-child order of RESAMPLE_RULES
+        for interval in list(wanted):
+            parent = RESAMPLE_RULES[interval][0]
+            while parent != BASE_INTERVAL:
+                wanted.add(parent)
+                parent = RESAMPLE_RULES[parent][0]
+        self.intervals = [interval for interval in RESAMPLE_RULES if interval in wanted]
+
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """
+        Drop every derived bar (e.g. before rebuilding from an older base)
+        """
+        with self._lock:
+            self.bars = {interval: pd.DataFrame() for interval in self.intervals}
+            # Minute bars of the last, still open, bin of the finest interval
+            self._minute_tail = pd.DataFrame()
+            self.first_timestamp = None
+            self.last_timestamp = None
+            # Start of the range the base was requested for (the data may begin later,
+            # e.g. when that range starts on a weekend); lowered by the collector on backfills
+            self.covered_from = None
+            self.updated_at = None
+
+    def update(self, minute_bars):
+        """
+        Append new 1-minute bars and refresh every derived interval
+
+        Parameters:
+        -----------
+        minute_bars : pd.DataFrame
+            1-minute bars with a DatetimeIndex, strictly after the last bar already seen
+
+        Returns:
+        --------
+        dict
+            {interval: pd.DataFrame} with the bars of each interval that were
+            added or changed by this update
+        """
+        if minute_bars is None or minute_bars.empty:
+            return {}
+
+        with self._lock:
+            minute_bars = minute_bars.sort_index()
+            if self.last_timestamp is not None and minute_bars.index[0] <= self.last_timestamp:
+                raise ValueError(f"Minute bars must start after {self.last_timestamp}, got {minute_bars.index[0]}")
+
+            source = pd.concat([self._minute_tail, minute_bars]) if not self._minute_tail.empty else minute_bars
+            changed = {BASE_INTERVAL: source}
+            for interval in self.intervals:
+                parent, rule = RESAMPLE_RULES[interval]
+                start = bin_start(changed[parent].index[0], rule)
+                rows = source if parent == BASE_INTERVAL else self.bars[parent]
+                new = resample_bars(rows[rows.index >= start], rule)
+
+                cached = self.bars[interval]
+                self.bars[interval] = pd.concat([cached[cached.index < start], new]) if not cached.empty else new
+                changed[interval] = new
+
+            finest_rule = RESAMPLE_RULES[self.intervals[0]][1]
+            self._minute_tail = source[source.index >= bin_start(source.index[-1], finest_rule)]
+
+            if self.first_timestamp is None:
+                self.first_timestamp = minute_bars.index[0]
+            if self.covered_from is None or self.covered_from > self.first_timestamp:
+                self.covered_from = self.first_timestamp
+            self.last_timestamp = minute_bars.index[-1]
+            self.updated_at = time.time()
+
+        del changed[BASE_INTERVAL]
+        return changed
+
+    def splice(self, parts):
+        """
+        Splice in the bars of resamplers built from other stretches of minutes
+
+        Each part covers minutes entirely before or after this resampler's and
+        the other parts' (e.g. one HistData month each, or an older range
+        backfilled later), so the derived bars are concatenated in time
+        order. A bin straddling two parts holds a bar from each; those are
+        combined like the minutes would have been (first open, max high, min
+        low, last close, summed volume).
+
+        Parameters:
+        -----------
+        parts : list of MultiIntervalResampler
+            Resamplers maintaining the same intervals
+        """
+        with self._lock:
+            parts = sorted((part for part in [self, *parts] if part.last_timestamp is not None),
+                           key=lambda part: part.first_timestamp)
+            if not parts:
+                return
+            for before, after in zip(parts, parts[1:]):
+                if before.last_timestamp >= after.first_timestamp:
+                    raise ValueError(f"Spliced minutes overlap: {before.last_timestamp} >= {after.first_timestamp}")
+
+            for interval in self.intervals:
+                frames = [part.bars[interval] for part in parts if not part.bars[interval].empty]
+                bars = pd.concat(frames) if len(frames) > 1 else frames[0]
+                if bars.index.has_duplicates:
+                    agg = {col: how for col, how in OHLCV_AGG.items() if col in bars.columns}
+                    bars = bars.groupby(level=0, sort=False).agg(agg)
+                self.bars[interval] = bars
+
+            self._minute_tail = parts[-1]._minute_tail
+            self.first_timestamp = parts[0].first_timestamp
+            self.last_timestamp = parts[-1].last_timestamp
+            self.covered_from = min(part.covered_from for part in parts)
+            self.updated_at = time.time()
+
+    def get(self, interval, start_date=None, end_date=None):
+        """
+        Derived bars of one interval in an inclusive date range
+
+        Returns:
+        --------
+        pd.DataFrame
+            Bars labelled by their start time (empty before the first update)
+        """
+        if interval not in self.bars:
+            raise ValueError(f"Interval '{interval}' is not maintained by this resampler")
+
+        with self._lock:
+            bars = self.bars[interval]
+        if bars.empty:
+            return bars.copy()
+        return bars.loc[start_date:end_date].copy()
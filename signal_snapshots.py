@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+# Length of a daily bar, in seconds
+DAY_SECONDS = 24 * 60 * 60
+
+
+class SignalSnapshots:
+    def __init__(self, compute, pairs, bar_seconds=DAY_SECONDS, settle_seconds=300, retry_seconds=30):
+        """
+        Latest trading signal of each pair, recomputed in the background when a bar closes
+
+        Each refresh stores a new read-only snapshot, so readers get a
+        consistent signal with a dictionary lookup and never wait for the
+        upstream APIs. A failed refresh keeps the previous snapshot (its age
+        keeps growing) and is retried after retry_seconds.
+
+        Parameters:
+        -----------
+        compute : coroutine function
+            compute(pair) returns the signal fields of a pair as a dict
+        pairs : list of str
+            Pairs to keep signals for
+        bar_seconds : int
+            Bar length; bars close on multiples of it since the epoch, in UTC (default: one day)
+        settle_seconds : float
+            Wait after a bar closes before refreshing, for upstream data to catch up (default: 300)
+        retry_seconds : float
+            Wait before retrying a failed refresh (default: 30)
+        """
+        self.compute = compute
+        self.pairs = list(pairs)
+        self.bar_seconds = bar_seconds
+        self.settle_seconds = settle_seconds
+        self.retry_seconds = retry_seconds
+        self.errors = {}
+        self._snapshots = {}
+        self._task = None
+
+    def get(self, pair):
+        """
+        Latest snapshot of a pair (None before the first successful refresh)
+
+        The snapshot is a read-only mapping of the signal fields plus
+        'generated_at' (epoch seconds) and 'bar_close' (epoch seconds of the
+        bar close it was computed after).
+        """
+        return self._snapshots.get(pair)
+
+    def age(self, snapshot, now=None):
+        """
+        Seconds since the snapshot was computed
+        """
+        return (time.time() if now is None else now) - snapshot['generated_at']
+
+    def is_stale(self, snapshot, now=None):
+        """
+        Whether a newer bar has closed and settled since the snapshot was computed
+        """
+        now = time.time() if now is None else now
+        return self.last_close(now - self.settle_seconds) > snapshot['bar_close']
+
+    def last_close(self, now):
+        """
+        Epoch seconds of the latest bar close at or before now
+        """
+        return now // self.bar_seconds * self.bar_seconds
+
+    def next_refresh(self, now):
+        """
+        Epoch seconds of the next scheduled refresh: the next bar close plus the settle time
+        """
+        return self.last_close(now - self.settle_seconds) + self.bar_seconds + self.settle_seconds
+
+    async def refresh(self, pair):
+        """
+        Recompute the snapshot of one pair; returns whether it succeeded
+        """
+        bar_close = self.last_close(time.time() - self.settle_seconds)
+        try:
+            signal = await self.compute(pair)
+        except Exception as e:
+            logger.warning("Signal refresh failed for %s: %s", pair, e)
+            self.errors[pair] = str(e)
+            return False
+        self._snapshots[pair] = MappingProxyType({**signal, 'generated_at': time.time(), 'bar_close': bar_close})
+        self.errors.pop(pair, None)
+        return True
+
+    async def run(self):
+        """
+        Refresh every pair now, then after each bar close
+
+        Pairs whose refresh failed are retried every retry_seconds until the
+        next scheduled refresh, without recomputing the others.
+        """
+        pending = self.pairs
+        while True:
+            results = await asyncio.gather(*(self.refresh(pair) for pair in pending))
+            failed = [pair for pair, ok in zip(pending, results) if not ok]
+            now = time.time()
+            delay = self.next_refresh(now) - now
+            if failed and self.retry_seconds < delay:
+                pending, delay = failed, self.retry_seconds
+            else:
+                pending = self.pairs
+            await asyncio.sleep(delay)
@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesce concurrent identical calls into one
+
+        The first caller of a key runs the function; callers arriving with the
+        same key while it is in flight wait for it and get the same result (or
+        exception). Nothing is kept once the call returns, so the next call
+        runs again: caching stays with the caches.
+        """
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs), or wait for the call already in flight for key
+
+        Parameters:
+        -----------
+        key : hashable
+            Identity of the call; callers with equal keys share one run
+        func : callable
+            Function to run when no call for key is in flight
+
+        Returns:
+        --------
+        tuple
+            (result, shared) where shared is True when another caller's run was reused
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        """
+        Number of keys currently being computed
+        """
+        with self._lock:
+            return len(self._calls)
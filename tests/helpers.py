@@ -0,0 +1,62 @@
+import io
+import numpy as np
+import pandas as pd
+import requests
+from data_collector import ForexDataCollector
+
+def make_price_frame(n_rows, seed=42):
+    """Synthetic minute-level OHLC random walk with indicators attached"""
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0004, n_rows))
+    spread = np.abs(rng.normal(0, 0.0003, n_rows))
+    data = pd.DataFrame({
+        'Open': np.roll(close, 1),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+    }, index=pd.date_range("2015-01-01", periods=n_rows, freq="T"))
+    collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=None)
+    return collector._process_data(data)
+
+def ohlc_frame(n_rows, seed=0):
+    """Daily OHLC geometric random walk"""
+    rng = np.random.default_rng(seed)
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 0.005, n_rows)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.001, n_rows)),
+        'High': close * (1 + np.abs(rng.normal(0, 0.002, n_rows))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.002, n_rows))),
+        'Close': close,
+    }, index=pd.date_range("2020-01-01", periods=n_rows, freq="D"))
+
+def fx_daily_payload(index):
+    """Alpha Vantage FX_DAILY style payload for the given dates"""
+    close = 1.10 + np.linspace(0, 0.02, len(index))
+    series = {
+        ts.strftime("%Y-%m-%d"): {'1. open': f"{c:.5f}", '2. high': f"{c + 0.001:.5f}",
+                                  '3. low': f"{c - 0.001:.5f}", '4. close': f"{c:.5f}"}
+        for ts, c in zip(index, close)
+    }
+    return {"Meta Data": {}, "Time Series FX (Daily)": series}
+
+def minute_csv(index, seed=0):
+    """HistData style 1-minute CSV for the given timestamps"""
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 1e-4, len(index)))
+    frame = pd.DataFrame({
+        'DateTime': index.strftime("%Y-%m-%d %H:%M:%S"),
+        'Open': close - 5e-5, 'High': close + 1e-4, 'Low': close - 1e-4, 'Close': close,
+        'Volume': rng.integers(0, 50, len(index)).astype(float)
+    })
+    return frame.to_csv(header=False, index=False, float_format="%.5f").encode()
+
+def fake_get(files):
+    """http_client.get replacement serving one CSV per month URL"""
+    def get(url, **kwargs):
+        response = requests.Response()
+        year, month = url.rstrip('/').split('/')[-2:]
+        body = files.get((year, month))
+        response.status_code = 200 if body is not None else 404
+        response.raw = io.BytesIO(body or b"")
+        return response
+    return get
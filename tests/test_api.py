@@ -0,0 +1,214 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import httpx
+import numpy as np
+import pandas as pd
+import data_collector
+from artifacts import ModelRegistry
+from async_collector import AsyncCollector
+from prophet_predictor import ProphetPredictor
+from signal_snapshots import SignalSnapshots
+from tests.helpers import fx_daily_payload
+
+# The collector reads its API key from Streamlit secrets; the tests feed it frames instead
+with mock.patch('data_collector.ForexDataCollector'):
+    import api
+
+def price_frame(n_days=60):
+    index = pd.date_range("2024-01-01", periods=n_days, freq="D")
+    close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, n_days))
+    return pd.DataFrame({'Open': close, 'High': close * 1.002, 'Low': close * 0.998, 'Close': close}, index=index)
+
+async def call(paths, until_ready=None):
+    """
+    Run the app's lifespan and GET each path, returning the responses
+
+    until_ready: callable run (in a thread) once the first requests were answered
+    """
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = [await client.get(path) for path in paths]
+            if until_ready is not None:
+                await asyncio.get_running_loop().run_in_executor(None, until_ready)
+                responses += [await client.get(path) for path in paths]
+    return responses
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(api, 'model_registry', ModelRegistry(self.tmp_dir.name)),
+            mock.patch.object(api, 'model_warmup', api.BackgroundWarmup(api.prepare_models, retry_seconds=0.05)),
+            mock.patch.object(api, 'signal_snapshots', SignalSnapshots(api.compute_snapshot, [api.SIGNAL_PAIR])),
+        ]
+        for patch in self.patches:
+            patch.start()
+        api.data_collector.reset_mock(side_effect=True, return_value=True)
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp_dir.cleanup()
+
+    def test_serves_while_training(self):
+        """/health answers during the first-run training, /ready and /signal return 503 until it ends"""
+        release = threading.Event()
+
+        def fetch(**kwargs):
+            release.wait(30)
+            return price_frame()
+        api.data_collector.fetch_forex_data.side_effect = fetch
+
+        def finish_training():
+            release.set()
+            self.assertTrue(api.model_warmup.wait(60))
+
+        health, ready, signal, *after = asyncio.run(call(["/health", "/ready", "/signal"], finish_training))
+        self.assertEqual(health.status_code, 200)
+        for response in [ready, signal]:
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], str(api.RETRY_AFTER_SECONDS))
+        self.assertEqual(ready.json()['status'], "loading")
+
+        self.assertEqual(after[1].status_code, 200)
+        self.assertEqual(after[1].json()['status'], "ready")
+        self.assertIn(api.PROPHET_MODEL, api.model_registry.loaded())
+
+    def test_failed_preparation_is_retried(self):
+        """A failed first preparation is retried in the background until /ready answers 200"""
+        frames = iter([ConnectionError("API down"), price_frame()])
+
+        def fetch(**kwargs):
+            frame = next(frames)
+            if isinstance(frame, Exception):
+                raise frame
+            return frame
+        api.data_collector.fetch_forex_data.side_effect = fetch
+
+        (ready,) = asyncio.run(call(["/ready"], lambda: self.assertTrue(api.model_warmup.wait(60))))[1:]
+        self.assertEqual(ready.status_code, 200)
+        self.assertEqual(api.model_warmup.attempts, 2)
+
+    def test_start_twice_runs_one_thread(self):
+        """Starting a warmup that is still running does not start a second preparation"""
+        release = threading.Event()
+        calls = []
+        warmup = api.BackgroundWarmup(lambda: (calls.append(1), release.wait(5)))
+        warmup.start()
+        warmup.start()
+        release.set()
+        self.assertTrue(warmup.wait(5))
+        self.assertEqual(calls, [1])
+
+class TestConcurrency(unittest.TestCase):
+    """Load test: parallel clients overlap instead of queueing behind each other"""
+    CLIENTS = 8
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        predictor = ProphetPredictor(prediction_horizon=1)
+        predictor.train(price_frame(200))
+        predictor.save_model(os.path.join(cls.tmp_dir.name, api.PROPHET_MODEL))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def setUp(self):
+        index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=150)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = None
+
+        async def handler(request):
+            """Alpha Vantage that holds its responses until released"""
+            self.calls.append(request.url.params['function'])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await self.release.wait()
+            finally:
+                self.in_flight -= 1
+            if request.url.params['function'] == "NEWS_SENTIMENT":
+                return httpx.Response(200, json={'feed': []})
+            return httpx.Response(200, json=fx_daily_payload(index))
+
+        collector = data_collector.ForexDataCollector(currency_pair="EUR/USD", alpha_vantage_key="test",
+                                                      db_path="sqlite://", cache_dir=None)
+        self.patches = [
+            mock.patch.object(api, 'data_collector', collector),
+            mock.patch.object(api, 'async_collector', AsyncCollector(collector, transport=httpx.MockTransport(handler))),
+            mock.patch.object(api, 'model_registry', ModelRegistry(self.tmp_dir.name)),
+            mock.patch.object(api, 'model_warmup', api.BackgroundWarmup(api.prepare_models)),
+            mock.patch.object(api, 'signal_snapshots', SignalSnapshots(api.compute_snapshot, [api.SIGNAL_PAIR])),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    @staticmethod
+    async def wait_until(condition, timeout=60):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError("Timed out waiting for the app")
+            await asyncio.sleep(0.01)
+
+    async def load(self, paths, upstream_calls):
+        """
+        GET paths in parallel once the first signal is computed
+
+        Upstream responses are held until upstream_calls are in flight at once
+        and /health has answered. Returns the responses and the /health response.
+        """
+        self.release = asyncio.Event()
+        self.release.set()
+        transport = httpx.ASGITransport(app=api.app)
+        async with api.app.router.lifespan_context(api.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+                await self.wait_until(lambda: api.signal_snapshots.get(api.SIGNAL_PAIR) is not None)
+                self.calls.clear()
+                self.max_in_flight = 0
+                self.release.clear()
+                requests = asyncio.gather(*(client.get(path) for path in paths))
+                await self.wait_until(lambda: self.in_flight >= upstream_calls)
+                # The event loop answers while the upstream calls are still held
+                health = await client.get("/health")
+                self.release.set()
+                return await requests, health
+
+    def test_parallel_fetches_overlap_and_coalesce(self):
+        """Parallel /historical requests overlap upstream, identical ones share a call, and the loop stays responsive"""
+        # 30 days is served by the compact output, 400 days by the full history
+        paths = ["/historical?days=30", "/historical?days=400"] * (self.CLIENTS // 2)
+        responses, health = asyncio.run(self.load(paths, upstream_calls=2))
+        for response in responses:
+            self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(health.status_code, 200)
+        self.assertEqual(self.calls.count("FX_DAILY"), 2)
+        self.assertEqual(self.max_in_flight, 2)
+
+    def test_signal_is_served_from_snapshot(self):
+        """/signal makes no upstream call, whatever the number of clients"""
+        responses, _ = asyncio.run(self.load(["/signal"] * self.CLIENTS, upstream_calls=0))
+        for response in responses:
+            self.assertEqual(response.status_code, 200, response.text)
+        signals = [response.json() for response in responses]
+        self.assertEqual(len({signal['generated_at'] for signal in signals}), 1)
+        self.assertFalse(signals[0]['stale'])
+        self.assertGreaterEqual(signals[0]['age_seconds'], 0)
+        self.assertEqual(self.calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
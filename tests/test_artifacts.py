@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import joblib
+import numpy as np
+import pandas as pd
+from artifacts import ModelRegistry, is_artifact, load_artifact, read_manifest
+from compiled_prophet import CompiledProphetPredictor
+from forex_predictor import ForexPredictor
+from prophet_predictor import ProphetPredictor
+from tests.helpers import ohlc_frame
+
+@mock.patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test'})
+class TestForexArtifact(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data = ohlc_frame(400)
+        with mock.patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test'}), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cls.predictor = ForexPredictor(currency_pair="GBP/JPY", prediction_horizon=2,
+                                           features=['return_1', 'rsi_14', 'sma_ratio_20'])
+            cls.predictor.train(cls.data, n_trials=2, storage=None)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "gbpjpy")
+        self.predictor.save_model(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """A loaded artifact predicts like the trained model, from memory-mapped scaler arrays"""
+        loaded = load_artifact(self.path)
+        self.assertEqual((loaded.base_currency, loaded.quote_currency), ("GBP", "JPY"))
+        self.assertEqual(loaded.prediction_horizon, 2)
+        self.assertEqual(loaded.feature_names, ['return_1', 'rsi_14', 'sma_ratio_20'])
+        self.assertIsInstance(loaded.scaler.mean_, np.memmap)
+        self.assertAlmostEqual(loaded.predict(self.data), self.predictor.predict(self.data), places=12)
+
+        for predictor in [self.predictor, loaded]:
+            predictor.warm_up(self.data.iloc[:-1])
+        last = self.data.iloc[-1]
+        self.assertAlmostEqual(loaded.predict_bar(last['Open'], last['High'], last['Low'], last['Close']),
+                               self.predictor.predict_bar(last['Open'], last['High'], last['Low'], last['Close']),
+                               places=12)
+
+    def test_manifest(self):
+        """The manifest describes the model without loading it"""
+        manifest = read_manifest(self.path)
+        self.assertEqual(manifest['kind'], "forex_lightgbm")
+        self.assertEqual(manifest['arrays']['scaler_mean']['shape'], [3])
+        self.assertTrue(os.path.exists(os.path.join(self.path, manifest['files']['model'])))
+
+    def test_concurrent_saves(self):
+        """Threads saving the same model at once each leave a complete artifact, the path never missing"""
+        seen = []
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            saves = [pool.submit(self.predictor.save_model, self.path) for _ in range(8)]
+            while not all(save.done() for save in saves):
+                seen.append(is_artifact(self.path))
+            for save in saves:
+                save.result()
+        self.assertTrue(all(seen))
+        names = sorted(os.listdir(self.tmp_dir.name))
+        # The current version and the previous one, for readers that resolved the path just before
+        self.assertEqual(names[-1], "gbpjpy")
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith(".gbpjpy.v-") for name in names[:-1]))
+        self.assertTrue(os.path.islink(self.path))
+        self.assertAlmostEqual(load_artifact(self.path).predict(self.data), self.predictor.predict(self.data), places=12)
+
+    def test_replaces_plain_directory(self):
+        """An artifact directory written by the earlier layout is replaced by a versioned one"""
+        path = os.path.join(self.tmp_dir.name, "legacy")
+        shutil.copytree(os.path.realpath(self.path), path)
+        self.predictor.save_model(path)
+        self.assertTrue(os.path.islink(path))
+        self.assertAlmostEqual(load_artifact(path).predict(self.data), self.predictor.predict(self.data), places=12)
+
+    def test_format_version_is_checked(self):
+        """Artifacts of another format version are rejected"""
+        manifest_path = os.path.join(self.path, "manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest['format_version'] = 99
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        with self.assertRaises(ValueError):
+            load_artifact(self.path)
+
+    def test_legacy_joblib(self):
+        """Models pickled by earlier versions still load"""
+        path = os.path.join(self.tmp_dir.name, "model.joblib")
+        joblib.dump({'model': self.predictor.model, 'scaler': self.predictor.scaler,
+                     'features': self.predictor.feature_names}, path)
+        loaded = ForexPredictor()
+        loaded.load_model(path)
+        self.assertEqual(loaded.predict(self.data), self.predictor.predict(self.data))
+
+class TestProphetArtifact(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        index = pd.date_range("2022-01-01", periods=200, freq="D")
+        close = 1.10 + 0.01 * np.sin(np.arange(len(index)) / 9) + np.linspace(0, 0.02, len(index))
+        cls.data = pd.DataFrame({'Close': close}, index=index)
+        cls.predictor = ProphetPredictor(prediction_horizon=3)
+        cls.predictor.train(cls.data)
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp_dir.name, "eurusd")
+        cls.predictor.save_model(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_serves_compiled_model(self):
+        """load_artifact serves the Prophet forecast without Prophet"""
+        compiled = load_artifact(self.path)
+        self.assertIsInstance(compiled, CompiledProphetPredictor)
+        self.assertIsInstance(compiled.beta, np.memmap)
+        expected = self.predictor.predict(self.data, history=0, uncertainty=False)
+        actual = compiled.predict(self.data, history=0, uncertainty=False)
+        self.assertEqual(len(actual), 3)
+        np.testing.assert_allclose(actual['yhat'], expected['yhat'], rtol=1e-9)
+
+    def test_load_model_restores_prophet(self):
+        loaded = ProphetPredictor()
+        loaded.load_model(self.path)
+        self.assertEqual(loaded.prediction_horizon, 3)
+        np.testing.assert_allclose(loaded.predict(self.data, uncertainty=False)['yhat'],
+                                   self.predictor.predict(self.data, uncertainty=False)['yhat'])
+
+    def test_registry_loads_lazily(self):
+        """Models are materialized on first get() and the least recently used are dropped"""
+        for name in ["gbpusd", "usdjpy"]:
+            self.predictor.save_model(os.path.join(self.tmp_dir.name, name))
+        registry = ModelRegistry(self.tmp_dir.name, max_loaded=2)
+        self.assertEqual(registry.names(), ["eurusd", "gbpusd", "usdjpy"])
+        self.assertEqual(registry.manifest("gbpusd")['meta']['prediction_horizon'], 3)
+        self.assertEqual(registry.loaded(), [])
+
+        eurusd = registry.get("eurusd")
+        self.assertIs(registry.get("eurusd"), eurusd)
+        registry.get("gbpusd")
+        registry.get("eurusd")
+        registry.get("usdjpy")
+        self.assertEqual(registry.loaded(), ["eurusd", "usdjpy"])
+        with self.assertRaises(KeyError):
+            registry.get("audusd")
+
+if __name__ == '__main__':
+    unittest.main()
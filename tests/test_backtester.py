@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from backtester import Backtester, FOLD_COLUMNS, forecast_errors
+
+def daily_frame(n_days, seed=0):
+    index = pd.date_range("2022-01-01", periods=n_days, freq="D")
+    close = 1.10 + 0.01 * np.sin(np.arange(n_days) / 9) + np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n_days))
+    return pd.DataFrame({'Close': close}, index=index)
+
+class TestForecastErrors(unittest.TestCase):
+    def test_metrics(self):
+        """RMSE, MAE, MAPE and directional accuracy from the forecast origin"""
+        errors = forecast_errors([1.0, 2.0], [1.5, 1.5], y_origin=1.2)
+        self.assertAlmostEqual(errors['rmse'], 0.5)
+        self.assertAlmostEqual(errors['mae'], 0.5)
+        self.assertAlmostEqual(errors['mape'], 37.5)
+        self.assertAlmostEqual(errors['directional_accuracy'], 0.5)
+
+class TestBacktester(unittest.TestCase):
+    def test_cutoffs(self):
+        """Cutoffs step forward from the initial window and leave a full horizon"""
+        ds = pd.Series(pd.date_range("2022-01-01", periods=30, freq="D"))
+        cutoffs = Backtester(initial=10, horizon=5, step=7).cutoffs(ds)
+        self.assertEqual(cutoffs, [pd.Timestamp("2022-01-11"), pd.Timestamp("2022-01-18"), pd.Timestamp("2022-01-25")])
+
+    def test_expanding_and_sliding_folds(self):
+        """Expanding windows grow from the first date, sliding ones keep their length"""
+        data = daily_frame(160)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            expanding = Backtester(initial=120, horizon=5, step=10, max_workers=2, cache_dir=cache_dir)
+            results = expanding.run(data)
+            self.assertEqual(list(results.columns), FOLD_COLUMNS)
+            self.assertEqual(list(results['fold']), [0, 1, 2, 3])
+            self.assertEqual(list(results['train_size']), [121, 131, 141, 151])
+            self.assertTrue((results['test_size'] == 5).all())
+            self.assertTrue((results['train_start'] == data.index[0]).all())
+            self.assertFalse(results['from_cache'].any())
+            self.assertTrue((results['mape'] < 5).all())
+            self.assertTrue((results['seconds'] >= results['fit_seconds']).all())
+
+            # The same cutoffs with another horizon reuse every fit
+            rerun = Backtester(initial=120, horizon=3, step=10, max_workers=2, cache_dir=cache_dir).run(data)
+            self.assertTrue(rerun['from_cache'].all())
+
+        sliding = Backtester(initial=120, horizon=5, step=10, window=100, max_workers=1).run(data)
+        self.assertEqual(list(sliding['train_size']), [100] * 4)
+
+    def test_results_do_not_depend_on_workers(self):
+        """Warm-start chains are fixed, so 1 and N workers give the same metrics"""
+        data = daily_frame(160, seed=1)
+        serial = Backtester(initial=100, horizon=5, step=10, max_workers=1).run(data)
+        parallel = Backtester(initial=100, horizon=5, step=10, max_workers=3).run(data)
+        self.assertEqual(len(serial), 6)
+        pd.testing.assert_frame_equal(serial[['fold', 'rmse', 'mae']], parallel[['fold', 'rmse', 'mae']])
+
+    def test_not_enough_data(self):
+        """Too little history gives no folds"""
+        results = Backtester(initial=365).run(daily_frame(100))
+        self.assertTrue(results.empty)
+        self.assertEqual(list(results.columns), FOLD_COLUMNS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+from bar_store import BarStore, BAR_COLUMNS
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        """Fresh in-memory store with a week of hourly bars"""
+        self.store = BarStore(create_engine("sqlite://"))
+        index = pd.date_range("2024-01-01", periods=168, freq="H")
+        close = 1.10 + np.linspace(0, 0.01, len(index))
+        self.bars = pd.DataFrame({
+            'Open': close - 0.0001, 'High': close + 0.0002,
+            'Low': close - 0.0002, 'Close': close, 'Volume': 0.0
+        }, index=index)
+
+    def test_roundtrip(self):
+        """Stored bars load back unchanged"""
+        self.store.upsert("EUR/USD", "60min", self.bars)
+        loaded = self.store.load("EUR/USD", "60min")
+        pd.testing.assert_frame_equal(loaded, self.bars, check_freq=False)
+
+    def test_upsert_is_idempotent(self):
+        """Saving the same bars twice does not duplicate rows"""
+        self.store.upsert("EUR/USD", "60min", self.bars)
+        self.store.upsert("EUR/USD", "60min", self.bars)
+        self.assertEqual(len(self.store.load("EUR/USD", "60min")), len(self.bars))
+
+    def test_upsert_replaces_values(self):
+        """A revised bar overwrites the stored one and keeps columns it does not carry"""
+        self.store.upsert("EUR/USD", "60min", self.bars)
+        revised = self.bars[['Close']].iloc[-1:] + 0.5
+        self.store.upsert("EUR/USD", "60min", revised)
+        loaded = self.store.load("EUR/USD", "60min")
+        self.assertEqual(loaded['Close'].iloc[-1], revised['Close'].iloc[0])
+        self.assertEqual(loaded['Open'].iloc[-1], self.bars['Open'].iloc[-1])
+
+    def test_range_and_column_selection(self):
+        """Range reads return only the requested rows and columns"""
+        self.store.upsert("EUR/USD", "60min", self.bars)
+        self.store.upsert("GBP/USD", "60min", self.bars)
+        loaded = self.store.load("EUR/USD", "60min", start_date="2024-01-02", end_date="2024-01-02 23:00",
+                                 columns=['Close'])
+        self.assertEqual(list(loaded.columns), ['Close'])
+        self.assertEqual(len(loaded), 24)
+        self.assertEqual(loaded.index[0], pd.Timestamp("2024-01-02"))
+
+    def test_missing_values_and_empty_ranges(self):
+        """NaN prices round-trip and empty ranges give an empty frame"""
+        bars = self.bars.copy()
+        bars.iloc[3, bars.columns.get_loc('Close')] = np.nan
+        self.store.upsert("EUR/USD", "60min", bars)
+        self.assertTrue(np.isnan(self.store.load("EUR/USD", "60min")['Close'].iloc[3]))
+        empty = self.store.load("EUR/USD", "Daily")
+        self.assertTrue(empty.empty)
+        self.assertEqual(list(empty.columns), BAR_COLUMNS)
+
+    def test_primary_key_and_last_timestamp(self):
+        """The table is keyed on (pair, interval, timestamp)"""
+        pk = inspect(self.store.engine).get_pk_constraint(self.store.table.name)
+        self.assertEqual(pk['constrained_columns'], ['pair', 'interval', 'timestamp'])
+        self.assertIsNone(self.store.last_timestamp("EUR/USD", "60min"))
+        self.store.upsert("EUR/USD", "60min", self.bars)
+        self.assertEqual(self.store.last_timestamp("EUR/USD", "60min"), self.bars.index[-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import time
+import unittest
+import httpx
+from batch_collector import BatchForexCollector, TokenBucket, is_throttled
+from tests.helpers import fx_daily_payload
+import pandas as pd
+
+class TestTokenBucket(unittest.TestCase):
+    def test_paces_requests(self):
+        """After the burst, tokens are handed out at the configured rate"""
+        async def take(n):
+            bucket = TokenBucket(rate=20.0, capacity=1)
+            for _ in range(n):
+                await bucket.acquire()
+
+        start = time.monotonic()
+        asyncio.run(take(5))
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+class TestBatchForexCollector(unittest.TestCase):
+    def setUp(self):
+        self.index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=150)
+        self.calls = []
+
+    def handler(self, request):
+        """Throttle the first GBP/USD call, reject XXX and premium PRM, serve everything else"""
+        pair = f"{request.url.params['from_symbol']}/{request.url.params['to_symbol']}"
+        self.calls.append(pair)
+        if pair == "GBP/USD" and self.calls.count(pair) == 1:
+            return httpx.Response(200, json={"Note": "Thank you for using Alpha Vantage!"})
+        if pair == "XXX/USD":
+            return httpx.Response(200, json={"Error Message": "Invalid API call."})
+        if pair == "PRM/USD":
+            return httpx.Response(200, json={"Information": "Thank you for using Alpha Vantage! "
+                                                            "This is a premium endpoint."})
+        return httpx.Response(200, json=fx_daily_payload(self.index))
+
+    def make_batch(self, **kwargs):
+        return BatchForexCollector(alpha_vantage_key="test", calls_per_minute=6000, retry_backoff=0.01,
+                                   transport=httpx.MockTransport(self.handler), db_path="sqlite://",
+                                   cache_dir=None, **kwargs)
+
+    def test_fetches_all_pairs(self):
+        """Every pair gets a processed frame, throttled calls are retried"""
+        pairs = ["EUR/USD", "GBP/USD", "USD/JPY"]
+        results = self.make_batch().fetch(pairs)
+        self.assertEqual(set(results), {(pair, "daily") for pair in pairs})
+        for frame in results.values():
+            self.assertFalse(frame.empty)
+            self.assertIn('Signal', frame.columns)
+        self.assertEqual(self.calls.count("GBP/USD"), 2)
+
+    def test_failures_are_isolated(self):
+        """A failing pair maps to an empty frame without affecting the others"""
+        results = self.make_batch().fetch(["EUR/USD", "XXX/USD"])
+        self.assertTrue(results[("XXX/USD", "daily")].empty)
+        self.assertFalse(results[("EUR/USD", "daily")].empty)
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent throttling stops after max_retries"""
+        batch = self.make_batch(max_retries=0)
+        results = batch.fetch(["GBP/USD"])
+        self.assertTrue(results[("GBP/USD", "daily")].empty)
+        self.assertEqual(self.calls.count("GBP/USD"), 1)
+
+    def test_other_information_is_not_retried(self):
+        """Information payloads that are not rate limits (premium, invalid key) fail at once"""
+        results = self.make_batch().fetch(["PRM/USD"])
+        self.assertTrue(results[("PRM/USD", "daily")].empty)
+        self.assertEqual(self.calls.count("PRM/USD"), 1)
+
+    def test_rate_limit_information_is_retried(self):
+        """Rate-limit wording under Information is retried like a Note"""
+        self.assertTrue(is_throttled({"Information": "Our standard API rate limit is 25 requests per day."}))
+        self.assertTrue(is_throttled({"Note": "Thank you for using Alpha Vantage!"}))
+        self.assertFalse(is_throttled({"Information": "The **demo** API key is for demo purposes only."}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+import pandas as pd
+from batch_forecaster import BatchForecaster, FORECAST_COLUMNS
+
+def daily_frame(n_days, seed):
+    index = pd.date_range("2023-01-01", periods=n_days, freq="D")
+    close = 1.10 + np.cumsum(np.random.default_rng(seed).normal(0, 0.003, n_days))
+    return pd.DataFrame({'Close': close}, index=index)
+
+class TestBatchForecaster(unittest.TestCase):
+    def test_long_format_and_failure_isolation(self):
+        """Every good pair gets its horizon; a bad pair is reported without failing the batch"""
+        frames = {
+            "EUR/USD": daily_frame(200, 0),
+            "GBP/USD": daily_frame(150, 1),
+            "USD/JPY": daily_frame(1, 2),  # too short to fit
+        }
+        forecaster = BatchForecaster(prediction_horizon=3, max_workers=2)
+        forecasts = forecaster.forecast(frames)
+
+        self.assertEqual(list(forecasts.columns), FORECAST_COLUMNS)
+        self.assertEqual(forecasts.groupby('pair').size().to_dict(), {"EUR/USD": 3, "GBP/USD": 3})
+        self.assertEqual(list(forecaster.errors), ["USD/JPY"])
+        last_eur = forecasts.loc[forecasts['pair'] == "EUR/USD", 'ds'].iloc[-1]
+        self.assertEqual(last_eur, frames["EUR/USD"].index[-1] + pd.Timedelta(days=3))
+
+    def test_include_history(self):
+        """include_history returns the fitted values for the training rows too"""
+        forecasts = BatchForecaster(max_workers=1).forecast({"EUR/USD": daily_frame(60, 0)}, include_history=True)
+        self.assertEqual(len(forecasts), 61)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import copy
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from compiled_prophet import CompiledProphetPredictor
+from prophet_predictor import ProphetPredictor
+
+class TestCompiledProphet(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        index = pd.date_range("2022-01-01", periods=200, freq="D")
+        close = 1.10 + 0.01 * np.sin(np.arange(len(index)) / 9) + np.linspace(0, 0.02, len(index))
+        cls.data = pd.DataFrame({'Close': close}, index=index)
+        cls.predictor = ProphetPredictor(prediction_horizon=7)
+        cls.predictor.train(cls.data)
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp_dir.name, "prophet_model.npz")
+        cls.predictor.export_compiled(cls.path)
+        cls.compiled = CompiledProphetPredictor.load(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_point_forecast_parity(self):
+        """yhat and trend match Prophet.predict over history and horizon"""
+        for history in [None, 0, 5]:
+            expected = self.predictor.predict(self.data, periods=30, history=history, uncertainty=False)
+            actual = self.compiled.predict(self.data, periods=30, history=history, uncertainty=False)
+            self.assertEqual(list(actual['ds']), list(expected['ds']))
+            for column in ['trend', 'additive_terms', 'multiplicative_terms', 'yhat']:
+                np.testing.assert_allclose(actual[column], expected[column], rtol=1e-9, atol=1e-12)
+
+    def test_interval_parity(self):
+        """Intervals agree with Prophet's up to Monte Carlo noise, unseeded"""
+        # With 20000 draws the mean width ratio varies by about 1% between runs (15-20% at the default 1000)
+        model = copy.copy(self.predictor.model)
+        model.uncertainty_samples = 20000
+        compiled = CompiledProphetPredictor.load(self.path)
+        compiled.uncertainty_samples = 20000
+        expected = model.predict(model.make_future_dataframe(periods=30, include_history=False))
+        actual = compiled.predict_dates(expected['ds'])
+        np.testing.assert_allclose(actual['yhat'], expected['yhat'], rtol=1e-9)
+        self.assertTrue((actual['yhat_lower'] < actual['yhat']).all())
+        self.assertTrue((actual['yhat'] < actual['yhat_upper']).all())
+        for bound in ['yhat_lower', 'yhat_upper']:
+            self.assertAlmostEqual((actual[bound] - actual['yhat']).abs().mean() / (expected[bound] - expected['yhat']).abs().mean(),
+                                   1.0, delta=0.1)
+
+    def test_seeded_intervals(self):
+        """The same seed gives the same intervals"""
+        ds = pd.date_range("2022-07-20", periods=10, freq="D")
+        first = self.compiled.predict_dates(ds, seed=1)
+        np.testing.assert_array_equal(first['yhat_upper'], self.compiled.predict_dates(ds, seed=1)['yhat_upper'])
+
+    def test_default_horizon(self):
+        """periods defaults to the exported prediction horizon"""
+        forecast = self.compiled.predict(self.data, history=0)
+        self.assertEqual(len(forecast), 7)
+        self.assertEqual(forecast['ds'].iloc[0], self.data.index[-1] + pd.Timedelta(days=1))
+
+    def test_serving_does_not_import_prophet(self):
+        """Loading and predicting from the artifact never imports prophet"""
+        code = (
+            "import sys, pandas as pd\n"
+            "from compiled_prophet import CompiledProphetPredictor\n"
+            f"model = CompiledProphetPredictor.load({self.path!r})\n"
+            "model.predict(pd.DataFrame({'Close': [1.0, 1.1]}, index=pd.date_range('2022-07-01', periods=2)))\n"
+            "assert 'prophet' not in sys.modules\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+if __name__ == '__main__':
+    unittest.main()
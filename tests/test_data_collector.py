@@ -130,12 +130,13 @@ class TestForexDataCollector(unittest.TestCase):
             end_date=self.end_date.strftime("%Y-%m-%d")
         )
         
-        # Test save operation
-        self.collector.save_to_database(data, table_name='test_forex_data')
+        # Test save operation (saving twice must not duplicate bars)
+        self.collector.save_to_database(data, table_name='test_forex_bars')
+        self.collector.save_to_database(data, table_name='test_forex_bars')
         
         # Test load operation
         loaded_data = self.collector.load_from_database(
-            table_name='test_forex_data',
+            table_name='test_forex_bars',
             start_date=self.start_date,
             end_date=self.end_date
         )
@@ -143,7 +144,8 @@ class TestForexDataCollector(unittest.TestCase):
         # Check loaded data
         self.assertIsInstance(loaded_data, pd.DataFrame)
         self.assertTrue(len(loaded_data) > 0)
-        self.assertEqual(set(data.columns), set(loaded_data.columns))
+        self.assertTrue(len(loaded_data) <= len(data))
+        self.assertEqual(set(['Open', 'High', 'Low', 'Close', 'Volume']), set(loaded_data.columns))
         
     def test_error_handling(self):
         """Test error handling for invalid inputs"""
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+import numpy as np
+import pandas as pd
+import ta
+from features import FEATURES, DEFAULT_FEATURES, compute_features, compute_latest_features, required_lookback
+from forex_predictor import ForexPredictor
+from tests.helpers import ohlc_frame
+
+class TestFeatures(unittest.TestCase):
+    def setUp(self):
+        self.data = ohlc_frame(600)
+
+    def test_matches_ta(self):
+        """Registry indicators match the ta library once warmed up"""
+        features = compute_features(self.data).iloc[250:]
+        data = self.data.iloc[250:]
+        close = self.data['Close']
+        macd = ta.trend.MACD(close)
+        bands = ta.volatility.BollingerBands(close)
+        atr = ta.volatility.AverageTrueRange(self.data['High'], self.data['Low'], close).average_true_range()
+        stoch = ta.momentum.StochasticOscillator(self.data['High'], self.data['Low'], close)
+        np.testing.assert_allclose(features['rsi_14'], ta.momentum.RSIIndicator(close).rsi().iloc[250:], rtol=1e-6)
+        np.testing.assert_allclose(features['macd_signal'], macd.macd_signal().iloc[250:], rtol=1e-9)
+        np.testing.assert_allclose(features['bollinger_pband_20'], bands.bollinger_pband().iloc[250:], rtol=1e-9)
+        np.testing.assert_allclose(features['atr_ratio_14'] * data['Close'], atr.iloc[250:], rtol=1e-6)
+        np.testing.assert_allclose(features['stoch_d_14'], stoch.stoch_signal().iloc[250:], rtol=1e-9)
+
+    def test_only_requested_features(self):
+        features = compute_features(self.data, ['rsi_14', 'return_1'])
+        self.assertEqual(list(features.columns), ['rsi_14', 'return_1'])
+        with self.assertRaises(ValueError):
+            compute_features(self.data, ['volume_obv'])
+
+    def test_latest_uses_the_lookback_window(self):
+        """The last row from its lookback window matches the full computation"""
+        for name in DEFAULT_FEATURES:
+            self.assertGreaterEqual(FEATURES[name][1], 1)
+        self.assertEqual(required_lookback(['return_1', 'sma_ratio_50']), 50)
+
+        full = compute_features(self.data).iloc[-1]
+        latest = compute_latest_features(self.data)
+        self.assertEqual(list(latest.index), [self.data.index[-1]])
+        np.testing.assert_allclose(latest.iloc[0], full, rtol=1e-5)
+
+        window = compute_latest_features(self.data, ['sma_ratio_10', 'range_ratio'])
+        np.testing.assert_allclose(window.iloc[0], compute_features(self.data.iloc[-10:], ['sma_ratio_10', 'range_ratio']).iloc[-1])
+
+@mock.patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test'})
+class TestForexPredictorFeatures(unittest.TestCase):
+    def test_feature_list_is_persisted(self):
+        """The model's feature list is saved, and predict() works from the trailing window"""
+        data = ohlc_frame(500)
+        predictor = ForexPredictor(features=['return_1', 'rsi_14', 'sma_ratio_20'])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                predictor.train(data, n_trials=2, storage=None)
+            path = os.path.join(tmp_dir, "model")
+            predictor.save_model(path)
+
+            loaded = ForexPredictor()
+            loaded.load_model(path)
+        self.assertEqual(loaded.feature_names, ['return_1', 'rsi_14', 'sma_ratio_20'])
+        self.assertEqual(loaded.predict(data), predictor.predict(data.iloc[-required_lookback(loaded.feature_names):]))
+        with self.assertRaises(ValueError):
+            loaded.predict(data.iloc[-10:])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+import numpy as np
+import optuna
+import pandas as pd
+from forex_predictor import ForexPredictor
+
+def ohlcv_frame(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=n_days, freq="D")
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 0.005, n_days)))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.001, n_days)),
+        'High': close * 1.003,
+        'Low': close * 0.997,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n_days).astype(float),
+    }, index=index)
+
+@mock.patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test'})
+class TestHyperparameterTuning(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = f"sqlite:///{os.path.join(self.tmp_dir.name, 'optuna.db')}"
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(400, 5))
+        y = X[:, 0] * 0.5 + rng.normal(0, 0.1, 400)
+        self.sets = (X[:300], y[:300], X[300:], y[300:])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_study_resumes_from_storage(self):
+        """A second call with the same data only runs the missing trials"""
+        predictor = ForexPredictor()
+        predictor.optimize_hyperparameters(*self.sets, n_trials=4, n_jobs=1, storage=self.storage, study_name="eurusd")
+        best = predictor.optimize_hyperparameters(*self.sets, n_trials=6, n_jobs=2, storage=self.storage, study_name="eurusd")
+        study = optuna.load_study(study_name="eurusd", storage=self.storage)
+        self.assertEqual(len(study.trials), 6)
+        self.assertEqual(best, study.best_params)
+
+        predictor.optimize_hyperparameters(*self.sets, n_trials=6, storage=self.storage, study_name="eurusd")
+        self.assertEqual(len(optuna.load_study(study_name="eurusd", storage=self.storage).trials), 6)
+
+    def test_study_name_follows_data(self):
+        """Without a study name, other data starts a new study"""
+        predictor = ForexPredictor()
+        predictor.optimize_hyperparameters(*self.sets, n_trials=2, storage=self.storage)
+        X_train, y_train, X_val, y_val = self.sets
+        predictor.optimize_hyperparameters(X_train[1:], y_train[1:], X_val, y_val, n_trials=2, storage=self.storage)
+        self.assertEqual(len(optuna.get_all_study_summaries(self.storage)), 2)
+
+    def test_unknown_pruner(self):
+        with self.assertRaises(ValueError):
+            ForexPredictor().optimize_hyperparameters(*self.sets, n_trials=1, pruner="random", storage=None)
+
+    def test_train_end_to_end(self):
+        """train() tunes and fits with early stopping callbacks"""
+        predictor = ForexPredictor()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            score = predictor.train(ohlcv_frame(400), n_trials=3, storage=self.storage)
+        self.assertTrue(np.isfinite(score))
+        self.assertIsNotNone(predictor.model.best_iteration_)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import io
+import unittest
+from unittest import mock
+import pandas as pd
+import data_collector
+from data_collector import ForexDataCollector
+from tests.helpers import minute_csv, fake_get
+
+class TestHistDataStreaming(unittest.TestCase):
+    def setUp(self):
+        index = pd.date_range("2024-01-29", "2024-02-03 23:59", freq="T")
+        # Drop a block of minutes so some 45min bins are empty
+        index = index[(index < "2024-01-31 10:00") | (index > "2024-01-31 14:00")]
+        self.minutes = index
+        self.files = {}
+        for (year, month), group in pd.Series(index, index=index).groupby([index.year, index.month]):
+            self.files[(f"{year}", f"{month:02d}")] = minute_csv(pd.DatetimeIndex(group.values), seed=month)
+        self.collector = ForexDataCollector(interval="45min", alpha_vantage_key="test", db_path="sqlite://",
+                                           cache_dir=None)
+
+    def expected(self, start, end):
+        """Previous implementation: whole months in memory, concat, then resample"""
+        frames = [pd.read_csv(io.BytesIO(body), names=data_collector.HISTDATA_COLUMNS, parse_dates=['DateTime'])
+                  for _, body in sorted(self.files.items())]
+        data = pd.concat(frames)
+        data = data[(data['DateTime'] >= start) & (data['DateTime'] <= end)].set_index('DateTime')
+        return data.resample('45T').agg(data_collector.OHLCV_AGG).dropna().reset_index()
+
+    def test_chunked_resample_matches_full_resample(self):
+        """Chunk and month boundaries do not change the 45min bars"""
+        start, end = pd.Timestamp("2024-01-29 03:17"), pd.Timestamp("2024-02-02 18:05")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)):
+            for chunksize in (97, 1000, 100_000):
+                result = self.collector._fetch_histdata_minute_data(start, end, chunksize=chunksize)
+                pd.testing.assert_frame_equal(result, self.expected(start, end), check_freq=False)
+
+    def test_missing_month_is_skipped(self):
+        """A failed month download does not drop the other months"""
+        files = {key: body for key, body in self.files.items() if key != ("2024", "02")}
+        start, end = pd.Timestamp("2024-01-29"), pd.Timestamp("2024-02-03")
+        with mock.patch("http_client.get", side_effect=fake_get(files)):
+            result = self.collector._fetch_histdata_minute_data(start, end, chunksize=500)
+        self.assertEqual(result['DateTime'].iloc[-1], pd.Timestamp("2024-01-31 23:15"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+
+import http_client
+
+
+class TestHttpClient(unittest.TestCase):
+    def test_session_is_shared(self):
+        """Every caller gets the same process-wide session"""
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    def test_session_defaults(self):
+        """The session asks for gzip and keeps a bounded, blocking pool per host"""
+        session = http_client.get_session()
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+        adapter = session.get_adapter("https://www.alphavantage.co/query")
+        self.assertEqual(adapter._pool_maxsize, http_client.CONNECTIONS_PER_HOST)
+        self.assertTrue(adapter._pool_block)
+
+    def test_default_timeout_applied(self):
+        """Requests get the default timeout unless the caller passes one"""
+        session = http_client.PooledSession()
+        with mock.patch("requests.Session.request") as request:
+            session.get("https://example.com")
+            self.assertEqual(request.call_args.kwargs["timeout"], http_client.DEFAULT_TIMEOUT)
+            session.get("https://example.com", timeout=3)
+            self.assertEqual(request.call_args.kwargs["timeout"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
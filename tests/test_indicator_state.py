@@ -0,0 +1,179 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from ta.trend import SMAIndicator, EMAIndicator, MACD
+from ta.momentum import RSIIndicator
+from ta.volatility import AverageTrueRange, BollingerBands
+import data_collector
+from data_collector import ForexDataCollector
+from indicator_state import IncrementalIndicators, INDICATOR_COLUMNS
+from tests.helpers import make_price_frame
+
+def full_recompute(data):
+    """Reference: the full-history ta computation _process_data used to run"""
+    data = data.copy()
+    data['SMA_20'] = SMAIndicator(close=data['Close'], window=20).sma_indicator()
+    data['EMA_20'] = EMAIndicator(close=data['Close'], window=20).ema_indicator()
+    data['RSI'] = RSIIndicator(close=data['Close'], window=14).rsi()
+    macd = MACD(close=data['Close'], window_slow=26, window_fast=12, window_sign=9)
+    data['MACD'] = macd.macd()
+    data['MACD_Signal'] = macd.macd_signal()
+    data['MACD_Hist'] = macd.macd_diff()
+    data['ATR'] = AverageTrueRange(high=data['High'], low=data['Low'], close=data['Close'], window=14).average_true_range()
+    bb = BollingerBands(close=data['Close'], window=20)
+    data['Bollinger_Upper'] = bb.bollinger_hband()
+    data['Bollinger_Middle'] = bb.bollinger_mavg()
+    data['Bollinger_Lower'] = bb.bollinger_lband()
+    data['Weekly_VWAP'] = data['Close'].rolling(window=5).mean()
+    data['Resistance'] = data['High'].rolling(window=20).max()
+    data['Support'] = data['Low'].rolling(window=20).min()
+    data['Returns'] = data['Close'].pct_change()
+    data['Log_Returns'] = np.log(data['Close']/data['Close'].shift(1))
+    return data
+
+class TestIncrementalIndicators(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Build one synthetic OHLC frame with a gap in Close"""
+        cls.bars = make_price_frame(1500, seed=3)[['Open', 'High', 'Low', 'Close']].copy()
+        cls.bars.iloc[400, cls.bars.columns.get_loc('Close')] = np.nan
+        cls.expected = full_recompute(cls.bars)
+
+    def assert_indicators_close(self, actual):
+        for col in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(actual[col].to_numpy(), self.expected[col].to_numpy(),
+                                       rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=col)
+
+    def test_single_batch_is_exact(self):
+        """Feeding the whole history at once reproduces ta bit for bit"""
+        result = IncrementalIndicators().update(self.bars)
+        for col in INDICATOR_COLUMNS:
+            np.testing.assert_array_equal(result[col].to_numpy(), self.expected[col].to_numpy(), err_msg=col)
+
+    def test_incremental_matches_full_recompute(self):
+        """Appending bars in small batches matches the full recompute"""
+        state = IncrementalIndicators()
+        parts = [state.update(self.bars.iloc[i:i + 7]) for i in range(0, len(self.bars), 7)]
+        self.assert_indicators_close(pd.concat(parts))
+        self.assertEqual(state.n_bars, len(self.bars))
+
+    def test_checkpoint_roundtrip(self):
+        """State restored from a checkpoint continues exactly where it stopped"""
+        state = IncrementalIndicators("EUR/USD", "Daily")
+        first = state.update(self.bars.iloc[:600])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "EURUSD_Daily.json")
+            state.save_checkpoint(path)
+            restored = IncrementalIndicators.load_checkpoint(path)
+        self.assertEqual(restored.last_timestamp, self.bars.index[599])
+        resumed = restored.update(self.bars.iloc[600:])
+        uninterrupted = state.update(self.bars.iloc[600:])
+        pd.testing.assert_frame_equal(resumed, uninterrupted, check_exact=True)
+        self.assert_indicators_close(pd.concat([first, resumed]))
+
+    def test_rejects_out_of_order_bars(self):
+        """Bars at or before the last seen timestamp are rejected"""
+        state = IncrementalIndicators()
+        state.update(self.bars.iloc[:100])
+        with self.assertRaises(ValueError):
+            state.update(self.bars.iloc[50:60])
+
+    def test_collector_reuses_state(self):
+        """_process_data only pushes new bars through the state on refresh"""
+        collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=None)
+        collector._process_data(self.bars.iloc[:1000].copy())
+        self.assertEqual(collector.indicator_state.n_bars, 1000)
+
+        # Refresh with the open bar revised and new bars appended
+        refreshed = self.bars.copy()
+        refreshed.iloc[999, refreshed.columns.get_loc('Close')] += 0.001
+        state_before = collector._indicator_cache[self.bars.index[0]]['state']
+        with mock.patch.object(IncrementalIndicators, 'update', autospec=True,
+                               side_effect=IncrementalIndicators.update) as update:
+            result = collector._process_data(refreshed.copy())
+        self.assertEqual(state_before.n_bars, 999)
+        # The revised open bar and the new ones only
+        self.assertEqual(sum(len(call.args[1]) for call in update.call_args_list), len(refreshed) - 999)
+        for col in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(result[col].to_numpy(), full_recompute(refreshed)[col].to_numpy(),
+                                       rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=col)
+        self.assertIn('Volume', result.columns)
+
+    def test_collector_state_survives_restart(self):
+        """A new collector on the same price cache resumes from the indicator checkpoint"""
+        with tempfile.TemporaryDirectory() as tmp:
+            collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=tmp)
+            collector._process_data(self.bars.iloc[:1000].copy())
+            collector._process_data(self.bars.iloc[:1200].copy())
+            data_collector.flush_indicator_checkpoints()
+
+            restarted = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=tmp)
+            with mock.patch.object(IncrementalIndicators, 'update', autospec=True,
+                                   side_effect=IncrementalIndicators.update) as update:
+                result = restarted._process_data(self.bars.copy())
+            self.assertEqual(sum(len(call.args[1]) for call in update.call_args_list), len(self.bars) - 1199)
+            self.assert_indicators_close(result)
+
+            # A checkpoint for another window is recomputed, not reused
+            shifted = restarted._process_data(self.bars.iloc[100:].copy())
+            np.testing.assert_allclose(shifted['SMA_20'].to_numpy(), full_recompute(self.bars.iloc[100:])['SMA_20'],
+                                       rtol=1e-9, equal_nan=True)
+
+    def test_alternating_windows_keep_their_state(self):
+        """Requests alternating between two ranges each resume their own state"""
+        collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=None)
+        for end in (1000, 1010):
+            collector._process_data(self.bars.iloc[:end].copy())
+            collector._process_data(self.bars.iloc[end - 30:end].copy())
+        with mock.patch.object(IncrementalIndicators, 'update', autospec=True,
+                               side_effect=IncrementalIndicators.update) as update:
+            long = collector._process_data(self.bars.iloc[:1020].copy())
+            short = collector._process_data(self.bars.iloc[990:1020].copy())
+        # The long window resumes; the short one slid, so it is a new window
+        self.assertEqual([len(call.args[1]) for call in update.call_args_list], [10, 1, 29, 1])
+        for result, bars in [(long, self.bars.iloc[:1020]), (short, self.bars.iloc[990:1020])]:
+            np.testing.assert_allclose(result['RSI'].to_numpy(), full_recompute(bars)['RSI'],
+                                       rtol=1e-9, equal_nan=True)
+
+    def test_checkpoint_is_written_in_background(self):
+        """_process_data does not wait for the checkpoint write, and only the latest windows are kept"""
+        release = threading.Event()
+        data_collector._checkpoint_writer.submit(release.wait, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=tmp)
+            for start in range(6):
+                collector._process_data(self.bars.iloc[start:start + 200].copy())
+            collector._process_data(self.bars.iloc[5:300].copy())
+            directory = os.path.join(tmp, "EURUSD", "Daily")
+            self.assertFalse(os.path.exists(directory))
+            release.set()
+            data_collector.flush_indicator_checkpoints()
+            names = sorted(os.listdir(directory))
+            self.assertEqual(len([name for name in names if name.endswith(".json")]),
+                             data_collector.INDICATOR_WINDOWS)
+            restored = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=tmp)
+            cache = restored._load_indicator_checkpoint(self.bars.index[5])
+            self.assertEqual(cache['state'].n_bars, 294)
+
+    def test_unordered_index_falls_back_to_full_computation(self):
+        """Bars without a strictly increasing DatetimeIndex still get every indicator"""
+        collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=None)
+        bars = self.bars.iloc[:300]
+        expected = full_recompute(bars)
+        positional = collector._process_data(bars.reset_index(drop=True))
+        reversed_bars = collector._process_data(bars.iloc[::-1].copy())
+        duplicated = collector._process_data(pd.concat([bars, bars.iloc[100:110]]))
+        cases = [(positional, expected), (reversed_bars.iloc[::-1], expected),
+                 (duplicated.iloc[:300], expected), (duplicated.iloc[300:], expected.iloc[100:110])]
+        for result, reference in cases:
+            for col in INDICATOR_COLUMNS:
+                np.testing.assert_allclose(result[col].to_numpy(), reference[col].to_numpy(),
+                                           rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=col)
+        self.assertIsNone(collector.indicator_state)
+
+if __name__ == '__main__':
+    unittest.main()
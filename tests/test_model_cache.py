@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+import pandas as pd
+from model_cache import ModelCache, model_key
+from prophet_predictor import ProphetPredictor, PROPHET_PARAMS
+
+class TestModelCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        index = pd.date_range("2023-01-01", periods=120, freq="D")
+        close = 1.10 + 0.01 * np.sin(np.arange(len(index)) / 7)
+        cls.data = pd.DataFrame({'ds': index, 'y': close})
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ModelCache(self.tmp.name, max_entries=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_covers_inputs(self):
+        """Pair, timeframe, column, data, settings and warm-start parameters all change the key"""
+        key = model_key("EUR/USD", "daily", "Close", self.data, PROPHET_PARAMS)
+        self.assertEqual(key, model_key("EUR/USD", "daily", "Close", self.data.copy(), dict(PROPHET_PARAMS)))
+        changed = self.data.copy()
+        changed.loc[5, 'y'] += 1e-5
+        others = [
+            model_key("GBP/USD", "daily", "Close", self.data, PROPHET_PARAMS),
+            model_key("EUR/USD", "45min", "Close", self.data, PROPHET_PARAMS),
+            model_key("EUR/USD", "daily", "High", self.data, PROPHET_PARAMS),
+            model_key("EUR/USD", "daily", "Close", changed, PROPHET_PARAMS),
+            model_key("EUR/USD", "daily", "Close", self.data, {**PROPHET_PARAMS, 'changepoint_prior_scale': 0.1}),
+            model_key("EUR/USD", "daily", "Close", self.data, PROPHET_PARAMS, init={'k': 0.1, 'delta': np.zeros(3)}),
+        ]
+        self.assertNotIn(key, others)
+
+    def test_warm_hit_skips_fit(self):
+        """Training again on the same data reuses the model, also from a fresh process"""
+        predictor = ProphetPredictor(model_cache=self.cache)
+        self.assertFalse(predictor.train(self.data, pair="EUR/USD", timeframe="daily"))
+        expected = predictor.model.predict(self.data[['ds']])['yhat']
+
+        with mock.patch("prophet.Prophet.fit") as fit:
+            self.assertTrue(predictor.train(self.data, pair="EUR/USD", timeframe="daily"))
+            # Disk tier only
+            fresh = ProphetPredictor(model_cache=ModelCache(self.tmp.name))
+            self.assertTrue(fresh.train(self.data, pair="EUR/USD", timeframe="daily"))
+            fit.assert_not_called()
+        pd.testing.assert_series_equal(fresh.model.predict(self.data[['ds']])['yhat'], expected)
+
+    def test_lru_eviction(self):
+        """The least recently used model is evicted from disk and memory"""
+        predictor = ProphetPredictor()
+        predictor.train(self.data)
+        self.cache.put("a", predictor.model)
+        self.cache.put("b", predictor.model)
+        self.assertIsNotNone(self.cache.get("a"))
+        self.cache.put("c", predictor.model)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_concurrent_puts(self):
+        """Caches sharing a directory can store the same key at once, leaving no temp files"""
+        predictor = ProphetPredictor()
+        predictor.train(self.data)
+        caches = [ModelCache(self.tmp.name) for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda cache: cache.put("a", predictor.model), caches * 4))
+        self.assertEqual(os.listdir(self.tmp.name), ["a.json"])
+        self.assertIsNotNone(ModelCache(self.tmp.name).get("a"))
+
+if __name__ == '__main__':
+    unittest.main()
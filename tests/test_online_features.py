@@ -0,0 +1,60 @@
+import os
+import unittest
+import warnings
+from unittest import mock
+import numpy as np
+import pandas as pd
+from features import DEFAULT_FEATURES, compute_features
+from forex_predictor import ForexPredictor
+from online_features import OnlineFeatures
+from tests.helpers import ohlc_frame
+
+class TestOnlineFeatures(unittest.TestCase):
+    def test_matches_batch_features(self):
+        """Every streamed vector matches the same row of compute_features, warm-up NaNs included"""
+        data = ohlc_frame(300)
+        online = OnlineFeatures()
+        streamed = pd.DataFrame([online.update(*bar) for bar in data[['Open', 'High', 'Low', 'Close']].itertuples(index=False)],
+                                columns=DEFAULT_FEATURES, index=data.index)
+        expected = compute_features(data)
+        pd.testing.assert_frame_equal(streamed.isna(), expected.isna())
+        np.testing.assert_allclose(streamed.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+    def test_flat_bars(self):
+        """Zero ranges give the same inf/NaN values as the batch features"""
+        data = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0},
+                            index=pd.date_range("2020-01-01", periods=60, freq="D"))
+        np.testing.assert_array_equal(OnlineFeatures().update_many(data), compute_features(data).iloc[-1].to_numpy())
+
+    def test_selected_names(self):
+        online = OnlineFeatures(['rsi_14', 'return_1'])
+        self.assertEqual(len(online.update(1.0, 1.1, 0.9, 1.0)), 2)
+        with self.assertRaises(ValueError):
+            OnlineFeatures(['volume_obv'])
+
+@mock.patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test'})
+class TestPredictBar(unittest.TestCase):
+    def test_predict_bar(self):
+        """predict_bar scores the new bar like the batch path, per pair"""
+        data = ohlc_frame(460)
+        history, new_bars = data.iloc[:450], data.iloc[450:]
+        predictor = ForexPredictor(features=['return_1', 'rsi_14', 'macd_diff', 'stoch_k_14'])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            predictor.train(history, n_trials=2, storage=None)
+
+        with self.assertRaises(ValueError):
+            predictor.predict_bar(1.0, 1.0, 1.0, 1.0)
+        predictor.warm_up(history)
+        predictor.warm_up(history.iloc[:5], pair="GBP/USD")
+        for bar in new_bars[['Open', 'High', 'Low', 'Close']].itertuples(index=False):
+            prediction = predictor.predict_bar(*bar)
+        expected = predictor.model.predict(predictor.scaler.transform(compute_features(data, predictor.feature_names).iloc[[-1]]))[0]
+        self.assertAlmostEqual(prediction, expected, places=12)
+
+        # The other pair's buffer is separate and still too short
+        with self.assertRaises(ValueError):
+            predictor.predict_bar(*new_bars.iloc[0][['Open', 'High', 'Low', 'Close']], pair="GBP/USD")
+
+if __name__ == '__main__':
+    unittest.main()
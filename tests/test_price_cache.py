@@ -0,0 +1,238 @@
+import multiprocessing
+import os
+import stat
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+import pandas as pd
+from data_collector import ForexDataCollector
+from price_cache import FILE_MODE, LOCK_NAME, PriceCache, fcntl
+from tests.helpers import fx_daily_payload
+
+def write_slice(cache_dir, bars, go):
+    """Merge bars into a cache from a child process once go is set"""
+    go.wait()
+    PriceCache(cache_dir).write("EUR/USD", "Daily", bars)
+
+class TestPriceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = PriceCache(self.tmp.name)
+        index = pd.date_range("2022-11-01", "2023-02-28", freq="D")
+        self.bars = pd.DataFrame({'Open': 1.0, 'High': 1.1, 'Low': 0.9,
+                                  'Close': np.arange(len(index), dtype=float)}, index=index)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_and_read_partitions(self):
+        """Bars spanning several years round-trip and range reads are inclusive"""
+        self.cache.write("EUR/USD", "Daily", self.bars)
+        pd.testing.assert_frame_equal(self.cache.read("EUR/USD", "Daily"), self.bars, check_freq=False)
+        subset = self.cache.read("EUR/USD", "Daily", "2022-12-30", "2023-01-02")
+        self.assertEqual(list(subset.index), list(pd.date_range("2022-12-30", "2023-01-02")))
+        self.assertEqual(self.cache.high_water_mark("EUR/USD", "Daily"), self.bars.index[-1])
+
+    def test_merge_replaces_overlapping_bars(self):
+        """Writing newer bars replaces the overlap and advances the high-water mark"""
+        self.cache.write("EUR/USD", "Daily", self.bars.iloc[:100])
+        update = self.bars.iloc[99:] + 1000
+        self.cache.write("EUR/USD", "Daily", update)
+        result = self.cache.read("EUR/USD", "Daily")
+        self.assertEqual(len(result), len(self.bars))
+        self.assertEqual(result['Close'].iloc[99], update['Close'].iloc[0])
+        self.assertEqual(self.cache.high_water_mark("EUR/USD", "Daily"), self.bars.index[-1])
+
+    def test_concurrent_writers(self):
+        """Writers merging overlapping years at once all land, with no temp files left behind"""
+        index = pd.bdate_range("2004-01-01", "2024-12-31")
+        bars = pd.DataFrame({'Open': 1.0, 'High': 1.1, 'Low': 0.9, 'Close': np.arange(len(index), dtype=float)},
+                            index=index)
+        slices = [bars.iloc[i * 600:(i + 2) * 600] for i in range(8)]
+        caches = [PriceCache(self.tmp.name) for _ in slices]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda args: args[0].write("EUR/USD", "Daily", args[1]), zip(caches, slices)))
+        expected = pd.concat(slices)
+        expected = expected[~expected.index.duplicated()]
+        pd.testing.assert_frame_equal(self.cache.read("EUR/USD", "Daily"), expected, check_freq=False)
+        manifest = self.cache.manifest("EUR/USD", "Daily")
+        self.assertEqual((manifest['first'], manifest['last']), (expected.index[0], expected.index[-1]))
+        dataset_dir = os.path.join(self.tmp.name, "EURUSD", "Daily")
+        self.assertFalse([name for name in os.listdir(dataset_dir) if name.endswith(".tmp")])
+
+    @unittest.skipIf(fcntl is None, "file locks need fcntl")
+    def test_writer_waits_for_other_process(self):
+        """A writer in another process waits while the dataset's file lock is held"""
+        ctx = multiprocessing.get_context("fork")
+        go = ctx.Event()
+        # Forked before the lock file is opened, so the child holds no copy of the locked descriptor
+        writer = ctx.Process(target=write_slice, args=(self.tmp.name, self.bars, go), daemon=True)
+        writer.start()
+        self.addCleanup(writer.kill)
+        dataset_dir = os.path.join(self.tmp.name, "EURUSD", "Daily")
+        os.makedirs(dataset_dir)
+        with open(os.path.join(dataset_dir, LOCK_NAME), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            go.set()
+            writer.join(0.5)
+            self.assertTrue(writer.is_alive())
+            self.assertIsNone(self.cache.manifest("EUR/USD", "Daily"))
+        writer.join(30)
+        self.assertEqual(writer.exitcode, 0)
+        pd.testing.assert_frame_equal(self.cache.read("EUR/USD", "Daily"), self.bars, check_freq=False)
+
+    def test_files_get_umask_mode(self):
+        """Partitions and the manifest get the umask's permissions, not mkstemp's 0600"""
+        self.cache.write("EUR/USD", "Daily", self.bars)
+        dataset_dir = os.path.join(self.tmp.name, "EURUSD", "Daily")
+        for name in ["2022.arrow", "2023.arrow", "_manifest.json"]:
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(dataset_dir, name)).st_mode), FILE_MODE)
+
+    def test_empty_cache(self):
+        """Nothing cached reads as an empty frame"""
+        self.assertTrue(self.cache.read("GBP/USD", "Daily").empty)
+        self.assertIsNone(self.cache.high_water_mark("GBP/USD", "Daily"))
+
+class TestCollectorCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=300)
+        self.collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://",
+                                            cache_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def mock_response(self, index):
+        response = mock.Mock()
+        response.json.return_value = fx_daily_payload(index)
+        return response
+
+    def test_warm_cache_skips_download(self):
+        """A fresh cache serves the range without calling the API"""
+        with mock.patch("http_client.get", return_value=self.mock_response(self.index)) as get:
+            first = self.collector.fetch_forex_data()
+            second = self.collector.fetch_forex_data()
+        self.assertEqual(get.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_stale_cache_merges_new_bars(self):
+        """A stale cache downloads again and merges bars from the high-water mark on"""
+        with mock.patch("http_client.get", return_value=self.mock_response(self.index[:-5])):
+            self.collector.fetch_forex_data()
+        self.collector.cache_ttl = 0
+        with mock.patch("http_client.get", return_value=self.mock_response(self.index)) as get:
+            data = self.collector.fetch_forex_data()
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(data.index[-1], self.index[-1])
+
+    def test_failed_refresh_serves_cache(self):
+        """API errors fall back to the cached bars"""
+        with mock.patch("http_client.get", return_value=self.mock_response(self.index)):
+            self.collector.fetch_forex_data()
+        self.collector.cache_ttl = 0
+        limited = mock.Mock()
+        limited.json.return_value = {"Note": "API call frequency exceeded"}
+        with mock.patch("http_client.get", return_value=limited):
+            data = self.collector.fetch_forex_data()
+        self.assertFalse(data.empty)
+
+    def test_weekly_and_monthly_bars(self):
+        """Weekly and monthly intervals aggregate the cached daily bars instead of returning them"""
+        with mock.patch("http_client.get", return_value=self.mock_response(self.index)) as get:
+            daily = self.collector.fetch_forex_data(start_date=self.index[0])
+            for interval, rule in [("weekly", "W-SUN"), ("monthly", "MS")]:
+                collector = ForexDataCollector(interval=interval, alpha_vantage_key="test", db_path="sqlite://",
+                                               cache_dir=self.tmp.name)
+                bars = collector.fetch_forex_data(start_date=self.index[0])
+                bins = daily.index.to_period('W-SAT' if rule == "W-SUN" else 'M').start_time
+                expected_high = daily['High'].groupby(bins).max()
+                self.assertEqual(list(bars.index), list(expected_high.index[expected_high.index >= self.index[0]]))
+                np.testing.assert_allclose(bars['High'], expected_high.loc[bars.index])
+        self.assertEqual(get.call_count, 1)
+
+    def test_concurrent_fetches_on_one_collector(self):
+        """Parallel fetches of a shared collector (as in the API's worker pool) all get the data"""
+        index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=5000)
+        with mock.patch("http_client.get", return_value=self.mock_response(index)):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                frames = list(pool.map(lambda _: self.collector.fetch_forex_data(start_date=index[0]), range(16)))
+        for frame in frames:
+            self.assertEqual(len(frame), len(index))
+
+    def test_concurrent_misses_share_one_download(self):
+        """A burst of cold fetches makes one API call, and the next burst within cache_ttl none"""
+        # Twenty years of bars, so the four collectors write many partitions at once
+        index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=5000)
+
+        def slow_get(url, params=None, **kwargs):
+            time.sleep(0.2)
+            return self.mock_response(index)
+
+        collectors = [ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=self.tmp.name)
+                      for _ in range(4)]
+        with mock.patch("http_client.get", side_effect=slow_get) as get:
+            for _ in range(2):
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    frames = list(pool.map(lambda c: c.fetch_forex_data(), collectors))
+                self.assertEqual(get.call_count, 1)
+                for frame in frames:
+                    self.assertFalse(frame.empty)
+        for frame in frames[1:]:
+            pd.testing.assert_frame_equal(frame, frames[0])
+
+class TestDeltaFetch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=2000)
+        self.collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://",
+                                            cache_dir=self.tmp.name)
+        self.requested = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fake_get(self, url, params=None, **kwargs):
+        """Serve the latest 100 bars for compact and everything for full"""
+        self.requested.append(params['outputsize'])
+        index = self.index[-100:] if params['outputsize'] == "compact" else self.index
+        response = mock.Mock()
+        response.json.return_value = fx_daily_payload(index)
+        return response
+
+    def test_recent_cold_start_uses_compact(self):
+        """The default 100-day window is served by the compact output"""
+        with mock.patch("http_client.get", side_effect=self.fake_get):
+            data = self.collector.fetch_forex_data()
+        self.assertEqual(self.requested, ["compact"])
+        self.assertFalse(data.empty)
+
+    def test_old_range_uses_full(self):
+        """Cold backfills of older ranges download the full history once"""
+        with mock.patch("http_client.get", side_effect=self.fake_get):
+            self.collector.fetch_forex_data(start_date=self.index[0])
+            self.collector.fetch_forex_data(start_date=self.index[10])
+        self.assertEqual(self.requested, ["full"])
+
+    def test_stale_refresh_uses_compact(self):
+        """Steady-state refreshes of a complete cache only download compact"""
+        with mock.patch("http_client.get", side_effect=self.fake_get):
+            self.collector.fetch_forex_data(start_date=self.index[0])
+            self.collector.cache_ttl = 0
+            data = self.collector.fetch_forex_data(start_date=self.index[0])
+        self.assertEqual(self.requested, ["full", "compact"])
+        self.assertEqual(len(data), len(self.index))
+
+    def test_compact_gap_falls_back_to_full(self):
+        """Compact is not used when it cannot reach back to the needed bars"""
+        self.index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=2000, freq="D")
+        with mock.patch("http_client.get", side_effect=self.fake_get):
+            data = self.collector.fetch_forex_data(start_date=self.index[-120], end_date=self.index[-1])
+        self.assertEqual(self.requested, ["compact", "full"])
+        self.assertEqual(data.index[0], self.index[-120])
+
+if __name__ == '__main__':
+    unittest.main()
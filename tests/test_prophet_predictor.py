@@ -0,0 +1,155 @@
+import contextlib
+import io
+import logging
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from metrics import StageMetrics
+from prophet_predictor import ProphetPredictor, warm_start_params
+
+class TestWarmStart(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        index = pd.date_range("2022-01-01", periods=400, freq="D")
+        close = 1.10 + 0.01 * np.sin(np.arange(len(index)) / 9) + np.linspace(0, 0.02, len(index))
+        cls.data = pd.DataFrame({'ds': index, 'y': close})
+
+    def test_warm_start_uses_previous_parameters(self):
+        """A warm refit starts from the previous fit and lands close to a cold refit"""
+        warm = ProphetPredictor()
+        warm.train(self.data.iloc[:-5])
+        init = warm_start_params(warm.model)
+        self.assertEqual(len(init['delta']), warm.model.n_changepoints)
+
+        with mock.patch.object(Prophet, 'fit', autospec=True, side_effect=Prophet.fit) as fit:
+            warm.train(self.data, warm_start=True)
+        np.testing.assert_allclose(fit.call_args.kwargs['init']['beta'], init['beta'])
+
+        cold = ProphetPredictor()
+        cold.train(self.data)
+        future = pd.DataFrame({'ds': [self.data['ds'].iloc[-1] + pd.Timedelta(days=1)]})
+        self.assertAlmostEqual(warm.model.predict(future)['yhat'].iloc[0],
+                               cold.model.predict(future)['yhat'].iloc[0], delta=0.002)
+
+    def test_warm_start_without_fitted_model(self):
+        """Without a fitted model warm_start falls back to a cold fit"""
+        predictor = ProphetPredictor()
+        with mock.patch.object(Prophet, 'fit', autospec=True, side_effect=Prophet.fit) as fit:
+            predictor.train(self.data.iloc[:100], warm_start=True)
+        self.assertNotIn('init', fit.call_args.kwargs)
+        self.assertIsNotNone(predictor.model.history)
+
+class TestPrepareData(unittest.TestCase):
+    def test_cleans_in_one_pass(self):
+        """Object prices, None, NaN and NaT are cleaned like before"""
+        index = pd.DatetimeIndex(["2023-01-01", "2023-01-02", None, "2023-01-04", "2023-01-05"])
+        data = pd.DataFrame({'Close': ["1.0", None, 5.0, "bad", 3.0]}, index=index)
+        prepared = ProphetPredictor().prepare_data(data)
+        self.assertEqual(list(prepared.columns), ['ds', 'y'])
+        self.assertEqual(list(prepared['ds']), list(index[[0, 1, 3, 4]]))
+        self.assertEqual(list(prepared['y']), [1.0, 2.0, 2.0, 3.0])
+
+    def test_invalid_input(self):
+        """Missing target or too few rows give an empty frame"""
+        predictor = ProphetPredictor()
+        self.assertTrue(predictor.prepare_data(pd.DataFrame({'ds': pd.date_range("2023-01-01", periods=3)})).empty)
+        self.assertTrue(predictor.prepare_data(pd.DataFrame({'ds': [pd.Timestamp("2023-01-01")], 'y': [1.0]})).empty)
+
+    def test_memoized_by_identity(self):
+        """The same frame is prepared once; a different or reshaped frame is prepared again"""
+        data = pd.DataFrame({'ds': pd.date_range("2023-01-01", periods=5), 'y': np.arange(5.0)})
+        predictor = ProphetPredictor()
+        first = predictor.prepare_data(data)
+        self.assertIs(predictor.prepare_data(data), first)
+        data['extra'] = 1
+        self.assertIsNot(predictor.prepare_data(data), first)
+        self.assertEqual(predictor.metrics.snapshot()['prepare']['count'], 2)
+        predictor.prepare_data(data.copy())
+        self.assertEqual(predictor.metrics.snapshot()['prepare']['count'], 3)
+
+class TestForecastOnly(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        index = pd.date_range("2022-01-01", periods=300, freq="D")
+        cls.data = pd.DataFrame({'Close': 1.1 + 0.01 * np.sin(np.arange(len(index)) / 9)}, index=index)
+        cls.predictor = ProphetPredictor(prediction_horizon=5)
+        cls.predictor.train(cls.data)
+        cls.full = cls.predictor.predict(cls.data)
+
+    def test_horizon_only(self):
+        """history=0 predicts just the future dates, matching the full forecast"""
+        forecast = self.predictor.predict(self.data, history=0)
+        self.assertEqual(len(forecast), 5)
+        np.testing.assert_allclose(forecast['yhat'], self.full['yhat'].iloc[-5:])
+        pd.testing.assert_series_equal(forecast['ds'], self.full['ds'].iloc[-5:].reset_index(drop=True))
+
+    def test_trailing_window(self):
+        """A history window keeps the last dates even when the input is unsorted"""
+        shuffled = self.data.sample(frac=1, random_state=0)
+        forecast = self.predictor.predict(shuffled, history=10)
+        self.assertEqual(len(forecast), 15)
+        np.testing.assert_allclose(forecast['yhat'], self.full['yhat'].iloc[-15:])
+
+    def test_without_uncertainty(self):
+        """uncertainty=False skips the intervals for this call only, without touching the shared model"""
+        model = self.predictor.model
+        samples = model.uncertainty_samples
+        seen = []
+        original = Prophet.predict
+
+        def predict(instance, *args, **kwargs):
+            seen.append(model.uncertainty_samples)
+            return original(instance, *args, **kwargs)
+
+        with mock.patch.object(Prophet, 'predict', autospec=True, side_effect=predict):
+            forecast = self.predictor.predict(self.data, history=0, uncertainty=False)
+        self.assertEqual(seen, [samples])
+        self.assertNotIn('yhat_lower', forecast.columns)
+        np.testing.assert_allclose(forecast['yhat'], self.full['yhat'].iloc[-5:])
+        self.assertIn('yhat_lower', self.predictor.predict(self.data, history=0).columns)
+
+class TestInstrumentation(unittest.TestCase):
+    def test_stage_timings_without_output(self):
+        """Train and predict record every stage and print nothing at the default log level"""
+        index = pd.date_range("2023-01-01", periods=120, freq="D")
+        data = pd.DataFrame({'Close': 1.1 + 0.01 * np.sin(np.arange(len(index)) / 5)}, index=index)
+        predictor = ProphetPredictor()
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            predictor.train(data)
+            predictor.predict(data, periods=3)
+        self.assertEqual(stdout.getvalue(), "")
+
+        timings = predictor.metrics.snapshot()
+        self.assertEqual(set(timings), {'prepare', 'fit', 'make_future', 'predict'})
+        # predict reuses the frame prepared by train
+        self.assertEqual(timings['prepare']['count'], 1)
+        self.assertGreater(timings['fit']['total'], 0)
+
+    def test_debug_dumps_are_lazy(self):
+        """Frame dumps are only formatted when debug logging is enabled"""
+        data = pd.DataFrame({'ds': pd.date_range("2023-01-01", periods=5), 'y': 1.0})
+        predictor = ProphetPredictor()
+        with mock.patch.object(pd.DataFrame, 'head', autospec=True, side_effect=pd.DataFrame.head) as head:
+            predictor.prepare_data(data)
+            head.assert_not_called()
+            with self.assertLogs('prophet_predictor', level=logging.DEBUG):
+                predictor.prepare_data(data.copy())
+            head.assert_called()
+
+    def test_stage_metrics(self):
+        metrics = StageMetrics()
+        metrics.record('fit', 2.0)
+        metrics.record('fit', 4.0)
+        with metrics.time('predict'):
+            pass
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['fit'], {'count': 2, 'total': 6.0, 'last': 4.0, 'mean': 3.0})
+        self.assertEqual(snapshot['predict']['count'], 1)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+if __name__ == '__main__':
+    unittest.main()
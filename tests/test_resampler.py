@@ -0,0 +1,176 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from data_collector import ForexDataCollector
+from price_cache import PriceCache
+from resampler import MultiIntervalResampler, RESAMPLE_RULES, resample_bars
+from tests.helpers import minute_csv, fake_get
+
+def minute_bars(index, seed=0):
+    """Random-walk 1-minute bars for the given timestamps"""
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 1e-4, len(index)))
+    return pd.DataFrame({'Open': close - 5e-5, 'High': close + 1e-4, 'Low': close - 1e-4,
+                         'Close': close, 'Volume': rng.integers(0, 50, len(index)).astype(float)}, index=index)
+
+class TestMultiIntervalResampler(unittest.TestCase):
+    def setUp(self):
+        index = pd.date_range("2024-01-03 07:13", "2024-01-19 16:41", freq="T")
+        # Weekend and a gap inside a day, so some bins are empty
+        index = index[(index.dayofweek < 5) & ((index < "2024-01-10 09:00") | (index > "2024-01-10 11:30"))]
+        self.minutes = minute_bars(index)
+
+    def direct(self, interval):
+        """The interval resampled straight from the whole minute series"""
+        return resample_bars(self.minutes, RESAMPLE_RULES[interval][1])
+
+    def test_single_update_matches_direct_resample(self):
+        """The cascade of parent intervals gives the same bars as resampling the minutes"""
+        resampler = MultiIntervalResampler()
+        resampler.update(self.minutes)
+        for interval in RESAMPLE_RULES:
+            pd.testing.assert_frame_equal(resampler.get(interval), self.direct(interval), check_freq=False)
+
+    def test_incremental_updates_match(self):
+        """Appending minutes in uneven pieces gives the same bars as one update"""
+        resampler = MultiIntervalResampler()
+        for piece in np.array_split(np.arange(len(self.minutes)), [1, 7, 600, 601, 5000, 9000]):
+            changed = resampler.update(self.minutes.iloc[piece])
+        self.assertEqual(changed['4h'].index[-1], pd.Timestamp("2024-01-19 16:00"))
+        for interval in RESAMPLE_RULES:
+            pd.testing.assert_frame_equal(resampler.get(interval), self.direct(interval), check_freq=False)
+
+    def test_splice_matches_direct(self):
+        """Resamplers of separate stretches spliced together give the bars of one resampler"""
+        # Cuts inside 5min, 45min and 4h bins, so bins straddle the parts
+        cuts = [self.minutes.index.get_loc(pd.Timestamp(ts)) for ts in ["2024-01-05 10:02", "2024-01-11 13:31"]]
+        parts = []
+        for piece in np.split(np.arange(len(self.minutes)), cuts):
+            part = MultiIntervalResampler()
+            part.update(self.minutes.iloc[piece[:-100]])
+            part.update(self.minutes.iloc[piece[-100:]])
+            parts.append(part)
+        resampler = parts[1]
+        resampler.splice([parts[2], parts[0]])
+        self.assertEqual((resampler.first_timestamp, resampler.last_timestamp),
+                         (self.minutes.index[0], self.minutes.index[-1]))
+        for interval in RESAMPLE_RULES:
+            pd.testing.assert_frame_equal(resampler.get(interval), self.direct(interval), check_freq=False)
+        with self.assertRaises(ValueError):
+            resampler.splice([parts[0]])
+
+    def test_requested_intervals_and_ordering(self):
+        """Only the requested intervals and their parents are kept, and updates must append"""
+        resampler = MultiIntervalResampler(['45min'])
+        self.assertEqual(resampler.intervals, ['5min', '15min', '45min'])
+        resampler.update(self.minutes.iloc[:100])
+        with self.assertRaises(ValueError):
+            resampler.update(self.minutes.iloc[50:60])
+        with self.assertRaises(ValueError):
+            MultiIntervalResampler(['3min'])
+
+class TestCollectorResampling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        index = pd.date_range("2024-01-29", "2024-02-02 23:59", freq="T")
+        self.files = {}
+        for month, group in pd.Series(index, index=index).groupby(index.month):
+            self.files[("2024", f"{month:02d}")] = minute_csv(pd.DatetimeIndex(group.values), seed=month)
+        self.resampler = MultiIntervalResampler()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def collector(self, interval):
+        return ForexDataCollector(interval=interval, alpha_vantage_key="test", db_path="sqlite://",
+                                  cache_dir=self.tmp.name, resampler=self.resampler)
+
+    def test_switching_intervals_is_local(self):
+        """Collectors sharing a resampler serve every interval from one download"""
+        start, end = pd.Timestamp("2024-01-29"), pd.Timestamp("2024-02-02 23:59")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)) as get:
+            bars_45 = self.collector('45min').fetch_data(start, end)
+            calls = get.call_count
+            bars_4h = self.collector('4h').fetch_data(start, end)
+            self.assertEqual(get.call_count, calls)
+        self.assertEqual(len(bars_45), 5 * 32)
+        self.assertEqual(len(bars_4h), 5 * 6)
+        self.assertEqual(bars_4h['High'].max(), bars_45['High'].max())
+
+    def test_seeded_from_price_cache(self):
+        """A new resampler is rebuilt from the cached minute base without downloading"""
+        start, end = pd.Timestamp("2024-01-30"), pd.Timestamp("2024-02-01")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)):
+            expected = self.collector('60min').fetch_data(start, end)
+        self.resampler = MultiIntervalResampler()
+        with mock.patch("http_client.get") as get:
+            result = self.collector('60min').fetch_data(start, end)
+            get.assert_not_called()
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_weekend_start_is_not_backfilled_again(self):
+        """A start date before the first bar only triggers the backfill once"""
+        start, end = pd.Timestamp("2024-01-27"), pd.Timestamp("2024-02-02 23:59")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)) as get:
+            first = self.collector('60min').fetch_data(start, end)
+            calls = get.call_count
+            for _ in range(2):
+                self.collector('60min').fetch_data(start, end)
+            self.assertEqual(get.call_count, calls)
+
+        # A new resampler reads the covered range from the cache manifest
+        self.resampler = MultiIntervalResampler()
+        with mock.patch("http_client.get") as get:
+            result = self.collector('60min').fetch_data(start, end)
+            get.assert_not_called()
+        pd.testing.assert_frame_equal(result, first)
+
+    def test_backfill_streams_months(self):
+        """Backfills and seeding go month by month, never reading the whole cached base"""
+        end = pd.Timestamp("2024-02-02 23:59")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)), \
+                mock.patch.object(PriceCache, "read", side_effect=AssertionError("whole base read")):
+            self.collector('60min').fetch_data(pd.Timestamp("2024-02-01"), end)
+            result = self.collector('60min').fetch_data(pd.Timestamp("2024-01-29"), end)
+            self.resampler = MultiIntervalResampler()
+            seeded = self.collector('60min').fetch_data(pd.Timestamp("2024-01-29"), end)
+        minutes = pd.concat(PriceCache(self.tmp.name).partitions("EUR/USD", "1min"))
+        pd.testing.assert_frame_equal(result, resample_bars(minutes, '60T'), check_freq=False)
+        pd.testing.assert_frame_equal(seeded, result)
+
+    def test_seeded_freshness_comes_from_manifest(self):
+        """A resampler seeded from a stale cache refreshes the tail, one seeded from a fresh cache does not"""
+        start, end = pd.Timestamp("2024-01-29"), pd.Timestamp("2024-02-05")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)):
+            self.collector('60min').fetch_data(start, end)
+        manifest_path = os.path.join(self.tmp.name, "EURUSD", "1min", "_manifest.json")
+        for age, calls in [(0, 0), (3600, 1)]:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            manifest['written_at'] = time.time() - age
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f)
+            self.resampler = MultiIntervalResampler()
+            with mock.patch("http_client.get", side_effect=fake_get(self.files)) as get:
+                self.collector('60min').fetch_data(start, end)
+            self.assertEqual(get.call_count, calls)
+
+    def test_backfill_without_cache_keeps_newer_minutes(self):
+        """Without a price cache, backfilling older minutes keeps the ones already loaded"""
+        collector = ForexDataCollector(interval='60min', alpha_vantage_key="test", db_path="sqlite://",
+                                       cache_dir=None, resampler=self.resampler)
+        end = pd.Timestamp("2024-02-02 23:59")
+        with mock.patch("http_client.get", side_effect=fake_get(self.files)):
+            collector.fetch_data(pd.Timestamp("2024-02-01"), end)
+            result = collector.fetch_data(pd.Timestamp("2024-01-30"), end)
+        self.assertEqual(result.index[0], pd.Timestamp("2024-01-30"))
+        self.assertEqual(result.index[-1], pd.Timestamp("2024-02-02 23:00"))
+        self.assertEqual(len(result), 4 * 24)
+
+if __name__ == '__main__':
+    unittest.main()
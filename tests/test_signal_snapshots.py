@@ -0,0 +1,65 @@
+import asyncio
+import time
+import unittest
+from signal_snapshots import SignalSnapshots
+
+class TestSignalSnapshots(unittest.TestCase):
+    def test_schedule(self):
+        """Refreshes follow the bar closes plus the settle time"""
+        snapshots = SignalSnapshots(None, ["EUR/USD"], bar_seconds=3600, settle_seconds=60)
+        self.assertEqual(snapshots.next_refresh(7200 + 30), 7200 + 60)
+        self.assertEqual(snapshots.next_refresh(7200 + 60), 10800 + 60)
+
+        snapshot = {'generated_at': 7200 + 61, 'bar_close': 7200}
+        self.assertFalse(snapshots.is_stale(snapshot, now=10800 + 59))
+        self.assertTrue(snapshots.is_stale(snapshot, now=10800 + 60))
+        self.assertEqual(snapshots.age(snapshot, now=7200 + 100), 39)
+
+    def test_failed_refresh_keeps_snapshot(self):
+        """A failing refresh leaves the previous, read-only snapshot in place"""
+        results = [{'signal': 'BUY'}, ValueError("API down")]
+
+        async def compute(pair):
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        snapshots = SignalSnapshots(compute, ["EUR/USD"])
+        self.assertIsNone(snapshots.get("EUR/USD"))
+        self.assertTrue(asyncio.run(snapshots.refresh("EUR/USD")))
+        first = snapshots.get("EUR/USD")
+        self.assertFalse(asyncio.run(snapshots.refresh("EUR/USD")))
+        self.assertIs(snapshots.get("EUR/USD"), first)
+        self.assertEqual(first['signal'], 'BUY')
+        self.assertEqual(snapshots.errors, {"EUR/USD": "API down"})
+        with self.assertRaises(TypeError):
+            first['signal'] = 'SELL'
+
+    def test_refreshes_once_per_bar(self):
+        """The loop recomputes each pair once per bar, retrying only the failed pair"""
+        calls = []
+
+        async def compute(pair):
+            calls.append(pair)
+            if pair == "GBP/USD" and calls.count(pair) == 1:
+                raise ValueError("API down")
+            return {'signal': 'HOLD'}
+
+        async def run_for(seconds):
+            snapshots = SignalSnapshots(compute, ["EUR/USD", "GBP/USD"], bar_seconds=0.2, settle_seconds=0,
+                                        retry_seconds=0.05)
+            task = asyncio.create_task(snapshots.run())
+            await asyncio.sleep(seconds)
+            task.cancel()
+            return snapshots
+
+        # Start just after a bar close so the bars in the window are deterministic
+        time.sleep(0.2 - time.time() % 0.2 + 0.01)
+        snapshots = asyncio.run(run_for(0.5))
+        self.assertEqual(calls.count("EUR/USD"), 3)
+        self.assertEqual(calls.count("GBP/USD"), 4)
+        self.assertIsNotNone(snapshots.get("GBP/USD"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+import pandas as pd
+from prophet_predictor import ProphetPredictor
+from single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow(x):
+            calls.append(x)
+            time.sleep(0.2)
+            return {'value': x}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: flight.do("key", slow, 1), range(8)))
+        self.assertEqual(calls, [1])
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 7)
+        self.assertEqual(flight.in_flight(), 0)
+
+        # Nothing is kept once the call returned
+        flight.do("key", slow, 2)
+        self.assertEqual(calls, [1, 2])
+
+    def test_exception_reaches_every_caller(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.2)
+            raise ConnectionError("API down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", failing)
+            started.wait(5)
+            follower = pool.submit(flight.do, "key", failing)
+            for future in [leader, follower]:
+                with self.assertRaises(ConnectionError):
+                    future.result()
+        self.assertEqual(flight.shared, 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_concurrent_trains_share_one_fit(self):
+        """Predictors training the same cacheable model at once run one Prophet fit and can all predict from it"""
+        index = pd.date_range("2024-01-01", periods=120, freq="D")
+        close = 1.10 + np.cumsum(np.random.default_rng(0).normal(0, 0.004, len(index)))
+        data = pd.DataFrame({'Close': close}, index=index)
+        cache = mock.Mock()
+        cache.get.return_value = None
+        predictors = [ProphetPredictor(prediction_horizon=1, model_cache=cache) for _ in range(4)]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda p: p.train(data, pair="EUR/USD", timeframe="daily"), predictors))
+        self.assertEqual(sum(p.metrics.snapshot().get('fit', {}).get('count', 0) for p in predictors), 1)
+        self.assertEqual(len({id(p.model) for p in predictors}), 1)
+        cache.put.assert_called_once()
+
+        # The shared model is never mutated by predict, whatever the callers ask for
+        samples = predictors[0].model.uncertainty_samples
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            forecasts = list(pool.map(lambda i: predictors[i].predict(data, history=0, uncertainty=i % 2 == 0),
+                                      range(4)))
+        self.assertEqual(predictors[0].model.uncertainty_samples, samples)
+        self.assertEqual(['yhat_lower' in forecast.columns for forecast in forecasts], [True, False, True, False])
+
+if __name__ == '__main__':
+    unittest.main()
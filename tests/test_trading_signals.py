@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_collector import ForexDataCollector
+from benchmarks.bench_trading_signals import legacy_calculate_trading_signals
+from tests.helpers import make_price_frame
+
+class TestTradingSignals(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Build one synthetic price frame shared by all tests"""
+        cls.collector = ForexDataCollector(alpha_vantage_key="test", db_path="sqlite://", cache_dir=None)
+        cls.data = make_price_frame(3000, seed=7)
+
+    def assert_matches_legacy(self, data, confidence_threshold):
+        expected = legacy_calculate_trading_signals(data.copy(), confidence_threshold)
+        actual = self.collector.calculate_trading_signals(data.copy(), confidence_threshold)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+        return actual
+
+    def test_matches_legacy_loop(self):
+        """Vectorized signals are bit-identical to the per-row loop"""
+        for threshold in (0.8, 0.5, 0.3):
+            result = self.assert_matches_legacy(self.data, threshold)
+        self.assertTrue((result['Signal'] == 1).any())
+        self.assertTrue((result['Signal'] == -1).any())
+
+    def test_warmup_rows_have_no_signal(self):
+        """The first 20 rows never carry a signal"""
+        result = self.collector.calculate_trading_signals(self.data.copy(), 0.0)
+        self.assertTrue((result['Signal'].iloc[:20] == 0).all())
+        self.assertTrue((result['Entry_Price'].iloc[:20] == 0.0).all())
+
+    def test_nan_and_flat_bands(self):
+        """NaN indicators and zero-width Bollinger bands behave like the loop"""
+        data = self.data.copy()
+        data.iloc[100:110, data.columns.get_loc('RSI')] = np.nan
+        data.iloc[200:205, data.columns.get_loc('MACD')] = np.nan
+        data.iloc[300:310, data.columns.get_loc('Bollinger_Upper')] = data['Bollinger_Lower'].iloc[300:310]
+        self.assert_matches_legacy(data, 0.3)
+
+    def test_missing_indicator_columns(self):
+        """Missing indicators leave the signal columns at their defaults"""
+        data = self.data[['Open', 'High', 'Low', 'Close']].copy()
+        result = self.assert_matches_legacy(data, 0.8)
+        self.assertTrue((result['Signal'] == 0).all())
+
+    def test_empty_input(self):
+        """Empty input returns an empty frame"""
+        self.assertTrue(self.collector.calculate_trading_signals(pd.DataFrame()).empty)
+        self.assertTrue(self.collector.calculate_trading_signals(None).empty)
+
+if __name__ == '__main__':
+    unittest.main()
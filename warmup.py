@@ -0,0 +1,85 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWarmup:
+    def __init__(self, prepare, retry_seconds=60):
+        """
+        Run a slow preparation step (loading or training models) in a
+        background thread and track whether it has finished
+
+        A failed attempt is logged and retried after retry_seconds until it
+        succeeds or stop() is called, so a transient data outage at startup
+        does not leave the service unready for good.
+
+        Parameters:
+        -----------
+        prepare : callable
+            Called without arguments; ready once it returns
+        retry_seconds : float
+            Wait between failed attempts (default: 60)
+        """
+        self.prepare = prepare
+        self.retry_seconds = retry_seconds
+        self.status = "starting"
+        self.error = None
+        self.attempts = 0
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def start(self):
+        """
+        Start preparing in a daemon thread (a fit in progress does not hold up shutdown)
+
+        Does nothing while the thread is still running, apart from cancelling
+        a pending stop().
+        """
+        with self._start_lock:
+            self._stop.clear()
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop retrying; an attempt in progress runs to completion
+        """
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the preparation thread to finish, returning whether it is ready
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.status = "loading"
+            self.attempts += 1
+            try:
+                self.prepare()
+            except Exception as e:
+                logger.exception("Model preparation failed (attempt %d)", self.attempts)
+                self.status = "failed"
+                self.error = str(e)
+                self._stop.wait(self.retry_seconds)
+                continue
+            self.error = None
+            self.status = "ready"
+            return
+
+    def state(self):
+        """
+        Readiness report for a health endpoint
+        """
+        return {'status': self.status, 'attempts': self.attempts, 'error': self.error}